@@ -1,36 +1,64 @@
-from flask import Flask, jsonify
+from flask import Flask, jsonify, g
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager, get_jwt_identity
-from flask_bcrypt import Bcrypt
+from flask_jwt_extended import JWTManager, jwt_required, current_user
 from flask_mail import Mail
 from mongoengine import connect, disconnect
+from werkzeug.middleware.proxy_fix import ProxyFix
 from .config import Config
+from .utils.analytics import AnalyticsEngine
+from .utils.cache import ResponseCache
+from .utils.http_cache import register_cache_control
+from .utils.identity import IdentityCache
+from .utils.matching import MentorIndex
+from .utils.passwords import PasswordHasher
+from .utils.rate_limit import RateLimiter
+from .utils.revocation import TokenBlocklist, revoked_by_user
 
 jwt = JWTManager()
-bcrypt = Bcrypt()
 mail = Mail()
+response_cache = ResponseCache()
+identity_cache = IdentityCache()
+password_hasher = PasswordHasher()
+token_blocklist = TokenBlocklist()
+rate_limiter = RateLimiter()
+mentor_index = MentorIndex()
+analytics = AnalyticsEngine()
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    if app.config.get('PROXY_FIX_HOPS'):
+        # Client IPs (for rate limits) come from the trusted proxies' headers
+        hops = app.config['PROXY_FIX_HOPS']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops, x_host=hops)
 
     # Initialize extensions
     jwt.init_app(app)
-    bcrypt.init_app(app)
     mail.init_app(app)
+    response_cache.init_app(app)
+    identity_cache.init_app(app)
+    password_hasher.init_app(app)
+    token_blocklist.init_app(app)
+    rate_limiter.init_app(app)
+    mentor_index.init_app(app)
+    analytics.init_app(app)
+    register_cache_control(app)
     
     # Configure CORS properly
     CORS(app, 
          origins=["http://localhost:3000", "http://localhost:1625", "http://localhost:5173"],
          methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-         allow_headers=["Content-Type", "Authorization", "X-Requested-With"],
+         allow_headers=["Content-Type", "Authorization", "X-Requested-With", "If-None-Match", "Idempotency-Key"],
+         expose_headers=["ETag", "Retry-After"],
          supports_credentials=True)
 
     # Connect to MongoDB
     try:
+        client_class = app.config.get('MONGODB_CLIENT_CLASS')
         connect(
             db=app.config['MONGODB_DATABASE'],
-            host=app.config['MONGODB_URI']
+            host=app.config['MONGODB_URI'],
+            **({'mongo_client_class': client_class} if client_class else {})
         )
         print(f"✅ Connected to MongoDB: {app.config['MONGODB_DATABASE']}")
     except Exception as e:
@@ -42,11 +70,31 @@ def create_app(config_class=Config):
     def user_identity_lookup(user):
         return str(user.id)
 
+    @jwt.additional_claims_loader
+    def add_token_version(user):
+        return {'ver': user.token_version or 0}
+
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(_jwt_header, jwt_data):
+        if token_blocklist.is_revoked(jwt_data["jti"]):
+            return True
+        # Tokens issued before a "log out everywhere" are revoked too
+        g.identity = identity_cache.load(jwt_data["sub"])
+        user = g.identity[0]
+        if user and jwt_data.get("ver", 0) > (user.token_version or 0):
+            # Issued after a logout-all this process has not seen yet
+            identity_cache.invalidate(jwt_data["sub"])
+            g.identity = identity_cache.load(jwt_data["sub"])
+        return revoked_by_user(g.identity[0], jwt_data)
+
     @jwt.user_lookup_loader
     def user_lookup_callback(_jwt_header, jwt_data):
-        identity = jwt_data["sub"]
-        from .models import User
-        return User.objects(id=identity).first()
+        # Resolved once per request, from the identity cache when possible;
+        # deactivated users fail the lookup and get a 401
+        if 'identity' not in g:
+            g.identity = identity_cache.load(jwt_data["sub"])
+        user = g.identity[0]
+        return user if user and user.is_active else None
 
     # Import and register blueprints
     from .routes.auth import auth_bp
@@ -54,12 +102,14 @@ def create_app(config_class=Config):
     from .routes.users import users_bp
     from .routes.donations import donations_bp
     from .routes.mentors import mentors_bp
+    from .routes.admin_routes import admin_bp
 
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(campaigns_bp, url_prefix='/api/campaigns')
     app.register_blueprint(users_bp, url_prefix='/api/users')
     app.register_blueprint(donations_bp, url_prefix='/api/donations')
     app.register_blueprint(mentors_bp, url_prefix='/api/mentors')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
 
     @app.route('/')
     def root():
@@ -73,10 +123,28 @@ def create_app(config_class=Config):
                 'campaigns': '/api/campaigns',
                 'users': '/api/users',
                 'donations': '/api/donations',
-                'mentors': '/api/mentors'
+                'mentors': '/api/mentors',
+                'admin': '/api/admin',
+                'metrics': '/api/metrics'
             }
         })
 
+    @app.route('/api/metrics')
+    @jwt_required()
+    def metrics():
+        # Internal counters; admins only
+        if current_user.role != 'admin':
+            return jsonify({'error': 'Only admins can view metrics'}), 403
+        return jsonify({
+            'response_cache': response_cache.stats(),
+            'identity_cache': identity_cache.stats(),
+            'password_hasher': password_hasher.stats(),
+            'token_blocklist': token_blocklist.stats(),
+            'rate_limiter': rate_limiter.stats(),
+            'mentor_index': mentor_index.stats(),
+            'analytics': analytics.stats()
+        })
+
     @app.route('/api/health')
     def health_check():
         try:
@@ -18,10 +18,15 @@ class Config:
     else:
         MONGODB_URI = os.environ.get('MONGODB_URI') or f'mongodb://{MONGODB_HOST}:{MONGODB_PORT}/{MONGODB_DATABASE}'
     
+    # pymongo.MongoClient unless overridden, e.g. by mongomock in the test suite
+    MONGODB_CLIENT_CLASS = None
+    
     # JWT Configuration
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    # Seconds before a token revoked by another worker is rejected by this one
+    TOKEN_REVOCATION_SYNC_INTERVAL = int(os.environ.get('TOKEN_REVOCATION_SYNC_INTERVAL') or 5)
     
     # Mail Configuration
     MAIL_SERVER = os.environ.get('MAIL_SERVER') or 'smtp.gmail.com'
@@ -29,6 +34,7 @@ class Config:
     MAIL_USE_TLS = os.environ.get('MAIL_USE_TLS', 'true').lower() in ['true', 'on', '1']
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
+    MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER') or MAIL_USERNAME
     
     # File Upload Configuration
     UPLOAD_FOLDER = 'uploads'
@@ -37,3 +43,61 @@ class Config:
     
     # Pagination
     POSTS_PER_PAGE = 10
+    
+    # Response cache for public read endpoints (backend: memory or null)
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND') or 'memory'
+    RESPONSE_CACHE_DEFAULT_TTL = int(os.environ.get('RESPONSE_CACHE_DEFAULT_TTL') or 60)
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES') or 2048)
+    RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES') or 64 * 1024 * 1024)
+    RESPONSE_CACHE_MAX_ITEM_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_ITEM_BYTES') or 1024 * 1024)
+    
+    # Password hashing: bcrypt cost factor and the worker process pool that runs it
+    # (0 workers hashes inline). Hashes with another cost are upgraded at login.
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS') or 12)
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS') or 2)
+    PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE') or 32)
+    PASSWORD_HASH_TIMEOUT = int(os.environ.get('PASSWORD_HASH_TIMEOUT') or 10)
+    PASSWORD_HASH_RETRY_AFTER = int(os.environ.get('PASSWORD_HASH_RETRY_AFTER') or 1)
+    
+    # Authenticated users and their role profiles, cached per process (TTL 0 disables)
+    IDENTITY_CACHE_TTL = int(os.environ.get('IDENTITY_CACHE_TTL') or 30)
+    IDENTITY_CACHE_MAX_ENTRIES = int(os.environ.get('IDENTITY_CACHE_MAX_ENTRIES') or 4096)
+    
+    # Seconds between pulls of mentor changes made by other workers into the matching index
+    MENTOR_INDEX_SYNC_INTERVAL = int(os.environ.get('MENTOR_INDEX_SYNC_INTERVAL') or 60)
+    
+    # Admin analytics snapshot: seconds before it is refreshed, days of daily series, NGOs ranked
+    ANALYTICS_REFRESH_INTERVAL = int(os.environ.get('ANALYTICS_REFRESH_INTERVAL') or 300)
+    ANALYTICS_WINDOW_DAYS = int(os.environ.get('ANALYTICS_WINDOW_DAYS') or 90)
+    ANALYTICS_TOP_NGOS = int(os.environ.get('ANALYTICS_TOP_NGOS') or 10)
+    
+    # Admission control: (requests, per seconds) token buckets per user, or per
+    # client IP for anonymous requests, separate budgets for expensive routes
+    # (per user, else per IP) and a cap on requests in progress per process (0 disables)
+    RATE_LIMIT_ENABLED = (os.environ.get('RATE_LIMIT_ENABLED') or 'true').lower() == 'true'
+    RATE_LIMITS = {
+        'ip': (300, 60),
+        'user': (600, 60)
+    }
+    ROUTE_RATE_LIMITS = {
+        'auth.login': (10, 60),
+        'auth.register': (5, 300),
+        'search': (30, 60),
+        'donations.create_donation': (30, 60),
+        'donations.import_donations_file': (10, 3600),
+        'donations.export_donations': (10, 3600),
+        'admin.refresh_analytics': (6, 60)
+    }
+    MAX_CONCURRENT_REQUESTS = int(os.environ.get('MAX_CONCURRENT_REQUESTS') or 64)
+    # Reverse proxies in front of the app; their X-Forwarded-For gives the client IP (0: none)
+    PROXY_FIX_HOPS = int(os.environ.get('PROXY_FIX_HOPS') or 0)
+    
+    # Cache-Control for GET responses, per blueprint; clients revalidate with ETags
+    CACHE_CONTROL = {
+        'campaigns': 'public, max-age=30',
+        'mentors': 'public, max-age=60',
+        'donations': 'private, no-cache',
+        'users': 'private, no-cache',
+        'auth': 'private, no-cache',
+        'admin': 'private, no-cache'
+    }
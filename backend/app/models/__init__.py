@@ -1,6 +1,13 @@
 from .user import User
-from .campaign import Campaign, CampaignUpdate
+from .campaign import Campaign, CampaignUpdate, RecentDonation
 from .donation import Donation
 from .mentor import Mentor, Mentorship
 from .student import Student, ScholarshipApplication
 from .ngo import NGO
+from .platform_stats import PlatformStats
+from .donation_rollup import DonationRollup
+from .revoked_token import RevokedToken
+from .expertise_facet import ExpertiseFacet
+from .user_stats import UserStats
+from .analytics_snapshot import AnalyticsSnapshot
+from .task import Task
@@ -0,0 +1,30 @@
+from datetime import datetime
+from mongoengine import Document, StringField, DictField, DateTimeField
+
+class AnalyticsSnapshot(Document):
+    """Precomputed admin analytics, shared by every worker process.
+
+    ``signups`` keeps the per-day signup counts between refreshes so only the
+    most recent days are recounted; ``sections`` holds the rest, ready to serve.
+    """
+    key = StringField(primary_key=True, default='global')
+    signups = DictField()  # 'YYYY-MM-DD' -> {role: count}
+    sections = DictField()
+    refreshed_at = DateTimeField(default=datetime.utcnow)
+    
+    meta = {
+        'collection': 'analytics_snapshots'
+    }
+    
+    def to_dict(self):
+        return {
+            'signups': [
+                {'day': day, 'total': sum(roles.values()), 'by_role': roles}
+                for day, roles in sorted(self.signups.items())
+            ],
+            **self.sections,
+            'refreshed_at': self.refreshed_at.isoformat()
+        }
+    
+    def __repr__(self):
+        return f'<AnalyticsSnapshot {self.key} {self.refreshed_at}>'
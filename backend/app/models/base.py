@@ -0,0 +1,18 @@
+from datetime import datetime
+from mongoengine import Document
+
+class TimestampedDocument(Document):
+    """Base for documents whose updated_at must change on every save"""
+    
+    meta = {
+        'abstract': True
+    }
+    
+    def save(self, *args, **kwargs):
+        self.updated_at = datetime.utcnow()
+        return super().save(*args, **kwargs)
+    
+    def reference_id(self, name):
+        """String id held by a ReferenceField, without dereferencing it"""
+        value = self._data.get(name)
+        return str(value.id) if value is not None else None
@@ -1,7 +1,29 @@
 from datetime import datetime
-from mongoengine import Document, StringField, FloatField, DateTimeField, ReferenceField, IntField
+from mongoengine import (Document, EmbeddedDocument, StringField, FloatField, DateTimeField, ReferenceField,
+                         IntField, ListField, EmbeddedDocumentListField)
+from .base import TimestampedDocument
 
-class Campaign(Document):
+# Length of the recent donations list kept on each campaign
+RECENT_DONATIONS = 10
+
+class RecentDonation(EmbeddedDocument):
+    """Pre-rendered summary of a donation, embedded in its campaign"""
+    donation_id = StringField(required=True)
+    amount = FloatField(required=True)
+    donor_name = StringField()  # 'Anonymous' for anonymous donations
+    message = StringField()
+    created_at = DateTimeField(required=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.donation_id,
+            'amount': self.amount,
+            'donor_name': self.donor_name,
+            'message': self.message,
+            'created_at': self.created_at.isoformat()
+        }
+
+class Campaign(TimestampedDocument):
     title = StringField(required=True, max_length=200)
     description = StringField(required=True)
     long_description = StringField()
@@ -11,11 +33,15 @@ class Campaign(Document):
     image_url = StringField(max_length=500)
     location = StringField(max_length=100)
     ngo = ReferenceField('NGO', required=True)
+    ngo_name = StringField(max_length=200)  # denormalized for full-text search
     status = StringField(default='active', max_length=20)  # active, completed, cancelled
     start_date = DateTimeField(default=datetime.utcnow)
     end_date = DateTimeField()
     created_at = DateTimeField(default=datetime.utcnow)
     updated_at = DateTimeField(default=datetime.utcnow)
+    pending_ledger = ListField(StringField())  # claim tokens applied but not yet settled, see utils.donation_ledger
+    applied_ledger = ListField(StringField())  # legacy; dropped by manage.py migrate-donation-ledger
+    recent_donations = EmbeddedDocumentListField(RecentDonation)  # newest first, at most RECENT_DONATIONS
     
     meta = {
         'collection': 'campaigns',
@@ -23,31 +49,48 @@ class Campaign(Document):
             'category',
             'status',
             'ngo',
-            'start_date'
+            'start_date',
+            {'fields': ['status', '-created_at', '-id']},
+            {'fields': ['category', 'status', '-created_at', '-id']},
+            {
+                'fields': ['$title', '$description', '$long_description', '$location', '$ngo_name'],
+                'default_language': 'english',
+                'weights': {
+                    'title': 10,
+                    'ngo_name': 5,
+                    'location': 3,
+                    'description': 2,
+                    'long_description': 1
+                },
+                'name': 'campaign_text_search'
+            }
         ]
     }
     
-    def to_dict(self):
-        return {
-            'id': str(self.id),
-            'title': self.title,
-            'description': self.description,
-            'long_description': self.long_description,
-            'category': self.category,
-            'goal_amount': self.goal_amount,
-            'raised_amount': self.raised_amount,
-            'image_url': self.image_url,
-            'location': self.location,
-            'ngo_id': str(self.ngo.id),
-            'ngo_name': self.ngo.name if self.ngo else None,
-            'status': self.status,
-            'start_date': self.start_date.isoformat(),
-            'end_date': self.end_date.isoformat() if self.end_date else None,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat(),
-            'progress_percentage': self.get_progress_percentage(),
-            'days_left': self.get_days_left()
+    def to_dict(self, fields=None):
+        # Values are computed only for the requested fields, so a document
+        # loaded with only() never touches the fields it did not load
+        serializers = {
+            'id': lambda: str(self.id),
+            'title': lambda: self.title,
+            'description': lambda: self.description,
+            'long_description': lambda: self.long_description,
+            'category': lambda: self.category,
+            'goal_amount': lambda: self.goal_amount,
+            'raised_amount': lambda: self.raised_amount,
+            'image_url': lambda: self.image_url,
+            'location': lambda: self.location,
+            'ngo_id': lambda: self.reference_id('ngo'),
+            'ngo_name': lambda: self.ngo_name or (self.ngo.name if self.ngo else None),
+            'status': lambda: self.status,
+            'start_date': lambda: self.start_date.isoformat(),
+            'end_date': lambda: self.end_date.isoformat() if self.end_date else None,
+            'created_at': lambda: self.created_at.isoformat(),
+            'updated_at': lambda: self.updated_at.isoformat(),
+            'progress_percentage': self.get_progress_percentage,
+            'days_left': self.get_days_left
         }
+        return {key: value() for key, value in serializers.items() if fields is None or key in fields}
     
     def get_progress_percentage(self):
         if self.goal_amount == 0:
@@ -57,12 +100,16 @@ class Campaign(Document):
     def get_days_left(self):
         if not self.end_date:
             return None
-        delta = self.end_date - datetime.utcnow()
-        return max(0, delta.days)
+        # Whole UTC days, so the value only changes at midnight (campaign ETags carry the date)
+        return max(0, (self.end_date.date() - datetime.utcnow().date()).days)
     
     def update_raised_amount(self, amount):
+        # Atomic $inc, so concurrent donations never overwrite each other
+        Campaign.objects(id=self.id).update_one(
+            inc__raised_amount=amount,
+            set__updated_at=datetime.utcnow()
+        )
         self.raised_amount += amount
-        self.save()
     
     def __repr__(self):
         return f'<Campaign {self.title}>'
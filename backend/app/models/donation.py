@@ -1,13 +1,16 @@
 from datetime import datetime
-from mongoengine import Document, FloatField, StringField, BooleanField, DateTimeField, ReferenceField
+from mongoengine import FloatField, StringField, BooleanField, DateTimeField, ReferenceField
+from .base import TimestampedDocument
 
-class Donation(Document):
+class Donation(TimestampedDocument):
     amount = FloatField(required=True)
     donor = ReferenceField('User', required=True)
     campaign = ReferenceField('Campaign', required=True)
     payment_method = StringField(default='online', max_length=50)  # online, bank_transfer, etc.
     transaction_id = StringField(unique=True, max_length=100)
-    status = StringField(default='pending', max_length=20)  # pending, completed, failed, refunded
+    ledger_key = StringField(max_length=100)  # groups donations applied to a campaign in one $inc
+    settle_token = StringField(max_length=32)  # claim that applies and completes the donation, see utils.donation_ledger
+    status = StringField(default='pending', max_length=20)  # pending, applying, completed, failed, refunded
     is_anonymous = BooleanField(default=False)
     message = StringField()
     created_at = DateTimeField(default=datetime.utcnow)
@@ -18,9 +21,15 @@ class Donation(Document):
         'indexes': [
             'donor',
             'campaign',
+            'ledger_key',
+            'settle_token',
             'status',
             'transaction_id',
-            'created_at'
+            'created_at',
+            {'fields': ['-created_at', '-id']},
+            {'fields': ['campaign', '-created_at', '-id']},
+            {'fields': ['donor', '-created_at', '-id']},
+            {'fields': ['status', 'created_at', 'amount']}
         ]
     }
     
@@ -0,0 +1,34 @@
+from mongoengine import Document, StringField, IntField, FloatField, DateTimeField
+
+class DonationRollup(Document):
+    """Completed donation totals for one time bucket of one scope.
+
+    Scopes are ``global`` (empty scope_id), ``campaign`` and ``ngo`` (ids) and
+    ``category`` (the category name). Hour buckets expire after a retention
+    period; day buckets are kept.
+    """
+    granularity = StringField(required=True, max_length=10)  # hour, day
+    bucket = DateTimeField(required=True)  # start of the hour or day, UTC
+    scope = StringField(required=True, max_length=20)  # global, campaign, category, ngo
+    scope_id = StringField(default='', max_length=50)
+    count = IntField(default=0)
+    amount = FloatField(default=0.0)
+    expires_at = DateTimeField()
+    
+    meta = {
+        'collection': 'donation_rollups',
+        'indexes': [
+            {'fields': ['scope', 'scope_id', 'granularity', 'bucket'], 'unique': True},
+            {'fields': ['expires_at'], 'expireAfterSeconds': 0}
+        ]
+    }
+    
+    def to_dict(self):
+        return {
+            'bucket': self.bucket.isoformat(),
+            'count': self.count,
+            'amount': self.amount
+        }
+    
+    def __repr__(self):
+        return f'<DonationRollup {self.scope}:{self.scope_id} {self.granularity} {self.bucket}>'
@@ -0,0 +1,22 @@
+from mongoengine import Document, StringField, IntField
+
+class ExpertiseFacet(Document):
+    """Number of available mentors per expertise tag, kept with $inc"""
+    tag = StringField(primary_key=True, max_length=100)
+    count = IntField(default=0)
+    
+    meta = {
+        'collection': 'expertise_facets',
+        'indexes': [
+            '-count'
+        ]
+    }
+    
+    def to_dict(self):
+        return {
+            'tag': self.tag,
+            'count': self.count
+        }
+    
+    def __repr__(self):
+        return f'<ExpertiseFacet {self.tag}: {self.count}>'
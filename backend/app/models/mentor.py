@@ -1,11 +1,14 @@
 from datetime import datetime
-from mongoengine import Document, StringField, IntField, FloatField, BooleanField, DateTimeField, ReferenceField
+from mongoengine import StringField, IntField, FloatField, BooleanField, DateTimeField, ReferenceField, ListField
+from .base import TimestampedDocument
+from app.utils.tags import parse_tags
 
-class Mentor(Document):
+class Mentor(TimestampedDocument):
     user = ReferenceField('User', required=True)
     company = StringField(max_length=200)
     position = StringField(max_length=200)
     expertise = StringField()  # JSON string of skills
+    expertise_tags = ListField(StringField())  # normalized from expertise on save
     experience_years = IntField()
     bio = StringField()
     linkedin_url = StringField(max_length=200)
@@ -23,31 +26,40 @@ class Mentor(Document):
         'indexes': [
             'user',
             'is_available',
-            'expertise',
-            'rating'
+            'expertise_tags',
+            'rating',
+            {'fields': ['-created_at', '-id']},
+            {'fields': ['is_available', '-created_at', '-id']}
         ]
     }
     
-    def to_dict(self):
-        return {
-            'id': str(self.id),
-            'user_id': str(self.user.id),
-            'user': self.user.to_dict() if self.user else None,
-            'company': self.company,
-            'position': self.position,
-            'expertise': self.expertise,
-            'experience_years': self.experience_years,
-            'bio': self.bio,
-            'linkedin_url': self.linkedin_url,
-            'github_url': self.github_url,
-            'is_available': self.is_available,
-            'max_students': self.max_students,
-            'current_students': self.current_students,
-            'rating': self.rating,
-            'total_reviews': self.total_reviews,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+    def to_dict(self, fields=None):
+        # See Campaign.to_dict: only requested fields are computed
+        serializers = {
+            'id': lambda: str(self.id),
+            'user_id': lambda: self.reference_id('user'),
+            'user': lambda: self.user.to_dict() if self.user else None,
+            'name': lambda: f"{self.user.first_name} {self.user.last_name}" if self.user else None,
+            'company': lambda: self.company,
+            'position': lambda: self.position,
+            'expertise': lambda: self.expertise,
+            'expertise_tags': lambda: list(self.expertise_tags),
+            'experience_years': lambda: self.experience_years,
+            'bio': lambda: self.bio,
+            'linkedin_url': lambda: self.linkedin_url,
+            'github_url': lambda: self.github_url,
+            'is_available': lambda: self.is_available,
+            'max_students': lambda: self.max_students,
+            'current_students': lambda: self.current_students,
+            'rating': lambda: self.rating,
+            'total_reviews': lambda: self.total_reviews,
+            'created_at': lambda: self.created_at.isoformat(),
+            'updated_at': lambda: self.updated_at.isoformat()
         }
+        return {key: value() for key, value in serializers.items() if fields is None or key in fields}
+    
+    def clean(self):
+        self.expertise_tags = parse_tags(self.expertise)
     
     def can_accept_student(self):
         return self.is_available and self.current_students < self.max_students
@@ -55,7 +67,7 @@ class Mentor(Document):
     def __repr__(self):
         return f'<Mentor {self.user.first_name if self.user else "Unknown"}>'
 
-class Mentorship(Document):
+class Mentorship(TimestampedDocument):
     mentor = ReferenceField('Mentor', required=True)
     student = ReferenceField('Student', required=True)
     status = StringField(default='pending', max_length=20)  # pending, active, completed, cancelled
@@ -72,15 +84,17 @@ class Mentorship(Document):
             'mentor',
             'student',
             'status',
-            'start_date'
+            'start_date',
+            {'fields': ['mentor', '-created_at', '-id']},
+            {'fields': ['mentor', 'status', '-created_at', '-id']}
         ]
     }
     
     def to_dict(self):
         return {
             'id': str(self.id),
-            'mentor_id': str(self.mentor.id),
-            'student_id': str(self.student.id),
+            'mentor_id': self.reference_id('mentor'),
+            'student_id': self.reference_id('student'),
             'status': self.status,
             'start_date': self.start_date.isoformat() if self.start_date else None,
             'end_date': self.end_date.isoformat() if self.end_date else None,
@@ -1,7 +1,8 @@
 from datetime import datetime
-from mongoengine import Document, StringField, BooleanField, DateTimeField, ReferenceField
+from mongoengine import StringField, BooleanField, DateTimeField, ReferenceField
+from .base import TimestampedDocument
 
-class NGO(Document):
+class NGO(TimestampedDocument):
     name = StringField(required=True, max_length=200)
     description = StringField()
     website = StringField(max_length=200)
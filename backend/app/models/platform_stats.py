@@ -0,0 +1,31 @@
+from datetime import datetime
+from mongoengine import Document, StringField, IntField, FloatField, DateTimeField
+
+class PlatformStats(Document):
+    """Materialized platform totals, kept current with $inc by the write paths"""
+    key = StringField(primary_key=True, default='global')
+    total_campaigns = IntField(default=0)
+    active_campaigns = IntField(default=0)
+    total_goal = FloatField(default=0.0)
+    total_raised = FloatField(default=0.0)
+    donation_count = IntField(default=0)
+    donation_amount = FloatField(default=0.0)
+    updated_at = DateTimeField(default=datetime.utcnow)
+    
+    meta = {
+        'collection': 'platform_stats'
+    }
+    
+    def to_dict(self):
+        return {
+            'total_campaigns': self.total_campaigns,
+            'active_campaigns': self.active_campaigns,
+            'total_goal': self.total_goal,
+            'total_raised': self.total_raised,
+            'donation_count': self.donation_count,
+            'donation_amount': self.donation_amount,
+            'updated_at': self.updated_at.isoformat()
+        }
+    
+    def __repr__(self):
+        return f'<PlatformStats {self.key}>'
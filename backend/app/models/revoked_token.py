@@ -0,0 +1,21 @@
+from datetime import datetime
+from mongoengine import Document, StringField, DateTimeField
+
+class RevokedToken(Document):
+    """A revoked JWT, kept until the token would have expired anyway"""
+    jti = StringField(primary_key=True, max_length=64)
+    user_id = StringField(max_length=50)
+    token_type = StringField(max_length=10)  # access, refresh
+    expires_at = DateTimeField(required=True)
+    revoked_at = DateTimeField(default=datetime.utcnow)
+    
+    meta = {
+        'collection': 'revoked_tokens',
+        'indexes': [
+            'revoked_at',
+            {'fields': ['expires_at'], 'expireAfterSeconds': 0}
+        ]
+    }
+    
+    def __repr__(self):
+        return f'<RevokedToken {self.jti}>'
@@ -1,7 +1,8 @@
 from datetime import datetime
-from mongoengine import Document, StringField, IntField, BooleanField, DateTimeField, ReferenceField
+from mongoengine import StringField, IntField, BooleanField, DateTimeField, ReferenceField
+from .base import TimestampedDocument
 
-class Student(Document):
+class Student(TimestampedDocument):
     user = ReferenceField('User', required=True)
     school = StringField(max_length=200)
     grade = StringField(max_length=20)
@@ -45,7 +46,7 @@ class Student(Document):
     def __repr__(self):
         return f'<Student {self.user.first_name if self.user else "Unknown"}>'
 
-class ScholarshipApplication(Document):
+class ScholarshipApplication(TimestampedDocument):
     student = ReferenceField('Student', required=True)
     campaign = ReferenceField('Campaign', required=True)
     status = StringField(default='pending', max_length=20)  # pending, approved, rejected, under_review
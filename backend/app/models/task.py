@@ -0,0 +1,59 @@
+from datetime import datetime
+from mongoengine import Document, StringField, DictField, IntField, DateTimeField
+
+class Task(Document):
+    """A unit of background work, claimed and run by worker.py.
+
+    ``dedup_key`` is held only while the task is queued or running, so an
+    identical task can be queued again once it has finished. Tasks sharing
+    a ``batch_key`` are claimed and handled together.
+    """
+    name = StringField(required=True, max_length=100)
+    payload = DictField()
+    status = StringField(default='queued', max_length=20)  # queued, running, done, failed
+    dedup_key = StringField(max_length=200)
+    batch_key = StringField(max_length=200)
+    attempts = IntField(default=0)
+    max_attempts = IntField(default=5)
+    run_at = DateTimeField(default=datetime.utcnow)
+    locked_by = StringField(max_length=100)
+    locked_until = DateTimeField()
+    last_error = StringField()
+    finished_at = DateTimeField()
+    expires_at = DateTimeField()
+    created_at = DateTimeField(default=datetime.utcnow)
+    updated_at = DateTimeField(default=datetime.utcnow)
+    
+    meta = {
+        'collection': 'tasks',
+        'indexes': [
+            {'fields': ['status', 'run_at']},
+            {'fields': ['status', 'locked_until']},
+            {'fields': ['batch_key', 'status', 'run_at']},
+            {'fields': ['dedup_key'], 'unique': True, 'sparse': True},
+            {'fields': ['-created_at', '-id']},
+            {'fields': ['status', '-created_at', '-id']},
+            {'fields': ['expires_at'], 'expireAfterSeconds': 0}
+        ]
+    }
+    
+    def to_dict(self):
+        return {
+            'id': str(self.id),
+            'name': self.name,
+            'payload': self.payload,
+            'status': self.status,
+            'dedup_key': self.dedup_key,
+            'batch_key': self.batch_key,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'run_at': self.run_at.isoformat() if self.run_at else None,
+            'locked_by': self.locked_by,
+            'last_error': self.last_error,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat()
+        }
+    
+    def __repr__(self):
+        return f'<Task {self.name} {self.status}>'
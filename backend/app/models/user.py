@@ -1,9 +1,10 @@
 from datetime import datetime
-from mongoengine import Document, StringField, BooleanField, DateTimeField, ReferenceField, ListField
+from mongoengine import StringField, BooleanField, DateTimeField, IntField, ReferenceField, ListField
+from .base import TimestampedDocument
 from flask_jwt_extended import create_access_token, create_refresh_token
-from app import bcrypt
+from app import password_hasher
 
-class User(Document):
+class User(TimestampedDocument):
     email = StringField(required=True, unique=True, max_length=120)
     password_hash = StringField(required=True, max_length=128)
     first_name = StringField(required=True, max_length=50)
@@ -12,6 +13,8 @@ class User(Document):
     role = StringField(required=True, max_length=20)  # student, mentor, donor, ngo, admin
     is_active = BooleanField(default=True)
     is_verified = BooleanField(default=False)
+    tokens_revoked_at = DateTimeField()  # tokens issued before this are rejected
+    token_version = IntField(default=0)  # bumped by logout-all; tokens carry it as the 'ver' claim
     created_at = DateTimeField(default=datetime.utcnow)
     updated_at = DateTimeField(default=datetime.utcnow)
     
@@ -20,7 +23,8 @@ class User(Document):
         'indexes': [
             'email',
             'role',
-            'is_active'
+            'is_active',
+            {'fields': ['-created_at', '-id']}
         ]
     }
     
@@ -29,7 +33,7 @@ class User(Document):
         if email is not None:
             self.email = email
         if password is not None:
-            self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+            self.set_password(password)
         if first_name is not None:
             self.first_name = first_name
         if last_name is not None:
@@ -39,8 +43,15 @@ class User(Document):
         if phone is not None:
             self.phone = phone
 
+    def set_password(self, password):
+        # Runs in the hashing process pool; may raise PasswordHasherBusy
+        self.password_hash = password_hasher.hash(password)
+
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
 
     def generate_tokens(self):
         access_token = create_access_token(identity=self)
@@ -0,0 +1,27 @@
+from datetime import datetime
+from mongoengine import Document, ObjectIdField, IntField, FloatField, DateTimeField
+
+class UserStats(Document):
+    """Materialized per-user counters, kept current with $inc by the write paths"""
+    user_id = ObjectIdField(primary_key=True)
+    donation_count = IntField(default=0)
+    donation_amount = FloatField(default=0.0)
+    campaigns_created = IntField(default=0)
+    students_mentored = IntField(default=0)
+    updated_at = DateTimeField(default=datetime.utcnow)
+    
+    meta = {
+        'collection': 'user_stats'
+    }
+    
+    def to_dict(self):
+        return {
+            'total_donations': self.donation_count,
+            'total_amount_donated': self.donation_amount,
+            'campaigns_created': self.campaigns_created,
+            'students_mentored': self.students_mentored,
+            'updated_at': self.updated_at.isoformat()
+        }
+    
+    def __repr__(self):
+        return f'<UserStats {self.user_id}>'
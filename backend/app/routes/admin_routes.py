@@ -0,0 +1,106 @@
+from datetime import datetime
+from flask import Blueprint, current_app, jsonify, request
+from flask_jwt_extended import jwt_required, current_user
+from app import analytics, identity_cache
+from app.models import NGO, Task
+from app.utils.http_cache import not_modified, with_etag
+from app.utils.pagination import paginate, InvalidCursor
+from app.utils.task_handlers import queue_ngo_approval
+from app.utils.tasks import queue_stats, STATUSES
+
+admin_bp = Blueprint('admin', __name__)
+
+@admin_bp.route('/analytics', methods=['GET'])
+@jwt_required()
+def get_analytics():
+    """Precomputed platform analytics; at most ANALYTICS_REFRESH_INTERVAL seconds old plus one refresh"""
+    try:
+        if current_user.role != 'admin':
+            return jsonify({'error': 'Only admins can view analytics'}), 403
+        
+        _, body, etag = analytics.snapshot()
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
+        
+        return with_etag(current_app.response_class(body, mimetype='application/json'), etag)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/analytics/refresh', methods=['POST'])
+@jwt_required()
+def refresh_analytics():
+    """Recompute the analytics snapshot now"""
+    try:
+        if current_user.role != 'admin':
+            return jsonify({'error': 'Only admins can refresh analytics'}), 403
+        
+        snapshot = analytics.refresh()
+        
+        return jsonify({
+            'message': 'Analytics refreshed',
+            'refreshed_at': snapshot.refreshed_at.isoformat()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/approve-ngo/<ngo_id>', methods=['POST'])
+@jwt_required()
+def approve_ngo(ngo_id):
+    """Verify an NGO and queue its approval email"""
+    try:
+        if current_user.role != 'admin':
+            return jsonify({'error': 'Only admins can approve NGOs'}), 403
+        
+        ngo = NGO.objects(id=ngo_id).first()
+        if not ngo:
+            return jsonify({'error': 'NGO not found'}), 404
+        
+        # Conditional, so approving twice sends one email
+        approved = NGO.objects(id=ngo.id, is_verified=False).update_one(
+            set__is_verified=True, set__updated_at=datetime.utcnow()
+        )
+        if approved:
+            identity_cache.invalidate(ngo.reference_id('user'))
+            queue_ngo_approval(ngo.id)
+            ngo.reload()
+        
+        return jsonify({
+            'message': 'NGO approved' if approved else 'NGO was already approved',
+            'ngo': ngo.to_dict()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/tasks', methods=['GET'])
+@jwt_required()
+def get_tasks():
+    """Background task queue: counts per task and status, and the latest tasks"""
+    try:
+        if current_user.role != 'admin':
+            return jsonify({'error': 'Only admins can inspect tasks'}), 403
+        
+        status = request.args.get('status')
+        if status and status not in STATUSES:
+            return jsonify({'error': f'Unknown status: {status}'}), 400
+        
+        query = Task.objects
+        if status:
+            query = query(status=status)
+        if request.args.get('name'):
+            query = query(name=request.args['name'])
+        tasks, page_info = paginate(query, default_per_page=50)
+        
+        return jsonify({
+            **queue_stats(),
+            'tasks': [task.to_dict() for task in tasks],
+            **page_info
+        }), 200
+        
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
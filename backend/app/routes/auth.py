@@ -1,7 +1,14 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import (create_access_token, create_refresh_token, jwt_required, get_current_user,
+                                get_jwt, decode_token)
+from app import response_cache, identity_cache, password_hasher, token_blocklist, mentor_index
 from app.models import User, NGO, Student, Mentor
+from app.utils.expertise import facet_tags, update_expertise_facet
+from app.utils.passwords import PasswordHasherBusy
+from app.utils.profiles import profile_response
+from jwt import PyJWTError
 import uuid
+from datetime import datetime
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -75,6 +82,9 @@ def register():
                 github_url=data.get('githubUrl', '')
             )
             mentor.save()
+            update_expertise_facet([], facet_tags(mentor))
+            mentor_index.refresh(mentor.id)
+            response_cache.invalidate('mentors', 'mentor-expertise')
         
         return jsonify({
             'message': 'Registration successful',
@@ -83,6 +93,8 @@ def register():
             'refresh_token': refresh_token
         }), 201
         
+    except PasswordHasherBusy as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': str(e.retry_after)}
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -103,6 +115,11 @@ def login():
         if not user.is_active:
             return jsonify({'error': 'Account is deactivated'}), 401
         
+        # Upgrade hashes made with an older cost factor while we have the password
+        if user.password_needs_rehash():
+            User.objects(id=user.id).update_one(set__password_hash=password_hasher.hash(data['password']))
+            identity_cache.invalidate(user.id)
+        
         # Generate tokens
         access_token, refresh_token = user.generate_tokens()
         
@@ -113,6 +130,8 @@ def login():
             'refresh_token': refresh_token
         }), 200
         
+    except PasswordHasherBusy as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': str(e.retry_after)}
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -120,13 +139,9 @@ def login():
 @jwt_required(refresh=True)
 def refresh():
     try:
-        current_user_id = get_jwt_identity()
-        user = User.objects(id=current_user_id).first()
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
+        user = get_current_user()
         
-        access_token = create_access_token(identity=str(user.id))
+        access_token = create_access_token(identity=user)
         
         return jsonify({
             'access_token': access_token
@@ -138,42 +153,52 @@ def refresh():
 @auth_bp.route('/logout', methods=['POST'])
 @jwt_required()
 def logout():
+    """Revoke the access token, and the refresh token if one is sent"""
     try:
-        # In a real application, you might want to blacklist the token
+        jwt_data = get_jwt()
+        
+        data = request.get_json(silent=True) or {}
+        refresh_data = None
+        if data.get('refresh_token'):
+            refresh_data = decode_token(data['refresh_token'], allow_expired=True)
+            if refresh_data['sub'] != jwt_data['sub'] or refresh_data.get('type') != 'refresh':
+                return jsonify({'error': 'Invalid refresh token'}), 400
+        
+        token_blocklist.revoke(jwt_data)
+        if refresh_data:
+            token_blocklist.revoke(refresh_data)
+        
         return jsonify({'message': 'Logout successful'}), 200
         
+    except PyJWTError:
+        return jsonify({'error': 'Invalid refresh token'}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@auth_bp.route('/profile', methods=['GET'])
+@auth_bp.route('/logout-all', methods=['POST'])
 @jwt_required()
-def get_profile():
+def logout_all():
+    """Revoke every access and refresh token issued to the user so far"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.objects(id=current_user_id).first()
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        profile_data = user.to_dict()
-        
-        # Add role-specific profile data
-        if user.role == 'student':
-            student = Student.objects(user=user).first()
-            if student:
-                profile_data['student_profile'] = student.to_dict()
-        
-        elif user.role == 'mentor':
-            mentor = Mentor.objects(user=user).first()
-            if mentor:
-                profile_data['mentor_profile'] = mentor.to_dict()
+        user = get_current_user()
+        # Tokens carrying an older version are rejected; the timestamp still
+        # covers tokens issued before the 'ver' claim existed
+        User.objects(id=user.id).update_one(
+            inc__token_version=1,
+            set__tokens_revoked_at=datetime.utcnow().replace(microsecond=0)
+        )
+        identity_cache.invalidate(user.id)
         
-        elif user.role == 'ngo':
-            ngo = NGO.objects(user=user).first()
-            if ngo:
-                profile_data['ngo_profile'] = ngo.to_dict()
+        return jsonify({'message': 'Logged out of all sessions'}), 200
         
-        return jsonify(profile_data), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@auth_bp.route('/profile', methods=['GET'])
+@jwt_required()
+def get_profile():
+    try:
+        return profile_response()
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500 
\ No newline at end of file
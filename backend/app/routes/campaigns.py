@@ -1,73 +1,150 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models import Campaign, CampaignUpdate, User, NGO
+from flask_jwt_extended import jwt_required, current_user
+from app import response_cache
+from app.models import Campaign, CampaignUpdate
+from app.utils.export import export_response, parse_date, InvalidExport
+from app.utils.fieldsets import ALWAYS_LOADED, requested_fields, project, references, InvalidFieldset
+from app.utils.http_cache import compute_etag, document_version, page_etag, not_modified, with_etag
+from app.utils.identity import get_current_profile
+from app.utils.pagination import paginate, InvalidCursor
+from app.utils.platform_stats import (
+    get_platform_stats, campaign_snapshot, record_campaign_created,
+    record_campaign_updated, record_campaign_deleted
+)
+from app.utils.search import search_campaigns
+from app.utils.serializers import serialize_page
+from app.utils.user_stats import record_user_campaigns
 from datetime import datetime, timedelta
 
 campaigns_bp = Blueprint('campaigns', __name__)
 
+CAMPAIGN_EXPORT_COLUMNS = [
+    ('id', lambda c: str(c.id)),
+    ('title', lambda c: c.title),
+    ('category', lambda c: c.category),
+    ('status', lambda c: c.status),
+    ('goal_amount', lambda c: c.goal_amount),
+    ('raised_amount', lambda c: c.raised_amount),
+    ('location', lambda c: c.location),
+    ('ngo_id', lambda c: c.reference_id('ngo')),
+    ('ngo_name', lambda c: c.ngo_name),
+    ('start_date', lambda c: c.start_date),
+    ('end_date', lambda c: c.end_date),
+    ('created_at', lambda c: c.created_at)
+]
+
 @campaigns_bp.route('/', methods=['GET'])
+@response_cache.cached(tags=['campaigns'])
 def get_campaigns():
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
         category = request.args.get('category')
         search = request.args.get('search')
         status = request.args.get('status', 'active')
+        fields = requested_fields('campaign')
         
-        # Build query
-        query = Campaign.objects
+        # Build query, reading only the fields the response needs
+        query = project(Campaign.objects, 'campaign', fields)
         
         # Apply filters
         if category and category != 'all':
             query = query.filter(category=category)
         
-        if search:
-            query = query.filter(
-                title__icontains=search
-            ) | query.filter(
-                description__icontains=search
-            )
-        
         if status:
             query = query.filter(status=status)
         
-        # Order by creation date
-        query = query.order_by('-created_at')
+        # Ranked full-text search, otherwise newest first
+        if search:
+            query = search_campaigns(query, search)
         
-        # Paginate
-        total = query.count()
-        campaigns = query.skip((page - 1) * per_page).limit(per_page)
+        campaigns, page_info = paginate(query, default_per_page=10, ranked=bool(search))
         
-        return jsonify({
-            'campaigns': [campaign.to_dict() for campaign in campaigns],
-            'total': total,
-            'pages': (total + per_page - 1) // per_page,
-            'current_page': page,
-            'per_page': per_page
-        }), 200
+        related = references('campaign', fields)
+        # days_left follows the UTC date, so the tag does too
+        etag = page_etag(campaigns, *related, extra=(page_info, datetime.utcnow().date().isoformat()))
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
+        
+        return with_etag((jsonify({
+            'campaigns': serialize_page(campaigns, *related, only=fields),
+            **page_info
+        }), 200), etag)
         
+    except (InvalidCursor, InvalidFieldset) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@campaigns_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_campaigns():
+    """Stream campaigns as CSV or NDJSON; NGOs get their own campaigns"""
+    try:
+        query = Campaign.objects.only(*ALWAYS_LOADED, 'title', 'category', 'status', 'goal_amount',
+                                      'raised_amount', 'location', 'ngo', 'ngo_name',
+                                      'start_date', 'end_date')
+        
+        if current_user.role == 'ngo':
+            ngo = get_current_profile()
+            if not ngo:
+                return jsonify({'error': 'NGO profile not found'}), 404
+            query = query(ngo=ngo)
+        elif current_user.role != 'admin':
+            return jsonify({'error': 'Only NGOs and admins can export campaigns'}), 403
+        
+        if request.args.get('category'):
+            query = query(category=request.args['category'])
+        if request.args.get('status'):
+            query = query(status=request.args['status'])
+        date_from = parse_date(request.args.get('from'), 'from')
+        date_to = parse_date(request.args.get('to'), 'to')
+        if date_from:
+            query = query(created_at__gte=date_from)
+        if date_to:
+            query = query(created_at__lt=date_to)
+        
+        return export_response(
+            query.order_by('-created_at', '-id'),
+            CAMPAIGN_EXPORT_COLUMNS,
+            request.args.get('format', 'csv'),
+            'campaigns'
+        )
+        
+    except InvalidExport as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @campaigns_bp.route('/<campaign_id>', methods=['GET'])
+@response_cache.cached(tags=lambda campaign_id: ['campaign-details', f'campaign:{campaign_id}'])
 def get_campaign(campaign_id):
     try:
-        campaign = Campaign.objects(id=campaign_id).first()
+        fields = requested_fields('campaign')
+        campaign = project(Campaign.objects(id=campaign_id), 'campaign', fields).first()
         if not campaign:
             return jsonify({'error': 'Campaign not found'}), 404
         
-        # Get recent donations (we'll implement this later)
-        recent_donations = []  # TODO: Implement donation query
+        # Donations and updates bump the campaign's updated_at, so it versions the whole page;
+        # days_left follows the UTC date
+        etag = compute_etag(document_version(campaign), datetime.utcnow().date().isoformat())
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
         
-        # Get campaign updates
-        updates = CampaignUpdate.objects(campaign=campaign).order_by('-created_at')
+        campaign_data = campaign.to_dict(fields=fields)
         
-        campaign_data = campaign.to_dict()
-        campaign_data['recent_donations'] = [donation.to_dict() for donation in recent_donations]
-        campaign_data['updates'] = [update.to_dict() for update in updates]
+        if fields is None or 'recent_donations' in fields:
+            # Kept on the campaign by the donation write path, newest first
+            campaign_data['recent_donations'] = [donation.to_dict() for donation in campaign.recent_donations]
         
-        return jsonify(campaign_data), 200
+        if fields is None or 'updates' in fields:
+            updates = CampaignUpdate.objects(campaign=campaign).order_by('-created_at')
+            campaign_data['updates'] = [update.to_dict() for update in updates]
         
+        return with_etag((jsonify(campaign_data), 200), etag)
+        
+    except InvalidFieldset as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -75,13 +152,10 @@ def get_campaign(campaign_id):
 @jwt_required()
 def create_campaign():
     try:
-        current_user_id = get_jwt_identity()
-        user = User.objects(id=current_user_id).first()
-        
-        if user.role != 'ngo':
+        if current_user.role != 'ngo':
             return jsonify({'error': 'Only NGOs can create campaigns'}), 403
         
-        ngo = NGO.objects(user=user).first()
+        ngo = get_current_profile()
         if not ngo:
             return jsonify({'error': 'NGO profile not found'}), 404
         
@@ -103,9 +177,13 @@ def create_campaign():
             image_url=data.get('imageUrl'),
             location=data.get('location'),
             ngo=ngo,
+            ngo_name=ngo.name,
             end_date=datetime.utcnow() + timedelta(days=30)  # Default 30 days
         )
         campaign.save()
+        record_campaign_created(campaign)
+        record_user_campaigns(current_user.id, 1)
+        response_cache.invalidate('campaigns', 'campaign-stats')
         
         return jsonify({
             'message': 'Campaign created successfully',
@@ -119,10 +197,7 @@ def create_campaign():
 @jwt_required()
 def update_campaign(campaign_id):
     try:
-        current_user_id = get_jwt_identity()
-        user = User.objects(id=current_user_id).first()
-        
-        if user.role != 'ngo':
+        if current_user.role != 'ngo':
             return jsonify({'error': 'Only NGOs can update campaigns'}), 403
         
         campaign = Campaign.objects(id=campaign_id).first()
@@ -130,10 +205,12 @@ def update_campaign(campaign_id):
             return jsonify({'error': 'Campaign not found'}), 404
         
         # Check if user owns this campaign
-        if campaign.ngo.user.id != current_user_id:
+        ngo = get_current_profile()
+        if not ngo or campaign.reference_id('ngo') != str(ngo.id):
             return jsonify({'error': 'You can only update your own campaigns'}), 403
         
         data = request.get_json()
+        before = campaign_snapshot(campaign)
         
         # Update fields
         if data.get('title'):
@@ -154,6 +231,8 @@ def update_campaign(campaign_id):
             campaign.status = data['status']
         
         campaign.save()
+        record_campaign_updated(before, campaign)
+        response_cache.invalidate('campaigns', f'campaign:{campaign_id}', 'campaign-stats')
         
         return jsonify({
             'message': 'Campaign updated successfully',
@@ -167,10 +246,7 @@ def update_campaign(campaign_id):
 @jwt_required()
 def delete_campaign(campaign_id):
     try:
-        current_user_id = get_jwt_identity()
-        user = User.objects(id=current_user_id).first()
-        
-        if user.role != 'ngo':
+        if current_user.role != 'ngo':
             return jsonify({'error': 'Only NGOs can delete campaigns'}), 403
         
         campaign = Campaign.objects(id=campaign_id).first()
@@ -178,10 +254,14 @@ def delete_campaign(campaign_id):
             return jsonify({'error': 'Campaign not found'}), 404
         
         # Check if user owns this campaign
-        if campaign.ngo.user.id != current_user_id:
+        ngo = get_current_profile()
+        if not ngo or campaign.reference_id('ngo') != str(ngo.id):
             return jsonify({'error': 'You can only delete your own campaigns'}), 403
         
         campaign.delete()
+        record_campaign_deleted(campaign)
+        record_user_campaigns(current_user.id, -1)
+        response_cache.invalidate('campaigns', f'campaign:{campaign_id}', 'campaign-stats')
         
         return jsonify({'message': 'Campaign deleted successfully'}), 200
         
@@ -192,14 +272,14 @@ def delete_campaign(campaign_id):
 @jwt_required()
 def add_campaign_update(campaign_id):
     try:
-        current_user_id = get_jwt_identity()
         campaign = Campaign.objects(id=campaign_id).first()
         
         if not campaign:
             return jsonify({'error': 'Campaign not found'}), 404
         
         # Check if user owns this campaign
-        if campaign.ngo.user.id != current_user_id:
+        ngo = get_current_profile()
+        if current_user.role != 'ngo' or not ngo or campaign.reference_id('ngo') != str(ngo.id):
             return jsonify({'error': 'Unauthorized'}), 403
         
         data = request.get_json()
@@ -213,6 +293,8 @@ def add_campaign_update(campaign_id):
             content=data['content']
         )
         update.save()
+        Campaign.objects(id=campaign.id).update_one(set__updated_at=datetime.utcnow())
+        response_cache.invalidate(f'campaign:{campaign_id}')
         
         return jsonify({
             'message': 'Update added successfully',
@@ -223,6 +305,7 @@ def add_campaign_update(campaign_id):
         return jsonify({'error': str(e)}), 500
 
 @campaigns_bp.route('/categories', methods=['GET'])
+@response_cache.cached(ttl=3600)
 def get_categories():
     categories = [
         {'value': 'scholarship', 'label': 'Scholarships', 'icon': '🎓'},
@@ -233,20 +316,18 @@ def get_categories():
     return jsonify(categories), 200
 
 @campaigns_bp.route('/stats', methods=['GET'])
+@response_cache.cached(tags=['campaign-stats'])
 def get_stats():
     try:
-        total_campaigns = Campaign.objects.count()
-        active_campaigns = Campaign.objects(status='active').count()
-        total_goal = sum(campaign.goal_amount for campaign in Campaign.objects)
-        total_raised = sum(campaign.raised_amount for campaign in Campaign.objects)
+        stats = get_platform_stats()
         
-        overall_progress = (total_raised / total_goal * 100) if total_goal > 0 else 0
+        overall_progress = (stats.total_raised / stats.total_goal * 100) if stats.total_goal > 0 else 0
         
         return jsonify({
-            'total_campaigns': total_campaigns,
-            'active_campaigns': active_campaigns,
-            'total_goal': total_goal,
-            'total_raised': total_raised,
+            'total_campaigns': stats.total_campaigns,
+            'active_campaigns': stats.active_campaigns,
+            'total_goal': stats.total_goal,
+            'total_raised': stats.total_raised,
             'overall_progress': overall_progress
         }), 200
         
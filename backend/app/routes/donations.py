@@ -1,28 +1,59 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models import Donation, Campaign, User
+from flask_jwt_extended import jwt_required, current_user, get_current_user
+from app import response_cache
+from app.models import Donation, Campaign
+from app.utils.http_cache import page_etag, not_modified, with_etag
+from app.utils.pagination import paginate, InvalidCursor
+from app.utils.donation_import import import_donations, guess_format, ImportFormatError
+from app.utils.donation_ledger import commit_donation, RECOVERY_GRACE
+from app.utils.export import export_response, parse_date, parse_id, InvalidExport
+from app.utils.identity import get_current_profile
+from app.utils.platform_stats import get_platform_stats
+from app.utils.rollups import window_totals, trend, InvalidWindow
+from app.utils.serializers import serialize_page
+from app.utils.task_handlers import queue_donation_receipt
 import uuid
+from mongoengine import NotUniqueError
+from datetime import datetime, timedelta
 
 donations_bp = Blueprint('donations', __name__)
 
+# Rejected rows listed in an import response; the count covers all of them
+MAX_REPORTED_REJECTIONS = 1000
+
+DONATION_EXPORT_COLUMNS = [
+    ('id', lambda d: str(d.id)),
+    ('created_at', lambda d: d.created_at),
+    ('amount', lambda d: d.amount),
+    ('status', lambda d: d.status),
+    ('payment_method', lambda d: d.payment_method),
+    ('transaction_id', lambda d: d.transaction_id),
+    ('donor_id', lambda d: d.reference_id('donor')),
+    ('donor_name', lambda d: d.get_donor_name()),
+    ('campaign_id', lambda d: d.reference_id('campaign')),
+    ('campaign_title', lambda d: d.campaign.title if d.campaign else None),
+    ('is_anonymous', lambda d: d.is_anonymous),
+    ('message', lambda d: d.message)
+]
+
 @donations_bp.route('/', methods=['GET'])
 def get_all_donations():
     """Get all donations (for admin purposes)"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        donations, page_info = paginate(Donation.objects.all(), default_per_page=20)
         
-        donations = Donation.objects.all().order_by('-created_at')
-        total = donations.count()
-        donations = donations.skip((page - 1) * per_page).limit(per_page)
+        etag = page_etag(donations, 'donor', 'campaign', extra=page_info)
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
         
-        return jsonify({
-            'donations': [donation.to_dict() for donation in donations],
-            'total': total,
-            'pages': (total + per_page - 1) // per_page,
-            'current_page': page
-        }), 200
+        return with_etag((jsonify({
+            'donations': serialize_page(donations, 'donor', 'campaign'),
+            **page_info
+        }), 200), etag)
         
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -30,7 +61,7 @@ def get_all_donations():
 @jwt_required()
 def create_donation():
     try:
-        current_user_id = get_jwt_identity()
+        donor = get_current_user()
         data = request.get_json()
         
         if not data.get('amount') or not data.get('campaignId'):
@@ -40,29 +71,60 @@ def create_donation():
         if amount <= 0:
             return jsonify({'error': 'Amount must be greater than 0'}), 400
         
-        campaign = Campaign.objects(id=data['campaignId']).first()
+        campaign = Campaign.objects(id=data['campaignId']).only('id', 'title', 'ngo').first()
         if not campaign:
             return jsonify({'error': 'Campaign not found'}), 404
         
-        donor = User.objects(id=current_user_id).first()
-        if not donor:
-            return jsonify({'error': 'User not found'}), 404
+        # Clients may send an Idempotency-Key so a retried request never donates twice
+        idempotency_key = request.headers.get('Idempotency-Key')
+        transaction_id = idempotency_key or str(uuid.uuid4())
         
-        # Create donation
+        # Create donation; it stays pending until applied to the campaign
         donation = Donation(
             amount=amount,
             donor=donor,
             campaign=campaign,
             payment_method=data.get('paymentMethod', 'online'),
-            transaction_id=str(uuid.uuid4()),
-            status='completed',  # In real app, this would be 'pending' until payment is confirmed
+            transaction_id=transaction_id,
+            ledger_key=transaction_id,
+            status='pending',
             is_anonymous=data.get('isAnonymous', False),
             message=data.get('message', '')
         )
-        donation.save()
+        try:
+            donation.save()
+        except NotUniqueError:
+            # Retry of an earlier request: finish it if needed and return it
+            donation = Donation.objects(transaction_id=transaction_id).first()
+            if (donation.reference_id('donor') != str(donor.id)
+                    or donation.reference_id('campaign') != str(campaign.id)
+                    or donation.amount != amount):
+                return jsonify({'error': 'Idempotency key already used'}), 409
+            if donation.status in ('pending', 'applying'):
+                # Another request or recovery holds it, or the original request
+                # may still claim it; leave it to them
+                if donation.status == 'applying' or donation.created_at > datetime.utcnow() - RECOVERY_GRACE:
+                    return jsonify({
+                        'message': 'Donation is being processed',
+                        'donation': donation.to_dict()
+                    }), 202
+                if commit_donation(donation).status != 'completed':
+                    return jsonify({
+                        'message': 'Donation is being processed',
+                        'donation': donation.to_dict()
+                    }), 202
+                response_cache.invalidate('campaigns', f"campaign:{donation.reference_id('campaign')}",
+                                          'campaign-stats')
+                queue_donation_receipt(donation, donor.id)
+            return jsonify({
+                'message': 'Donation already recorded',
+                'donation': donation.to_dict()
+            }), 200
         
-        # Update campaign raised amount
-        campaign.update_raised_amount(amount)
+        # Atomically add to the campaign's raised amount and complete the donation
+        commit_donation(donation)
+        response_cache.invalidate('campaigns', f'campaign:{campaign.id}', 'campaign-stats')
+        queue_donation_receipt(donation, donor.id)
         
         return jsonify({
             'message': 'Donation successful',
@@ -72,27 +134,115 @@ def create_donation():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@donations_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_donations_file():
+    """Bulk import offline donations from a CSV or NDJSON upload"""
+    try:
+        # NGOs may only import into their own campaigns
+        if current_user.role == 'ngo':
+            ngo = get_current_profile()
+            if not ngo:
+                return jsonify({'error': 'NGO profile not found'}), 404
+            campaign_filter = {'ngo': ngo}
+        elif current_user.role == 'admin':
+            campaign_filter = {}
+        else:
+            return jsonify({'error': 'Only NGOs and admins can import donations'}), 403
+        
+        # Either a multipart file upload or the raw request body
+        upload = request.files.get('file')
+        if upload:
+            stream, filename = upload.stream, upload.filename
+        else:
+            stream, filename = request.stream, None
+        fmt = request.args.get('format') or guess_format(filename, request.mimetype)
+        
+        rejected_rows = []
+        
+        def on_reject(row_number, reason):
+            if len(rejected_rows) < MAX_REPORTED_REJECTIONS:
+                rejected_rows.append({'row': row_number, 'reason': reason})
+        
+        summary = import_donations(stream, fmt, campaign_filter=campaign_filter, on_reject=on_reject)
+        response_cache.invalidate('campaigns', 'campaign-details', 'campaign-stats')
+        summary['rejected_rows'] = rejected_rows
+        
+        return jsonify({
+            'message': 'Import finished',
+            **summary
+        }), 200
+        
+    except ImportFormatError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@donations_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_donations():
+    """Stream donations as CSV or NDJSON, filtered by donor, campaign, status and date"""
+    try:
+        query = Donation.objects
+        
+        # NGOs may only export donations to their own campaigns
+        if current_user.role == 'ngo':
+            ngo = get_current_profile()
+            if not ngo:
+                return jsonify({'error': 'NGO profile not found'}), 404
+            query = query(campaign__in=list(Campaign.objects(ngo=ngo).scalar('id')))
+        elif current_user.role != 'admin':
+            return jsonify({'error': 'Only NGOs and admins can export donations'}), 403
+        
+        donor_id = parse_id(request.args.get('donor'), 'donor')
+        campaign_id = parse_id(request.args.get('campaign'), 'campaign')
+        if donor_id:
+            query = query(donor=donor_id)
+        if campaign_id:
+            query = query(campaign=campaign_id)
+        if request.args.get('status'):
+            query = query(status=request.args['status'])
+        date_from = parse_date(request.args.get('from'), 'from')
+        date_to = parse_date(request.args.get('to'), 'to')
+        if date_from:
+            query = query(created_at__gte=date_from)
+        if date_to:
+            query = query(created_at__lt=date_to)
+        
+        return export_response(
+            query.order_by('-created_at', '-id'),
+            DONATION_EXPORT_COLUMNS,
+            request.args.get('format', 'csv'),
+            'donations',
+            references=('donor', 'campaign')
+        )
+        
+    except InvalidExport as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @donations_bp.route('/campaign/<campaign_id>', methods=['GET'])
 def get_campaign_donations(campaign_id):
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
-        
         campaign = Campaign.objects(id=campaign_id).first()
         if not campaign:
             return jsonify({'error': 'Campaign not found'}), 404
         
-        donations = Donation.objects(campaign=campaign).order_by('-created_at')
-        total = donations.count()
-        donations = donations.skip((page - 1) * per_page).limit(per_page)
+        donations, page_info = paginate(Donation.objects(campaign=campaign), default_per_page=20)
         
-        return jsonify({
-            'donations': [donation.to_dict() for donation in donations],
-            'total': total,
-            'pages': (total + per_page - 1) // per_page,
-            'current_page': page
-        }), 200
+        etag = page_etag(donations, 'donor', 'campaign', extra=page_info)
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
+        
+        return with_etag((jsonify({
+            'donations': serialize_page(donations, 'donor', 'campaign'),
+            **page_info
+        }), 200), etag)
         
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -100,46 +250,67 @@ def get_campaign_donations(campaign_id):
 @jwt_required()
 def get_user_donations():
     try:
-        current_user_id = get_jwt_identity()
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
+        donations, page_info = paginate(Donation.objects(donor=current_user.id), default_per_page=10)
         
-        user = User.objects(id=current_user_id).first()
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
+        etag = page_etag(donations, 'donor', 'campaign', extra=page_info)
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
         
-        donations = Donation.objects(donor=user).order_by('-created_at')
-        total = donations.count()
-        donations = donations.skip((page - 1) * per_page).limit(per_page)
+        return with_etag((jsonify({
+            'donations': serialize_page(donations, 'donor', 'campaign'),
+            **page_info
+        }), 200), etag)
+        
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@donations_bp.route('/stats', methods=['GET'])
+def get_donation_stats():
+    try:
+        stats = get_platform_stats()
+        
+        # Recent donations (last 30 days), summed from rollup buckets
+        now = datetime.utcnow()
+        recent = window_totals(now - timedelta(days=30), now)
         
         return jsonify({
-            'donations': [donation.to_dict() for donation in donations],
-            'total': total,
-            'pages': (total + per_page - 1) // per_page,
-            'current_page': page
+            'total_donations': stats.donation_count,
+            'total_amount': stats.donation_amount,
+            'recent_donations': recent['count'],
+            'recent_amount': recent['amount']
         }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@donations_bp.route('/stats', methods=['GET'])
-def get_donation_stats():
+@donations_bp.route('/trend', methods=['GET'])
+@response_cache.cached(ttl=60)
+def get_donation_trend():
+    """Donation count and amount per hour or day, globally or for one campaign, category or NGO"""
     try:
-        total_donations = Donation.objects(status='completed').count()
-        total_amount = sum(donation.amount for donation in Donation.objects(status='completed'))
+        granularity = request.args.get('granularity', 'day')
+        scope = request.args.get('scope', 'global')
+        scope_id = request.args.get('id', '')
         
-        # Get recent donations (last 30 days)
-        from datetime import datetime, timedelta
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_donations = Donation.objects(status='completed', created_at__gte=thirty_days_ago).count()
-        recent_amount = sum(donation.amount for donation in Donation.objects(status='completed', created_at__gte=thirty_days_ago))
+        end = parse_date(request.args.get('to'), 'to') or datetime.utcnow()
+        default_span = timedelta(hours=48) if granularity == 'hour' else timedelta(days=30)
+        start = parse_date(request.args.get('from'), 'from') or end - default_span
+        
+        points = trend(start, end, granularity=granularity, scope=scope, scope_id=scope_id)
         
         return jsonify({
-            'total_donations': total_donations,
-            'total_amount': total_amount,
-            'recent_donations': recent_donations,
-            'recent_amount': recent_amount
+            'granularity': granularity,
+            'scope': scope,
+            'id': scope_id or None,
+            'points': points,
+            'total_count': sum(point['count'] for point in points),
+            'total_amount': sum(point['amount'] for point in points)
         }), 200
         
+    except (InvalidWindow, InvalidExport) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        return jsonify({'error': str(e)}), 500 
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
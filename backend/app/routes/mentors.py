@@ -1,35 +1,111 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models import Mentor, Student, Mentorship, User
-from datetime import datetime
+from flask_jwt_extended import jwt_required, current_user
+from app import response_cache, identity_cache, mentor_index
+from app.models import Mentor, Mentorship, Student
+from app.utils.expertise import expertise_facet
+from app.utils.fieldsets import RESOURCES, requested_fields, project, references, InvalidFieldset
+from app.utils.http_cache import page_etag, not_modified, with_etag
+from app.utils.identity import get_current_profile
+from app.utils.matching import student_terms, MAX_MATCHES
+from app.utils.mentorships import (accept_mentorship, reject_mentorship, close_mentorship, serialize_inbox,
+                                   status_counts, CLOSED_STATUSES, MENTORSHIP_STATUSES, SEAT_HOLDING_STATUSES,
+                                   MentorAtCapacity, MentorshipConflict)
+from app.utils.pagination import paginate, InvalidCursor
+from app.utils.serializers import prefetch_related, serialize_page
+from app.utils.tags import normalize_tag, parse_tags
+from app.utils.task_handlers import queue_mentorship_notification
+from app.utils.user_stats import record_user_mentored
+from bson import ObjectId
 
 mentors_bp = Blueprint('mentors', __name__)
 
+def _find_mentorship(request_id):
+    if not ObjectId.is_valid(request_id):
+        return None
+    return Mentorship.objects(id=request_id).first()
+
+def _profile_user_id(document_class, profile_id):
+    profile = document_class.objects(id=profile_id).only('user').first()
+    return profile.reference_id('user') if profile else None
+
+def _capacity_changed(mentor_id, user_id):
+    mentor_index.refresh(mentor_id)
+    identity_cache.invalidate(user_id)
+    response_cache.invalidate('mentors')
+
 @mentors_bp.route('/', methods=['GET'])
+@response_cache.cached(tags=['mentors'])
 def get_mentors():
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
-        expertise = request.args.get('expertise')
+        # expertise matches one tag; expertise_any / expertise_all take comma-separated tags
+        expertise = normalize_tag(request.args.get('expertise', ''))
+        expertise_any = parse_tags(request.args.get('expertise_any'))
+        expertise_all = parse_tags(request.args.get('expertise_all'))
         available = request.args.get('available', 'true').lower() == 'true'
+        fields = requested_fields('mentor')
         
-        query = Mentor.objects
+        query = project(Mentor.objects, 'mentor', fields)
         
         if expertise:
-            query = query.filter(expertise__icontains=expertise)
+            query = query.filter(expertise_tags=expertise)
+        if expertise_any:
+            query = query.filter(expertise_tags__in=expertise_any)
+        if expertise_all:
+            query = query.filter(expertise_tags__all=expertise_all)
         
         if available:
             query = query.filter(is_available=True)
         
-        total = query.count()
-        mentors = query.skip((page - 1) * per_page).limit(per_page)
+        mentors, page_info = paginate(query, default_per_page=10)
         
-        return jsonify({
-            'mentors': [mentor.to_dict() for mentor in mentors],
-            'total': total,
-            'pages': (total + per_page - 1) // per_page,
-            'current_page': page
-        }), 200
+        related = references('mentor', fields)
+        etag = page_etag(mentors, *related, extra=page_info)
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
+        
+        return with_etag((jsonify({
+            'mentors': serialize_page(mentors, *related, only=fields),
+            **page_info
+        }), 200), etag)
+        
+    except (InvalidCursor, InvalidFieldset) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@mentors_bp.route('/matches', methods=['GET'])
+@jwt_required()
+def get_mentor_matches():
+    """Available mentors best matching the current student's interests and goals"""
+    try:
+        if current_user.role != 'student':
+            return jsonify({'error': 'Only students can get mentor matches'}), 403
+        
+        student = get_current_profile()
+        if not student:
+            return jsonify({'error': 'Student profile not found'}), 404
+        
+        limit = max(1, min(request.args.get('limit', 10, type=int), MAX_MATCHES))
+        matches = mentor_index.match(student_terms(student), limit=limit)
+        
+        # One query for the mentors and one for their users
+        mentors = Mentor.objects(id__in=[mentor_id for mentor_id, _, _, _ in matches])
+        mentors = {str(mentor.id): mentor for mentor in prefetch_related(mentors, 'user')}
+        fields = set(RESOURCES['mentor']['views']['card'])
+        
+        results = []
+        for mentor_id, score, relevance, matched_terms in matches:
+            mentor = mentors.get(mentor_id)
+            if mentor:
+                results.append({
+                    'mentor': mentor.to_dict(fields=fields),
+                    'score': round(score, 4),
+                    'relevance': round(relevance, 4),
+                    'matched_terms': matched_terms
+                })
+        
+        return jsonify({'matches': results}), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -37,12 +113,20 @@ def get_mentors():
 @mentors_bp.route('/<mentor_id>', methods=['GET'])
 def get_mentor(mentor_id):
     try:
-        mentor = Mentor.objects(id=mentor_id).first()
+        fields = requested_fields('mentor')
+        mentor = project(Mentor.objects(id=mentor_id), 'mentor', fields).first()
         if not mentor:
             return jsonify({'error': 'Mentor not found'}), 404
         
-        return jsonify(mentor.to_dict()), 200
+        etag = page_etag([mentor], *references('mentor', fields))
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
+        
+        return with_etag((jsonify(mentor.to_dict(fields=fields)), 200), etag)
         
+    except InvalidFieldset as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -50,13 +134,10 @@ def get_mentor(mentor_id):
 @jwt_required()
 def request_mentorship():
     try:
-        current_user_id = get_jwt_identity()
-        user = User.objects(id=current_user_id).first()
-        
-        if user.role != 'student':
+        if current_user.role != 'student':
             return jsonify({'error': 'Only students can request mentorship'}), 403
         
-        student = Student.objects(user=user).first()
+        student = get_current_profile()
         if not student:
             return jsonify({'error': 'Student profile not found'}), 404
         
@@ -89,6 +170,7 @@ def request_mentorship():
             status='pending'
         )
         mentorship.save()
+        queue_mentorship_notification(mentorship, 'requested', mentor.reference_id('user'))
         
         return jsonify({
             'message': 'Mentorship request sent successfully',
@@ -101,82 +183,133 @@ def request_mentorship():
 @mentors_bp.route('/requests', methods=['GET'])
 @jwt_required()
 def get_mentorship_requests():
+    """The current mentor's requests, newest first, optionally of one status, with counts per status"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.objects(id=current_user_id).first()
-        
-        if user.role != 'mentor':
+        if current_user.role != 'mentor':
             return jsonify({'error': 'Only mentors can view requests'}), 403
         
-        mentor = Mentor.objects(user=user).first()
+        mentor = get_current_profile()
         if not mentor:
             return jsonify({'error': 'Mentor profile not found'}), 404
         
-        requests = Mentorship.objects(mentor=mentor).order_by('-created_at')
+        status = request.args.get('status')
+        if status and status not in MENTORSHIP_STATUSES:
+            return jsonify({'error': f'Unknown status: {status}'}), 400
+        
+        query = Mentorship.objects(mentor=mentor.id)
+        if status:
+            query = query(status=status)
+        mentorships, page_info = paginate(query, default_per_page=20)
         
         return jsonify({
-            'requests': [req.to_dict() for req in requests]
+            'requests': serialize_inbox(mentorships),
+            'counts': status_counts(mentor.id),
+            **page_info
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@mentors_bp.route('/requests/<int:request_id>/respond', methods=['POST'])
+@mentors_bp.route('/requests/<request_id>/respond', methods=['POST'])
 @jwt_required()
 def respond_to_mentorship_request(request_id):
     try:
-        current_user_id = get_jwt_identity()
-        user = User.objects(id=current_user_id).first()
-        
-        if user.role != 'mentor':
+        if current_user.role != 'mentor':
             return jsonify({'error': 'Only mentors can respond to requests'}), 403
         
-        mentor = Mentor.objects(user=user).first()
+        mentor = get_current_profile()
         if not mentor:
             return jsonify({'error': 'Mentor profile not found'}), 404
         
-        mentorship = Mentorship.objects(id=request_id).first()
+        mentorship = _find_mentorship(request_id)
+        if not mentorship:
+            return jsonify({'error': 'Mentorship request not found'}), 404
         
-        if mentorship.mentor != mentor:
+        if mentorship.reference_id('mentor') != str(mentor.id):
             return jsonify({'error': 'Unauthorized'}), 403
         
         data = request.get_json()
         response = data.get('response')  # 'accept' or 'reject'
         
         if response == 'accept':
-            if not mentor.can_accept_student():
-                return jsonify({'error': 'Cannot accept more students'}), 400
-            
-            mentorship.status = 'active'
-            mentorship.start_date = datetime.utcnow()
-            mentor.current_students += 1
-            
+            accept_mentorship(mentorship)
+            record_user_mentored(current_user.id)
+            _capacity_changed(mentor.id, mentor.reference_id('user'))
         elif response == 'reject':
-            mentorship.status = 'rejected'
+            reject_mentorship(mentorship)
+        else:
+            return jsonify({'error': "Response must be 'accept' or 'reject'"}), 400
         
-        mentorship.save()
+        queue_mentorship_notification(mentorship, f'{response}ed',
+                                      _profile_user_id(Student, mentorship.reference_id('student')))
         
         return jsonify({
             'message': f'Mentorship request {response}ed successfully',
             'mentorship': mentorship.to_dict()
         }), 200
         
+    except MentorAtCapacity as e:
+        return jsonify({'error': str(e)}), 400
+    except MentorshipConflict as e:
+        return jsonify({'error': str(e)}), 409
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@mentors_bp.route('/expertise', methods=['GET'])
-def get_expertise_areas():
+@mentors_bp.route('/requests/<request_id>/close', methods=['POST'])
+@jwt_required()
+def close_mentorship_request(request_id):
+    """Complete or cancel a mentorship (its mentor or student); frees the mentor's seat"""
     try:
-        # Get unique expertise areas from mentors
-        mentors = Mentor.objects(is_available=True)
-        expertise_areas = set()
+        if current_user.role not in ('mentor', 'student'):
+            return jsonify({'error': 'Only mentors and students can close mentorships'}), 403
+        
+        profile = get_current_profile()
+        if not profile:
+            return jsonify({'error': f'{current_user.role.capitalize()} profile not found'}), 404
+        
+        mentorship = _find_mentorship(request_id)
+        if not mentorship:
+            return jsonify({'error': 'Mentorship request not found'}), 404
+        
+        if mentorship.reference_id(current_user.role) != str(profile.id):
+            return jsonify({'error': 'Unauthorized'}), 403
+        
+        data = request.get_json()
+        status = data.get('status')
+        if status not in CLOSED_STATUSES:
+            return jsonify({'error': "Status must be 'completed' or 'cancelled'"}), 400
+        if status == 'completed' and current_user.role != 'mentor':
+            return jsonify({'error': 'Only the mentor can complete a mentorship'}), 403
+        
+        previous = close_mentorship(mentorship, status)
+        mentor_user_id = _profile_user_id(Mentor, mentorship.reference_id('mentor'))
+        if previous in SEAT_HOLDING_STATUSES:
+            _capacity_changed(mentorship.reference_id('mentor'), mentor_user_id)
+        
+        if current_user.role == 'mentor':
+            recipient_id = _profile_user_id(Student, mentorship.reference_id('student'))
+        else:
+            recipient_id = mentor_user_id
+        queue_mentorship_notification(mentorship, status, recipient_id)
         
-        for mentor in mentors:
-            if mentor.expertise:
-                areas = [area.strip() for area in mentor.expertise.split(',')]
-                expertise_areas.update(areas)
+        return jsonify({
+            'message': f'Mentorship {status}',
+            'mentorship': mentorship.to_dict()
+        }), 200
         
-        return jsonify(list(expertise_areas)), 200
+    except MentorshipConflict as e:
+        return jsonify({'error': str(e)}), 409
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@mentors_bp.route('/expertise', methods=['GET'])
+@response_cache.cached(tags=['mentor-expertise'])
+def get_expertise_areas():
+    """Expertise tags of available mentors with how many mentors have each"""
+    try:
+        return jsonify(expertise_facet()), 200
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500 
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
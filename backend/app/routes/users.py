@@ -1,27 +1,81 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models import User, Student, Mentor, NGO
+from flask_jwt_extended import jwt_required, current_user, get_current_user
+from app import response_cache, identity_cache, mentor_index
+from app.models import User
+from app.utils.expertise import facet_tags, update_expertise_facet
+from app.utils.export import export_response, parse_date, InvalidExport
+from app.utils.http_cache import page_etag, not_modified, with_etag
+from app.utils.identity import get_current_profile
+from app.utils.pagination import paginate, InvalidCursor
+from app.utils.profiles import profile_response
+from app.utils.search import sync_ngo_name
+from app.utils.serializers import serialize_page
+from app.utils.user_stats import get_user_stats as load_user_stats
 
 users_bp = Blueprint('users', __name__)
 
+USER_EXPORT_COLUMNS = [
+    ('id', lambda u: str(u.id)),
+    ('email', lambda u: u.email),
+    ('first_name', lambda u: u.first_name),
+    ('last_name', lambda u: u.last_name),
+    ('phone', lambda u: u.phone),
+    ('role', lambda u: u.role),
+    ('is_active', lambda u: u.is_active),
+    ('is_verified', lambda u: u.is_verified),
+    ('created_at', lambda u: u.created_at)
+]
+
 @users_bp.route('/', methods=['GET'])
 def get_all_users():
     """Get all users (for admin purposes)"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        users, page_info = paginate(User.objects.all(), default_per_page=20)
         
-        users = User.objects.all().order_by('-created_at')
-        total = users.count()
-        users = users.skip((page - 1) * per_page).limit(per_page)
+        etag = page_etag(users, extra=page_info)
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
         
-        return jsonify({
-            'users': [user.to_dict() for user in users],
-            'total': total,
-            'pages': (total + per_page - 1) // per_page,
-            'current_page': page
-        }), 200
+        return with_etag((jsonify({
+            'users': serialize_page(users),
+            **page_info
+        }), 200), etag)
         
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@users_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_users():
+    """Stream users as CSV or NDJSON (admin only)"""
+    try:
+        if current_user.role != 'admin':
+            return jsonify({'error': 'Only admins can export users'}), 403
+        
+        query = User.objects.exclude('password_hash')
+        if request.args.get('role'):
+            query = query(role=request.args['role'])
+        if request.args.get('is_active'):
+            query = query(is_active=request.args['is_active'].lower() == 'true')
+        date_from = parse_date(request.args.get('from'), 'from')
+        date_to = parse_date(request.args.get('to'), 'to')
+        if date_from:
+            query = query(created_at__gte=date_from)
+        if date_to:
+            query = query(created_at__lt=date_to)
+        
+        return export_response(
+            query.order_by('-created_at', '-id'),
+            USER_EXPORT_COLUMNS,
+            request.args.get('format', 'csv'),
+            'users'
+        )
+        
+    except InvalidExport as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -29,31 +83,7 @@ def get_all_users():
 @jwt_required()
 def get_user_profile():
     try:
-        current_user_id = get_jwt_identity()
-        user = User.objects(id=current_user_id).first()
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        profile_data = user.to_dict()
-        
-        # Add role-specific profile data
-        if user.role == 'student':
-            student = Student.objects(user=user).first()
-            if student:
-                profile_data['student_profile'] = student.to_dict()
-        
-        elif user.role == 'mentor':
-            mentor = Mentor.objects(user=user).first()
-            if mentor:
-                profile_data['mentor_profile'] = mentor.to_dict()
-        
-        elif user.role == 'ngo':
-            ngo = NGO.objects(user=user).first()
-            if ngo:
-                profile_data['ngo_profile'] = ngo.to_dict()
-        
-        return jsonify(profile_data), 200
+        return profile_response()
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -62,12 +92,7 @@ def get_user_profile():
 @jwt_required()
 def update_user_profile():
     try:
-        current_user_id = get_jwt_identity()
-        user = User.objects(id=current_user_id).first()
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
+        user = get_current_user()
         data = request.get_json()
         
         # Update basic user info
@@ -79,10 +104,12 @@ def update_user_profile():
             user.phone = data['phone']
         
         user.save()
+        if user.role == 'mentor':
+            response_cache.invalidate('mentors')
         
         # Update role-specific profile
         if user.role == 'student' and data.get('studentProfile'):
-            student = Student.objects(user=user).first()
+            student = get_current_profile()
             if student:
                 student_data = data['studentProfile']
                 if student_data.get('school'):
@@ -104,9 +131,10 @@ def update_user_profile():
                 student.save()
         
         elif user.role == 'mentor' and data.get('mentorProfile'):
-            mentor = Mentor.objects(user=user).first()
+            mentor = get_current_profile()
             if mentor:
                 mentor_data = data['mentorProfile']
+                tags_before = facet_tags(mentor)
                 if mentor_data.get('company'):
                     mentor.company = mentor_data['company']
                 if mentor_data.get('position'):
@@ -122,11 +150,15 @@ def update_user_profile():
                 if mentor_data.get('githubUrl'):
                     mentor.github_url = mentor_data['githubUrl']
                 mentor.save()
+                update_expertise_facet(tags_before, facet_tags(mentor))
+                mentor_index.refresh(mentor.id)
+                response_cache.invalidate('mentors', 'mentor-expertise')
         
         elif user.role == 'ngo' and data.get('ngoProfile'):
-            ngo = NGO.objects(user=user).first()
+            ngo = get_current_profile()
             if ngo:
                 ngo_data = data['ngoProfile']
+                renamed = bool(ngo_data.get('name')) and ngo_data['name'] != ngo.name
                 if ngo_data.get('name'):
                     ngo.name = ngo_data['name']
                 if ngo_data.get('description'):
@@ -142,6 +174,12 @@ def update_user_profile():
                 if ngo_data.get('country'):
                     ngo.country = ngo_data['country']
                 ngo.save()
+                
+                if renamed:
+                    sync_ngo_name(ngo)
+                    response_cache.invalidate('campaigns', 'campaign-details')
+        
+        identity_cache.invalidate(user.id)
         
         return jsonify({
             'message': 'Profile updated successfully',
@@ -151,37 +189,43 @@ def update_user_profile():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@users_bp.route('/<user_id>/status', methods=['PUT'])
+@jwt_required()
+def set_user_status(user_id):
+    """Activate or deactivate a user account (admin only)"""
+    try:
+        if current_user.role != 'admin':
+            return jsonify({'error': 'Only admins can change account status'}), 403
+        
+        data = request.get_json()
+        if not isinstance(data.get('isActive'), bool):
+            return jsonify({'error': 'isActive must be true or false'}), 400
+        
+        user = User.objects(id=user_id).first()
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        user.is_active = data['isActive']
+        user.save()
+        # Takes effect on this worker's next request; others drop it by TTL
+        identity_cache.invalidate(user.id)
+        
+        return jsonify({
+            'message': 'Account status updated',
+            'user': user.to_dict()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @users_bp.route('/stats', methods=['GET'])
 @jwt_required()
 def get_user_stats():
+    """The current user's donation, campaign and mentoring counters"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.objects(id=current_user_id).first()
-        
-        stats = {
-            'total_donations': 0,
-            'total_amount_donated': 0,
-            'campaigns_created': 0,
-            'students_mentored': 0
-        }
-        
-        if user.role == 'donor':
-            from app.models import Donation
-            donations = Donation.query.filter_by(donor_id=user.id, status='completed').all()
-            stats['total_donations'] = len(donations)
-            stats['total_amount_donated'] = sum(d.amount for d in donations)
-        
-        elif user.role == 'ngo':
-            from app.models import Campaign
-            campaigns = Campaign.query.filter_by(ngo_id=user.ngo.id).all()
-            stats['campaigns_created'] = len(campaigns)
-        
-        elif user.role == 'mentor':
-            from app.models import Mentorship
-            mentorships = Mentorship.query.filter_by(mentor_id=user.mentor.id).all()
-            stats['students_mentored'] = len(mentorships)
-        
-        return jsonify(stats), 200
+        stats = load_user_stats(current_user.id)
+        
+        return jsonify(stats.to_dict()), 200
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500 
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,23 @@
+def _totals(results, accumulators):
+    """First group result without _id, or zeros when nothing matched"""
+    totals = results[0] if results else {}
+    return {name: totals.get(name, 0) for name in accumulators}
+
+
+def group_totals(document_class, accumulators, match=None):
+    """Reduce a collection to a single row of totals on the server.
+
+    ``accumulators`` maps output names to ``$group`` accumulator expressions,
+    e.g. ``{'total': {'$sum': '$amount'}}``. Only the totals travel back; no
+    document is hydrated into a mongoengine object.
+    """
+    pipeline = []
+    if match:
+        pipeline.append({'$match': match})
+    pipeline.append({'$group': {'_id': None, **accumulators}})
+    return _totals(list(document_class.objects.aggregate(pipeline)), accumulators)
+
+
+def count_if(expression):
+    """``$sum`` accumulator counting the documents matching an expression"""
+    return {'$sum': {'$cond': [expression, 1, 0]}}
@@ -0,0 +1,251 @@
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+from app.utils.aggregation import count_if
+
+GLOBAL_KEY = 'global'
+# Signups of the day the last refresh ran in, and of later days, are recounted
+SIGNUP_OVERLAP = timedelta(minutes=10)
+MENTORSHIP_STATUSES = ('pending', 'active', 'completed', 'cancelled', 'rejected')
+
+
+def day_key(moment):
+    return moment.strftime('%Y-%m-%d')
+
+
+def start_of_day(moment):
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def signups_by_day(since):
+    """``{day: {role: count}}`` of users created since a moment, grouped on the server"""
+    from app.models import User
+
+    days = {}
+    for row in User._get_collection().aggregate([
+        {'$match': {'created_at': {'$gte': since}}},
+        {'$group': {
+            '_id': {'day': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$created_at'}}, 'role': '$role'},
+            'count': {'$sum': 1}
+        }}
+    ]):
+        days.setdefault(row['_id']['day'], {})[row['_id']['role'] or 'unknown'] = row['count']
+    return days
+
+
+def campaign_breakdown():
+    """Campaign counts and amounts by category and by status"""
+    from app.models import Campaign
+
+    by_category, by_status = {}, {}
+    for row in Campaign._get_collection().aggregate([
+        {'$group': {
+            '_id': {'category': '$category', 'status': '$status'},
+            'count': {'$sum': 1},
+            'goal': {'$sum': '$goal_amount'},
+            'raised': {'$sum': '$raised_amount'}
+        }}
+    ]):
+        category = row['_id'].get('category') or 'uncategorized'
+        status = row['_id'].get('status') or 'unknown'
+        totals = by_category.setdefault(category, {'count': 0, 'goal': 0.0, 'raised': 0.0, 'by_status': {}})
+        totals['count'] += row['count']
+        totals['goal'] += row['goal']
+        totals['raised'] += row['raised']
+        totals['by_status'][status] = row['count']
+        by_status[status] = by_status.get(status, 0) + row['count']
+    return {'by_category': by_category, 'by_status': by_status}
+
+
+def _rollup_totals(scope):
+    """All-time ``{scope_id: (count, amount)}`` of one rollup scope, from its day buckets"""
+    from app.models import DonationRollup
+
+    return {
+        row['_id']: (row['count'], row['amount'])
+        for row in DonationRollup._get_collection().aggregate([
+            {'$match': {'scope': scope, 'granularity': 'day'}},
+            {'$group': {'_id': '$scope_id', 'count': {'$sum': '$count'}, 'amount': {'$sum': '$amount'}}}
+        ])
+    }
+
+
+def donation_breakdown(since):
+    """Completed donations per day since a moment, and all-time per category and NGO.
+
+    Read from the donation rollups, which the donation write paths already
+    keep current, so the cost does not grow with the number of donations.
+    """
+    from app.models import DonationRollup
+
+    by_day = [
+        {'day': day_key(rollup['bucket']), 'count': rollup['count'], 'amount': rollup['amount']}
+        for rollup in DonationRollup._get_collection().find(
+            {'scope': 'global', 'scope_id': '', 'granularity': 'day', 'bucket': {'$gte': since}}
+        ).sort('bucket', 1)
+    ]
+    by_category = {
+        category: {'count': count, 'amount': amount}
+        for category, (count, amount) in _rollup_totals('category').items()
+    }
+    return {'by_day': by_day, 'by_category': by_category}, _rollup_totals('ngo')
+
+
+def top_ngos(ngo_totals, limit):
+    """The NGOs that raised the most, with their names and campaign counts"""
+    from app.models import Campaign, NGO
+
+    ranked = sorted(ngo_totals.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+    ids = [ObjectId(ngo_id) for ngo_id, _ in ranked if ObjectId.is_valid(ngo_id)]
+    names = {str(ngo['_id']): ngo.get('name') for ngo in NGO._get_collection().find({'_id': {'$in': ids}}, {'name': 1})}
+    campaigns = {
+        str(row['_id']): row['count']
+        for row in Campaign._get_collection().aggregate([
+            {'$match': {'ngo': {'$in': ids}}},
+            {'$group': {'_id': '$ngo', 'count': {'$sum': 1}}}
+        ])
+    }
+    return [
+        {'id': ngo_id, 'name': names.get(ngo_id), 'campaigns': campaigns.get(ngo_id, 0),
+         'donation_count': count, 'donation_amount': amount}
+        for ngo_id, (count, amount) in ranked
+    ]
+
+
+def mentorship_funnel():
+    """Requests by status and the share accepted and completed"""
+    from app.models import Mentorship
+
+    by_status = dict.fromkeys(MENTORSHIP_STATUSES, 0)
+    accepted = 0
+    for row in Mentorship._get_collection().aggregate([
+        {'$group': {
+            '_id': '$status',
+            'count': {'$sum': 1},
+            'accepted': count_if({'$ne': [{'$ifNull': ['$start_date', None]}, None]})
+        }}
+    ]):
+        by_status[row['_id'] or 'unknown'] = row['count']
+        accepted += row['accepted']
+
+    requested = sum(by_status.values())
+    return {
+        'requested': requested,
+        'accepted': accepted,
+        'completed': by_status['completed'],
+        'by_status': by_status,
+        'acceptance_rate': round(accepted / requested, 4) if requested else 0.0,
+        'completion_rate': round(by_status['completed'] / accepted, 4) if accepted else 0.0
+    }
+
+
+class AnalyticsEngine:
+    """Serves precomputed admin analytics from memory.
+
+    The snapshot is computed into MongoDB by whichever process finds it
+    older than ``refresh_interval`` (or by ``refresh()`` from a job) and
+    held here already encoded as JSON. A stale snapshot keeps being served
+    while a single background thread refreshes it; only the very first
+    request of a fresh deployment waits for a computation.
+    """
+
+    def __init__(self, app=None):
+        self.refresh_interval = 300
+        self.window = timedelta(days=90)
+        self.top_ngo_count = 10
+        self._current = None  # (refreshed_at, body, etag)
+        self._refresh_lock = threading.Lock()
+        self._refreshes = 0
+        self._failures = 0
+        self._last_duration = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.refresh_interval = app.config.get('ANALYTICS_REFRESH_INTERVAL', 300)
+        self.window = timedelta(days=app.config.get('ANALYTICS_WINDOW_DAYS', 90))
+        self.top_ngo_count = app.config.get('ANALYTICS_TOP_NGOS', 10)
+
+    def _is_stale(self, refreshed_at):
+        return datetime.utcnow() - refreshed_at >= timedelta(seconds=self.refresh_interval)
+
+    def _publish(self, snapshot):
+        body = json.dumps(snapshot.to_dict())
+        etag = hashlib.sha1(snapshot.refreshed_at.isoformat().encode('utf-8')).hexdigest()
+        self._current = (snapshot.refreshed_at, body, etag)
+
+    def refresh(self):
+        """Recompute the snapshot, recounting signups only from the last refresh on"""
+        from app.models import AnalyticsSnapshot
+
+        started = time.monotonic()
+        now = datetime.utcnow()
+        stored = AnalyticsSnapshot.objects(key=GLOBAL_KEY).first()
+        window_start = start_of_day(now - self.window)
+
+        signups = dict(stored.signups) if stored else {}
+        since = window_start
+        if stored:
+            since = max(window_start, start_of_day(stored.refreshed_at - SIGNUP_OVERLAP))
+        signups.update(signups_by_day(since))
+        signups = {day: roles for day, roles in signups.items() if day >= day_key(window_start)}
+
+        donations, ngo_totals = donation_breakdown(window_start)
+        sections = {
+            'campaigns': campaign_breakdown(),
+            'donations': donations,
+            'mentorships': mentorship_funnel(),
+            'top_ngos': top_ngos(ngo_totals, self.top_ngo_count)
+        }
+
+        snapshot = AnalyticsSnapshot(key=GLOBAL_KEY, signups=signups, sections=sections, refreshed_at=now)
+        # Replaced rather than saved: workers refreshing at once must not trip over each other's insert
+        AnalyticsSnapshot._get_collection().replace_one({'_id': GLOBAL_KEY}, snapshot.to_mongo(), upsert=True)
+        self._publish(snapshot)
+        self._refreshes += 1
+        self._last_duration = time.monotonic() - started
+        return snapshot
+
+    def _load(self):
+        """Adopt the stored snapshot, or compute one if it is missing or stale"""
+        from app.models import AnalyticsSnapshot
+
+        stored = AnalyticsSnapshot.objects(key=GLOBAL_KEY).first()
+        if stored and not self._is_stale(stored.refreshed_at):
+            self._publish(stored)
+        else:
+            self.refresh()
+
+    def _refresh_in_background(self):
+        try:
+            self._load()
+        except Exception:
+            # Keep serving the previous snapshot; the next request retries
+            self._failures += 1
+        finally:
+            self._refresh_lock.release()
+
+    def snapshot(self):
+        """``(refreshed_at, JSON body, etag)`` of the current analytics"""
+        current = self._current
+        if current is None:
+            with self._refresh_lock:
+                if self._current is None:
+                    self._load()
+            return self._current
+
+        if self._is_stale(current[0]) and self._refresh_lock.acquire(blocking=False):
+            threading.Thread(target=self._refresh_in_background, daemon=True).start()
+        return current
+
+    def stats(self):
+        current = self._current
+        return {
+            'refreshed_at': current[0].isoformat() if current else None,
+            'refreshes': self._refreshes,
+            'failures': self._failures,
+            'last_refresh_seconds': round(self._last_duration, 3) if self._last_duration is not None else None
+        }
@@ -0,0 +1,214 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, make_response, current_app
+
+
+class MemoryCache:
+    """Thread-safe in-process LRU cache with per-entry TTL and tags.
+
+    Bounded by entry count and by the total size reported for the values.
+    Least recently used entries are evicted first; tags let callers drop
+    every entry derived from a given resource at once.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=None, default_ttl=60):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()  # key -> (value, expires_at, tags, size)
+        self._tags = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[1] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, ttl=None, tags=(), size=0):
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + ttl, tuple(tags), size)
+            self._bytes += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def invalidate(self, *tags):
+        """Drop every entry carrying any of the tags"""
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        value, expires_at, tags, size = self._entries.pop(key)
+        self._bytes -= size
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
+
+
+class NullCache:
+    """Backend that never stores anything, for disabling the cache"""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl=None, tags=(), size=0):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def invalidate(self, *tags):
+        pass
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {}
+
+
+BACKENDS = {
+    'memory': MemoryCache,
+    'null': NullCache
+}
+
+
+def cache_key():
+    """Key for the current request from its endpoint, view args and normalized query"""
+    view_args = sorted((request.view_args or {}).items())
+    query = sorted(
+        (name, value.strip())
+        for name, values in request.args.lists()
+        for value in values
+        if value.strip()
+    )
+    return repr((request.endpoint, view_args, query))
+
+
+class ResponseCache:
+    """Caches whole responses of anonymous GET endpoints.
+
+    Write routes call ``invalidate()`` with the tags of the resources they
+    change. Each worker process holds its own cache, so entries served by
+    other workers expire by TTL.
+    """
+
+    def __init__(self, app=None):
+        self.backend = NullCache()
+        self.max_item_bytes = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = BACKENDS[app.config.get('RESPONSE_CACHE_BACKEND', 'memory')]
+        if backend is MemoryCache:
+            self.backend = MemoryCache(
+                max_entries=app.config.get('RESPONSE_CACHE_MAX_ENTRIES', 1024),
+                max_bytes=app.config.get('RESPONSE_CACHE_MAX_BYTES'),
+                default_ttl=app.config.get('RESPONSE_CACHE_DEFAULT_TTL', 60)
+            )
+        else:
+            self.backend = backend()
+        self.max_item_bytes = app.config.get('RESPONSE_CACHE_MAX_ITEM_BYTES')
+
+    def cached(self, ttl=None, tags=()):
+        """Cache a GET view's successful responses.
+
+        ``tags`` is a list of tags, or a callable receiving the view arguments
+        and returning them.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if request.method != 'GET':
+                    return view(*args, **kwargs)
+
+                key = cache_key()
+                cached_response = self.backend.get(key)
+                if cached_response is not None:
+                    body, status, mimetype, etag = cached_response
+                    if etag and request.if_none_match.contains(etag):
+                        response = current_app.response_class(status=304)
+                    else:
+                        response = current_app.response_class(body, status=status, mimetype=mimetype)
+                    if etag:
+                        response.set_etag(etag)
+                    response.headers['X-Cache'] = 'HIT'
+                    return response
+
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200 and not response.is_streamed:
+                    body = response.get_data()
+                    if self.max_item_bytes is None or len(body) <= self.max_item_bytes:
+                        entry_tags = tags(**kwargs) if callable(tags) else tags
+                        etag = response.get_etag()[0]
+                        self.backend.set(key, (body, response.status_code, response.mimetype, etag),
+                                         ttl=ttl, tags=entry_tags, size=len(body))
+                response.headers['X-Cache'] = 'MISS'
+                return response
+            return wrapper
+        return decorator
+
+    def invalidate(self, *tags):
+        self.backend.invalidate(*tags)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        return self.backend.stats()
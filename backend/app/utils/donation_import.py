@@ -0,0 +1,251 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import BulkWriteError
+from mongoengine import ValidationError
+from app.models import Campaign, Donation, User
+from app.utils.donation_ledger import claim, apply_claim, settle, recent_entry
+
+CHUNK_SIZE = 500
+FORMATS = ('csv', 'ndjson')
+TRUE_VALUES = ('true', '1', 'yes', 'y')
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def guess_format(filename, mimetype):
+    """Pick the import format from an upload's filename or content type"""
+    filename = (filename or '').lower()
+    if filename.endswith(('.ndjson', '.jsonl')) or mimetype in ('application/x-ndjson', 'application/jsonl'):
+        return 'ndjson'
+    return 'csv'
+
+
+def read_rows(stream, fmt):
+    """Yield ``(row_number, row, error)`` from a binary CSV or NDJSON stream.
+
+    The stream is decoded and parsed line by line, so only the current row
+    is held in memory.
+    """
+    if fmt not in FORMATS:
+        raise ImportFormatError(f'Unsupported format: {fmt}')
+
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='' if fmt == 'csv' else None)
+    if fmt == 'csv':
+        for row_number, row in enumerate(csv.DictReader(text), start=2):
+            yield row_number, row, None
+        return
+
+    for row_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield row_number, None, 'Invalid JSON'
+            continue
+        if not isinstance(row, dict):
+            yield row_number, None, 'Row must be a JSON object'
+            continue
+        yield row_number, row, None
+
+
+def _value(row, field):
+    value = row.get(field)
+    if isinstance(value, str):
+        value = value.strip()
+    return value if value not in ('', None) else None
+
+
+def _parse(row):
+    """Validate the shape of a row; returns the parsed row or raises ValueError"""
+    try:
+        amount = float(_value(row, 'amount'))
+    except (TypeError, ValueError):
+        raise ValueError('amount must be a number')
+    if amount <= 0:
+        raise ValueError('amount must be greater than 0')
+
+    try:
+        campaign_id = ObjectId(str(_value(row, 'campaign_id')))
+    except InvalidId:
+        raise ValueError('campaign_id is missing or invalid')
+
+    donor_id = _value(row, 'donor_id')
+    donor_email = _value(row, 'donor_email')
+    if donor_id:
+        try:
+            donor_id = ObjectId(str(donor_id))
+        except InvalidId:
+            raise ValueError('donor_id is invalid')
+    elif not donor_email:
+        raise ValueError('donor_id or donor_email is required')
+
+    created_at = _value(row, 'created_at')
+    if created_at:
+        try:
+            created_at = datetime.fromisoformat(str(created_at))
+        except ValueError:
+            raise ValueError('created_at must be an ISO date')
+
+    is_anonymous = _value(row, 'is_anonymous')
+    if isinstance(is_anonymous, str):
+        is_anonymous = is_anonymous.lower() in TRUE_VALUES
+
+    return {
+        'amount': amount,
+        'campaign_id': campaign_id,
+        'donor_id': donor_id,
+        'donor_email': donor_email,
+        'transaction_id': _value(row, 'transaction_id') or str(uuid.uuid4()),
+        'payment_method': _value(row, 'payment_method') or 'offline',
+        'is_anonymous': bool(is_anonymous),
+        'message': _value(row, 'message') or '',
+        'created_at': created_at or datetime.utcnow()
+    }
+
+
+class DonationImporter:
+    """Streams donation rows into MongoDB in chunks.
+
+    Per chunk: one lookup per referenced collection, one ``insert_many``, one
+    update claiming the chunk's donations, one ``bulk_write`` carrying a
+    single ``$inc`` per campaign, and one update completing them. Rejected rows are passed to
+    ``on_reject(row_number, reason)`` as they are found.
+    """
+
+    def __init__(self, campaign_filter=None, on_reject=None, chunk_size=CHUNK_SIZE):
+        self.campaign_filter = campaign_filter or {}
+        self.on_reject = on_reject or (lambda row_number, reason: None)
+        self.chunk_size = chunk_size
+        self.batch_id = uuid.uuid4().hex
+        self.chunks = 0
+        self.imported = 0
+        self.rejected = 0
+        self.amount = 0.0
+
+    def run(self, stream, fmt):
+        chunk = []
+        for row_number, row, error in read_rows(stream, fmt):
+            if error:
+                self._reject(row_number, error)
+                continue
+            try:
+                chunk.append((row_number, _parse(row)))
+            except ValueError as e:
+                self._reject(row_number, str(e))
+                continue
+            if len(chunk) >= self.chunk_size:
+                self._import_chunk(chunk)
+                chunk = []
+        if chunk:
+            self._import_chunk(chunk)
+
+        return {
+            'batch_id': self.batch_id,
+            'imported': self.imported,
+            'rejected': self.rejected,
+            'amount': self.amount
+        }
+
+    def _reject(self, row_number, reason):
+        self.rejected += 1
+        self.on_reject(row_number, reason)
+
+    def _import_chunk(self, chunk):
+        campaign_ids = {row['campaign_id'] for _, row in chunk}
+        campaigns = {
+            campaign.pk for campaign in
+            Campaign.objects(id__in=list(campaign_ids), **self.campaign_filter).only('id')
+        }
+
+        donor_ids = {row['donor_id'] for _, row in chunk if row['donor_id']}
+        donor_emails = {row['donor_email'] for _, row in chunk if row['donor_email']}
+        donors_by_id = {
+            user.pk: user
+            for user in User.objects(id__in=list(donor_ids)).only('id', 'first_name', 'last_name')
+        }
+        donors_by_email = {
+            user.email: user
+            for user in User.objects(email__in=list(donor_emails)).only('id', 'email', 'first_name', 'last_name')
+        }
+
+        transaction_ids = [row['transaction_id'] for _, row in chunk]
+        existing = set(Donation.objects(transaction_id__in=transaction_ids).distinct('transaction_id'))
+
+        self.chunks += 1
+        ledger_key = f'import:{self.batch_id}:{self.chunks}'
+        documents = []
+        accepted = []
+        seen = set()
+        for row_number, row in chunk:
+            if row['campaign_id'] not in campaigns:
+                self._reject(row_number, 'Campaign not found')
+                continue
+
+            donor = donors_by_id.get(row['donor_id']) or donors_by_email.get(row['donor_email'])
+            if not donor:
+                self._reject(row_number, 'Donor not found')
+                continue
+
+            if row['transaction_id'] in existing or row['transaction_id'] in seen:
+                self._reject(row_number, 'Duplicate transaction_id')
+                continue
+
+            donation = Donation(
+                amount=row['amount'],
+                donor=donor,
+                campaign=row['campaign_id'],
+                payment_method=row['payment_method'],
+                transaction_id=row['transaction_id'],
+                ledger_key=ledger_key,
+                status='pending',
+                is_anonymous=row['is_anonymous'],
+                message=row['message'],
+                created_at=row['created_at'],
+                updated_at=datetime.utcnow()
+            )
+            try:
+                donation.validate()
+            except ValidationError as e:
+                self._reject(row_number, str(e))
+                continue
+
+            seen.add(row['transaction_id'])
+            documents.append(donation.to_mongo())
+            accepted.append((row_number, row, donation.get_donor_name()))
+
+        if not documents:
+            return
+
+        failed = set()
+        try:
+            Donation._get_collection().insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get('writeErrors', []):
+                failed.add(error['index'])
+                reason = 'Duplicate transaction_id' if error.get('code') == 11000 else error.get('errmsg')
+                self._reject(accepted[error['index']][0], reason)
+
+        recent = {}
+        for index, (_, row, donor_name) in enumerate(accepted):
+            if index not in failed:
+                recent.setdefault(row['campaign_id'], []).append(recent_entry(
+                    documents[index]['_id'], row['amount'], donor_name, row['message'], row['created_at']
+                ))
+
+        token, claimed = claim({'ledger_key': ledger_key, 'status': 'pending'})
+        amounts = apply_claim(token, claimed, recent=recent)
+        self.imported += settle(token, amounts)
+        self.amount += sum(amounts.values())
+
+
+def import_donations(stream, fmt, campaign_filter=None, on_reject=None):
+    """Import a CSV or NDJSON stream of donations; returns the summary"""
+    return DonationImporter(campaign_filter=campaign_filter, on_reject=on_reject).run(stream, fmt)
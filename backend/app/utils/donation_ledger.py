@@ -0,0 +1,246 @@
+import uuid
+from datetime import datetime, timedelta
+from bson import DBRef
+from pymongo import UpdateOne
+from app.models import Campaign, Donation, RecentDonation
+from app.models.campaign import RECENT_DONATIONS
+from app.utils.platform_stats import record_donations
+from app.utils.rollups import record_rollups
+from app.utils.serializers import prefetch_related
+from app.utils.user_stats import record_user_donations
+
+# Pending donations younger than this may still be in flight
+RECOVERY_GRACE = timedelta(minutes=5)
+# Donation messages are cut to this length in the campaign's recent list
+RECENT_MESSAGE_LENGTH = 280
+
+
+def _campaign_id(donation):
+    value = donation._data.get('campaign')
+    return value.id if isinstance(value, DBRef) else value.pk
+
+
+def recent_entry(donation_id, amount, donor_name, message, created_at):
+    """Raw RecentDonation for a campaign's recent donations list"""
+    return RecentDonation(
+        donation_id=str(donation_id),
+        amount=amount,
+        donor_name=donor_name,
+        message=(message or '')[:RECENT_MESSAGE_LENGTH],
+        created_at=created_at
+    ).to_mongo().to_dict()
+
+
+def _ledger_update(campaign_id, token, amount, recent=()):
+    """Filter and update applying a claim's amount to a campaign once"""
+    push = {'pending_ledger': token}
+    if recent:
+        # Sorted rather than prepended, so backdated imports land in place
+        push['recent_donations'] = {
+            '$each': list(recent),
+            '$sort': {'created_at': -1},
+            '$slice': RECENT_DONATIONS
+        }
+    return (
+        {'_id': campaign_id, 'pending_ledger': {'$ne': token}},
+        {
+            '$inc': {'raised_amount': amount},
+            '$set': {'updated_at': datetime.utcnow()},
+            '$push': push
+        }
+    )
+
+
+def claim(query):
+    """Take the donations matching ``query`` for this caller.
+
+    They move to ``applying`` under a new ``settle_token`` in one update, so
+    of any callers racing for the same pending donations exactly one gets
+    each row; only that caller applies and settles it. Returns the token and
+    the claimed donations.
+    """
+    token = uuid.uuid4().hex
+    Donation._get_collection().update_many(
+        query, {'$set': {'status': 'applying', 'settle_token': token, 'updated_at': datetime.utcnow()}}
+    )
+    return token, list(Donation.objects(settle_token=token, status='applying'))
+
+
+def apply_claim(token, donations, recent=None):
+    """Add claimed donations to their campaigns' raised amounts in one bulk write.
+
+    Each ``$inc`` records the claim token in the campaign's
+    ``pending_ledger`` in the same atomic update and is skipped while the
+    token is there, so it happens at most once per claim. ``recent``
+    optionally maps campaign ids to their recent donation entries.
+    """
+    amounts = {}
+    for donation in donations:
+        campaign_id = _campaign_id(donation)
+        amounts[campaign_id] = amounts.get(campaign_id, 0.0) + donation.amount
+    recent = recent or {}
+    if amounts:
+        Campaign._get_collection().bulk_write([
+            UpdateOne(*_ledger_update(campaign_id, token, amount, recent.get(campaign_id, ())))
+            for campaign_id, amount in amounts.items()
+        ], ordered=False)
+    return amounts
+
+
+def settle(token, campaign_ids):
+    """Complete the donations of an applied claim.
+
+    Platform totals, rollups and user stats cover exactly the rows this call
+    completed. The token is then released from the campaigns. Returns the
+    number of donations completed.
+    """
+    collection = Donation._get_collection()
+    collection.update_many(
+        {'settle_token': token, 'status': 'applying'},
+        {'$set': {'status': 'completed', 'updated_at': datetime.utcnow()}}
+    )
+    completed = list(collection.find(
+        {'settle_token': token, 'status': 'completed'},
+        {'campaign': 1, 'donor': 1, 'amount': 1, 'created_at': 1}
+    ))
+    if completed:
+        record_donations(len(completed), sum(donation['amount'] for donation in completed))
+        record_rollups(completed)
+        record_user_donations(completed)
+    release_ledger_key(token, campaign_ids)
+    return len(completed)
+
+
+def release_ledger_key(token, campaign_ids):
+    Campaign._get_collection().update_many(
+        {'_id': {'$in': list(campaign_ids)}, 'pending_ledger': token},
+        {'$pull': {'pending_ledger': token}}
+    )
+
+
+def _recent_entries(donations):
+    """Recent donation entries of claimed donations, by campaign id"""
+    prefetch_related(donations, 'donor')
+    recent = {}
+    for donation in donations:
+        recent.setdefault(_campaign_id(donation), []).append(recent_entry(
+            donation.id, donation.amount, donation.get_donor_name(), donation.message, donation.created_at
+        ))
+    return recent
+
+
+def commit_donation(donation):
+    """Apply a saved pending donation to its campaign and complete it.
+
+    Safe to repeat and to race with recovery: only the caller that claims the
+    donation applies it; the others leave it alone and return its current
+    status.
+    """
+    token, claimed = claim({'_id': donation.id, 'status': 'pending'})
+    if not claimed:
+        donation.reload('status', 'updated_at')
+        return donation
+    campaign_id = _campaign_id(donation)
+    entry = recent_entry(donation.id, donation.amount, donation.get_donor_name(),
+                         donation.message, donation.created_at)
+    apply_claim(token, claimed, recent={campaign_id: [entry]})
+    settle(token, [campaign_id])
+    donation.status = 'completed'
+    return donation
+
+
+def recover_pending_donations(grace=RECOVERY_GRACE):
+    """Finish donations left behind by a failed request.
+
+    Donations still pending were never claimed; they are claimed, applied
+    and settled here. Donations stuck in ``applying`` are claimed again; the
+    old token on a campaign tells whether its ``$inc`` already happened, in
+    which case they are only settled. ``grace`` must outlast any live
+    request, since a request stalled past it could still apply its claim.
+    Tokens left on campaigns whose donations were all settled are released.
+    Returns the number of donations completed.
+    """
+    cutoff = datetime.utcnow() - grace
+    collection = Donation._get_collection()
+    recovered = 0
+
+    for entry in collection.aggregate([
+        {'$match': {'status': 'pending', 'created_at': {'$lt': cutoff}, 'ledger_key': {'$ne': None}}},
+        {'$group': {'_id': {'campaign': '$campaign', 'ledger_key': '$ledger_key'}}}
+    ]):
+        campaign_id = entry['_id']['campaign']
+        token, donations = claim({'ledger_key': entry['_id']['ledger_key'], 'campaign': campaign_id,
+                                  'status': 'pending', 'created_at': {'$lt': cutoff}})
+        if donations:
+            apply_claim(token, donations, recent=_recent_entries(donations))
+            recovered += settle(token, [campaign_id])
+
+    for stale in collection.distinct('settle_token', {'status': 'applying', 'updated_at': {'$lt': cutoff}}):
+        token, donations = claim({'settle_token': stale, 'status': 'applying', 'updated_at': {'$lt': cutoff}})
+        if not donations:
+            continue
+        campaign_ids = {_campaign_id(donation) for donation in donations}
+        applied = set(Campaign._get_collection().distinct(
+            '_id', {'_id': {'$in': list(campaign_ids)}, 'pending_ledger': stale}
+        ))
+        unapplied = [donation for donation in donations if _campaign_id(donation) not in applied]
+        apply_claim(token, unapplied, recent=_recent_entries(unapplied))
+        recovered += settle(token, campaign_ids)
+        release_ledger_key(stale, applied)
+
+    for campaign in Campaign._get_collection().find({'pending_ledger.0': {'$exists': True}}, {'pending_ledger': 1}):
+        for token in campaign['pending_ledger']:
+            if collection.find_one({'settle_token': token, 'status': 'applying'}, {'_id': 1}) is None:
+                release_ledger_key(token, [campaign['_id']])
+    return recovered
+
+
+def migrate_applied_ledger():
+    """Move campaigns from per-key ledgers to per-claim tokens.
+
+    Pending donations whose ledger key is recorded on their campaign (in the
+    capped ``applied_ledger`` or in ``pending_ledger``) were already applied;
+    they are claimed and the claim token takes the key's place, so recovery
+    settles them without applying them again. ``applied_ledger`` is dropped.
+    Returns the number of campaigns changed.
+    """
+    collection = Campaign._get_collection()
+    for entry in Donation._get_collection().aggregate([
+        {'$match': {'status': 'pending', 'ledger_key': {'$ne': None}}},
+        {'$group': {'_id': {'campaign': '$campaign', 'ledger_key': '$ledger_key'}}}
+    ]):
+        campaign_id, ledger_key = entry['_id']['campaign'], entry['_id']['ledger_key']
+        applied = collection.find_one(
+            {'_id': campaign_id, '$or': [{'applied_ledger': ledger_key}, {'pending_ledger': ledger_key}]},
+            {'_id': 1}
+        )
+        if applied is None:
+            continue
+        token, _ = claim({'ledger_key': ledger_key, 'campaign': campaign_id, 'status': 'pending'})
+        collection.update_one({'_id': campaign_id}, {'$addToSet': {'pending_ledger': token}})
+        release_ledger_key(ledger_key, [campaign_id])
+    result = collection.update_many({'applied_ledger': {'$exists': True}}, {'$unset': {'applied_ledger': ''}})
+    return result.modified_count
+
+
+def rebuild_recent_donations():
+    """Reload every campaign's recent donations list from the donations collection.
+
+    Returns the number of campaigns updated.
+    """
+    updated = 0
+    for campaign_id in Campaign.objects.scalar('id'):
+        donations = list(
+            Donation.objects(campaign=campaign_id, status='completed')
+            .order_by('-created_at', '-id')
+            .limit(RECENT_DONATIONS)
+        )
+        prefetch_related(donations, 'donor')
+        entries = [
+            recent_entry(donation.id, donation.amount, donation.get_donor_name(),
+                         donation.message, donation.created_at)
+            for donation in donations
+        ]
+        Campaign._get_collection().update_one({'_id': campaign_id}, {'$set': {'recent_donations': entries}})
+        updated += 1
+    return updated
@@ -0,0 +1,74 @@
+from pymongo import UpdateOne
+from app.models import ExpertiseFacet, Mentor
+from app.utils.tags import parse_tags
+
+MIGRATION_BATCH_SIZE = 500
+
+
+def facet_tags(mentor):
+    """Tags a mentor contributes to the facet: only available mentors count"""
+    return list(mentor.expertise_tags) if mentor.is_available else []
+
+
+def update_expertise_facet(before, after):
+    """Apply the change of one mentor's facet tags with one $inc per changed tag"""
+    before, after = set(before), set(after)
+    deltas = {tag: 1 for tag in after - before}
+    deltas.update({tag: -1 for tag in before - after})
+    if not deltas:
+        return
+
+    collection = ExpertiseFacet._get_collection()
+    collection.bulk_write([
+        UpdateOne({'_id': tag}, {'$inc': {'count': delta}}, upsert=True)
+        for tag, delta in deltas.items()
+    ], ordered=False)
+    removed = [tag for tag, delta in deltas.items() if delta < 0]
+    if removed:
+        collection.delete_many({'_id': {'$in': removed}, 'count': {'$lte': 0}})
+
+
+def expertise_facet():
+    """Distinct tags of available mentors with their counts, most common first"""
+    cursor = ExpertiseFacet._get_collection().find({'count': {'$gt': 0}}).sort([('count', -1), ('_id', 1)])
+    return [{'tag': facet['_id'], 'count': facet['count']} for facet in cursor]
+
+
+def rebuild_expertise_facet():
+    """Recount the facet from the mentors collection; returns the number of tags"""
+    counts = Mentor.objects(is_available=True).aggregate([
+        {'$unwind': '$expertise_tags'},
+        {'$group': {'_id': '$expertise_tags', 'count': {'$sum': 1}}}
+    ])
+    documents = [{'_id': facet['_id'], 'count': facet['count']} for facet in counts]
+    collection = ExpertiseFacet._get_collection()
+    collection.delete_many({})
+    if documents:
+        collection.insert_many(documents)
+    return len(documents)
+
+
+def migrate_expertise_tags(batch_size=MIGRATION_BATCH_SIZE):
+    """Fill expertise_tags on mentors saved before it existed, one bulk write per batch.
+
+    Walks the collection in _id order so each batch is a cheap range query,
+    then rebuilds the facet. Returns the number of mentors migrated.
+    """
+    collection = Mentor._get_collection()
+    migrated = 0
+    last_id = None
+    while True:
+        query = {'expertise_tags': {'$exists': False}}
+        if last_id is not None:
+            query['_id'] = {'$gt': last_id}
+        batch = list(collection.find(query, {'expertise': 1}).sort('_id', 1).limit(batch_size))
+        if not batch:
+            break
+        collection.bulk_write([
+            UpdateOne({'_id': mentor['_id']}, {'$set': {'expertise_tags': parse_tags(mentor.get('expertise'))}})
+            for mentor in batch
+        ], ordered=False)
+        migrated += len(batch)
+        last_id = batch[-1]['_id']
+    rebuild_expertise_facet()
+    return migrated
@@ -0,0 +1,103 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from bson import ObjectId
+from flask import Response, stream_with_context
+from app.utils.serializers import prefetch_related
+
+EXPORT_BATCH_SIZE = 1000
+MIMETYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson'
+}
+
+
+class InvalidExport(ValueError):
+    pass
+
+
+def parse_date(value, name):
+    """Parse an ISO date filter argument, or None when absent"""
+    if not value:
+        return None
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        raise InvalidExport(f'{name} must be an ISO date')
+    # Stored dates are naive UTC
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def parse_id(value, name):
+    """Parse an id filter argument up front, before the response starts streaming"""
+    if not value:
+        return None
+    if not ObjectId.is_valid(value):
+        raise InvalidExport(f'{name} must be a valid id')
+    return ObjectId(value)
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def export_rows(query, columns, references=(), batch_size=EXPORT_BATCH_SIZE):
+    """Yield one dict per document, holding at most one batch in memory.
+
+    The queryset is iterated as a server-side cursor without mongoengine's
+    result cache; each batch has its references resolved with one ``$in``
+    query per referenced collection before its rows are produced.
+    """
+    batch = []
+    for document in query.no_cache().batch_size(batch_size):
+        batch.append(document)
+        if len(batch) >= batch_size:
+            yield from _rows(batch, columns, references)
+            batch = []
+    if batch:
+        yield from _rows(batch, columns, references)
+
+
+def _rows(batch, columns, references):
+    for document in prefetch_related(batch, *references):
+        yield {name: _plain(value(document)) for name, value in columns}
+
+
+def _encode(rows, columns, fmt):
+    names = [name for name, _ in columns]
+    if fmt == 'ndjson':
+        for row in rows:
+            yield json.dumps(row) + '\n'
+        return
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=names)
+    writer.writeheader()
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_response(query, columns, fmt, filename, references=()):
+    """Stream a queryset as a CSV or NDJSON download.
+
+    ``columns`` is a list of ``(name, getter)`` pairs where each getter
+    receives a document and returns the column value.
+    """
+    if fmt not in MIMETYPES:
+        raise InvalidExport(f'Unsupported format: {fmt}')
+
+    rows = export_rows(query, columns, references)
+    response = Response(stream_with_context(_encode(rows, columns, fmt)), mimetype=MIMETYPES[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}.{fmt}'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
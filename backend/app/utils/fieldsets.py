@@ -0,0 +1,122 @@
+from flask import request
+
+# Document fields every projection keeps: identity, pagination cursor, ETag
+ALWAYS_LOADED = ['id', 'created_at', 'updated_at']
+
+# For each resource: output field -> document fields it is computed from,
+# the output fields that dereference each reference field, bookkeeping
+# fields never sent to clients, and named views. A view of None means every
+# field.
+RESOURCES = {
+    'campaign': {
+        'sources': {
+            'id': [],
+            'title': ['title'],
+            'description': ['description'],
+            'long_description': ['long_description'],
+            'category': ['category'],
+            'goal_amount': ['goal_amount'],
+            'raised_amount': ['raised_amount'],
+            'image_url': ['image_url'],
+            'location': ['location'],
+            'ngo_id': ['ngo'],
+            'ngo_name': ['ngo_name', 'ngo'],
+            'status': ['status'],
+            'start_date': ['start_date'],
+            'end_date': ['end_date'],
+            'created_at': [],
+            'updated_at': [],
+            'progress_percentage': ['goal_amount', 'raised_amount'],
+            'days_left': ['end_date'],
+            # Detail page extras; updates live in their own collection
+            'recent_donations': ['recent_donations'],
+            'updates': []
+        },
+        'references': {
+            'ngo': ['ngo_name']
+        },
+        'internal': ['pending_ledger', 'applied_ledger'],
+        'views': {
+            'card': ['id', 'title', 'description', 'category', 'image_url', 'location',
+                     'ngo_id', 'ngo_name', 'goal_amount', 'raised_amount',
+                     'progress_percentage', 'days_left', 'status'],
+            'detail': None
+        }
+    },
+    'mentor': {
+        'sources': {
+            'id': [],
+            'user_id': ['user'],
+            'user': ['user'],
+            'name': ['user'],
+            'company': ['company'],
+            'position': ['position'],
+            'expertise': ['expertise'],
+            'expertise_tags': ['expertise_tags'],
+            'experience_years': ['experience_years'],
+            'bio': ['bio'],
+            'linkedin_url': ['linkedin_url'],
+            'github_url': ['github_url'],
+            'is_available': ['is_available'],
+            'max_students': ['max_students'],
+            'current_students': ['current_students'],
+            'rating': ['rating'],
+            'total_reviews': ['total_reviews'],
+            'created_at': [],
+            'updated_at': []
+        },
+        'references': {
+            'user': ['user', 'name']
+        },
+        'internal': [],
+        'views': {
+            'card': ['id', 'user_id', 'name', 'company', 'position', 'expertise', 'expertise_tags',
+                     'experience_years', 'rating', 'total_reviews', 'is_available'],
+            'detail': None
+        }
+    }
+}
+
+
+class InvalidFieldset(ValueError):
+    pass
+
+
+def requested_fields(resource):
+    """Output fields asked for with ``fields=a,b`` or ``view=card``, or None for all"""
+    config = RESOURCES[resource]
+    fields = request.args.get('fields')
+    view = request.args.get('view')
+
+    if fields:
+        selected = {name.strip() for name in fields.split(',') if name.strip()}
+        unknown = selected - set(config['sources'])
+        if unknown:
+            raise InvalidFieldset(f"Unknown fields: {', '.join(sorted(unknown))}")
+        return selected | {'id'}
+
+    if view:
+        if view not in config['views']:
+            raise InvalidFieldset(f'Unknown view: {view}')
+        selected = config['views'][view]
+        return set(selected) if selected is not None else None
+
+    return None
+
+
+def project(query, resource, fields):
+    """Restrict a queryset to the document fields needed for ``fields``"""
+    if fields is None:
+        internal = RESOURCES[resource]['internal']
+        return query.exclude(*internal) if internal else query
+    sources = RESOURCES[resource]['sources']
+    loaded = set(ALWAYS_LOADED)
+    for field in fields:
+        loaded.update(sources[field])
+    return query.only(*loaded)
+
+
+def references(resource, fields):
+    """Reference fields to resolve in bulk before serializing ``fields``"""
+    config = RESOURCES[resource]['references']
+    return [name for name, used_by in config.items() if fields is None or fields & set(used_by)]
@@ -0,0 +1,71 @@
+import hashlib
+from flask import request, make_response, current_app
+from mongoengine import Document
+from app.utils.serializers import prefetch_related
+
+
+def document_version(document):
+    """Identity and last modification time of a document"""
+    if document is None:
+        return None
+    updated_at = getattr(document, 'updated_at', None)
+    return (type(document).__name__, str(document.pk), updated_at.isoformat() if updated_at else None)
+
+
+def compute_etag(*parts):
+    """Strong ETag for the current URL from cheap version data.
+
+    The request path and query string are part of the hash, so different
+    pages, filters or field selections never share a tag.
+    """
+    digest = hashlib.sha1(repr((request.full_path, parts)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def page_etag(documents, *fields, extra=None):
+    """ETag for a page of documents and the references it embeds.
+
+    References are resolved in bulk first (they are needed for the body
+    anyway), so a renamed donor or NGO changes the tag too.
+    """
+    documents = prefetch_related(documents, *fields)
+    versions = []
+    for document in documents:
+        versions.append(document_version(document))
+        for field in fields:
+            related = document._data.get(field)
+            versions.append(document_version(related) if isinstance(related, Document) else None)
+    return compute_etag(versions, extra)
+
+
+def not_modified(etag):
+    """A 304 response when the client already holds this version, else None"""
+    if etag and request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+    return None
+
+
+def with_etag(rv, etag):
+    response = make_response(rv)
+    response.set_etag(etag)
+    return response
+
+
+def register_cache_control(app):
+    """Apply the CACHE_CONTROL policy of each blueprint to its GET responses.
+
+    Authenticated requests may get per-user bodies, so they are never cached
+    publicly whatever the blueprint's policy.
+    """
+    policies = app.config.get('CACHE_CONTROL', {})
+
+    @app.after_request
+    def apply_cache_control(response):
+        policy = policies.get(request.blueprint)
+        if policy and 'public' in policy and 'Authorization' in request.headers:
+            policy = 'private, no-cache'
+        if policy and request.method == 'GET' and 'Cache-Control' not in response.headers:
+            response.headers['Cache-Control'] = policy
+        return response
@@ -0,0 +1,100 @@
+import copy
+from flask import g
+from flask_jwt_extended import get_jwt_identity
+from app.utils.cache import MemoryCache, NullCache
+
+# Role profile document of each role, by model name in app.models
+PROFILE_MODELS = {
+    'student': 'Student',
+    'mentor': 'Mentor',
+    'ngo': 'NGO'
+}
+
+
+class IdentityCache:
+    """Caches each authenticated user with their role profile across requests.
+
+    Entries hold the raw documents and are rebuilt into fresh model instances
+    on every load, so requests never share mutable documents. Writers call
+    ``invalidate()`` after changing a user or their profile; other worker
+    processes see the change once the entry's TTL runs out.
+    """
+
+    def __init__(self, app=None):
+        self.backend = NullCache()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        ttl = app.config.get('IDENTITY_CACHE_TTL', 30)
+        if ttl:
+            self.backend = MemoryCache(
+                max_entries=app.config.get('IDENTITY_CACHE_MAX_ENTRIES', 4096),
+                default_ttl=ttl
+            )
+        else:
+            self.backend = NullCache()
+
+    def load(self, user_id):
+        """Return ``(user, profile)`` for a user id; ``(None, None)`` if there is no such user"""
+        import app.models as models
+
+        user_id = str(user_id)
+        entry = self.backend.get(user_id)
+        if entry is None:
+            user = models.User.objects(id=user_id).first()
+            if not user:
+                return None, None
+            profile_model = PROFILE_MODELS.get(user.role)
+            profile = getattr(models, profile_model).objects(user=user).first() if profile_model else None
+            entry = (user.to_mongo(), profile_model, profile.to_mongo() if profile else None)
+            self.backend.set(user_id, entry)
+
+        user_son, profile_model, profile_son = entry
+        user = models.User._from_son(copy.deepcopy(user_son))
+        profile = None
+        if profile_son is not None:
+            profile = getattr(models, profile_model)._from_son(copy.deepcopy(profile_son))
+            # Point the profile at the user we already have instead of a lazy reference
+            profile._data['user'] = user
+        return user, profile
+
+    def view(self, user, profile, build):
+        """Serialized ``build(user, profile)``, cached until either document changes.
+
+        Entries are keyed by user and checked against the documents'
+        versions, so a view is rebuilt as soon as this process loads a newer
+        user or profile. Callers must not mutate the returned value.
+        """
+        from app.utils.http_cache import document_version
+
+        key = f'view:{user.pk}'
+        versions = (document_version(user), document_version(profile))
+        entry = self.backend.get(key)
+        if entry is None or entry[0] != versions:
+            entry = (versions, build(user, profile))
+            self.backend.set(key, entry)
+        return entry[1]
+
+    def invalidate(self, user_id):
+        self.backend.delete(str(user_id))
+        self.backend.delete(f'view:{user_id}')
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        return self.backend.stats()
+
+
+def current_identity():
+    """``(user, profile)`` of the authenticated request, resolved once per request"""
+    if 'identity' not in g:
+        from app import identity_cache
+        g.identity = identity_cache.load(get_jwt_identity())
+    return g.identity
+
+
+def get_current_profile():
+    """Role profile (Student, Mentor or NGO) of the authenticated user, or None"""
+    return current_identity()[1]
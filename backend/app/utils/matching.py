@@ -0,0 +1,254 @@
+import threading
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from app.utils.tags import parse_tags, text_terms
+
+# Term weights: explicit tags count most, words inside multi-word tags and
+# free-text words less
+TAG_WEIGHT = 1.0
+TAG_WORD_WEIGHT = 0.5
+BIO_WEIGHT = 0.25
+GOALS_WEIGHT = 0.5
+MAX_TERM_WEIGHT = 3.0
+
+# Share of the final score from each signal, all scaled to 0..1
+SCORE_WEIGHTS = {
+    'relevance': 0.7,
+    'experience': 0.1,
+    'rating': 0.1,
+    'capacity': 0.1
+}
+EXPERIENCE_CAP = 20  # years; more counts the same
+MAX_RATING = 5.0
+MAX_MATCHES = 50
+
+MENTOR_FIELDS = ['expertise', 'expertise_tags', 'bio', 'experience_years', 'rating', 'is_available',
+                 'max_students', 'current_students', 'updated_at']
+
+
+def weighted_terms(tags, texts=()):
+    """``{term: weight}`` from normalized tags and ``(text, weight)`` pairs"""
+    weights = {}
+    for tag in tags:
+        weights[tag] = weights.get(tag, 0.0) + TAG_WEIGHT
+        for word in text_terms(tag):
+            if word != tag:
+                weights[word] = weights.get(word, 0.0) + TAG_WORD_WEIGHT
+    for text, weight in texts:
+        for word in text_terms(text):
+            weights[word] = weights.get(word, 0.0) + weight
+    return {term: min(weight, MAX_TERM_WEIGHT) for term, weight in weights.items()}
+
+
+def mentor_terms(mentor):
+    """Terms of a raw mentor document; documents saved before tags were stored are parsed"""
+    tags = mentor.get('expertise_tags')
+    if tags is None:
+        tags = parse_tags(mentor.get('expertise'))
+    return weighted_terms(tags, [(mentor.get('bio'), BIO_WEIGHT)])
+
+
+def student_terms(student):
+    """Terms of a Student: interests as tags, goals as free text"""
+    return weighted_terms(parse_tags(student.interests), [(student.goals, GOALS_WEIGHT)])
+
+
+def _segment_sum(values, indptr):
+    """Per-row sums of a CSR data array; zero for rows without entries"""
+    if len(indptr) < 2:
+        return np.zeros(0)
+    # Padded so reduceat accepts the start offset of trailing empty rows
+    sums = np.add.reduceat(np.append(values, 0.0), indptr[:-1])
+    sums[indptr[:-1] == indptr[1:]] = 0.0
+    return sums
+
+
+class MentorMatrix:
+    """Immutable snapshot of all mentors as a sparse term matrix (CSR arrays)"""
+
+    def __init__(self, ids, rows, features, document_frequency, vocabulary_size):
+        self.ids = ids
+        lengths = np.array([len(columns) for columns, _ in rows], dtype=np.int64)
+        self.indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.indptr[1:])
+        self.indices = np.concatenate([columns for columns, _ in rows]) if rows else np.zeros(0, dtype=np.int64)
+        data = np.concatenate([weights for _, weights in rows]) if rows else np.zeros(0)
+
+        # Smoothed inverse document frequency: rare expertise counts for more
+        document_frequency = np.asarray(document_frequency, dtype=np.float64)
+        self.idf = np.log((1.0 + len(ids)) / (1.0 + document_frequency)) + 1.0
+        self.weighted = data * self.idf[self.indices] if len(data) else data
+        self.norms = np.sqrt(_segment_sum(self.weighted ** 2, self.indptr))
+
+        available, experience, rating, max_students, current_students = (
+            np.array(column, dtype=np.float64) for column in zip(*features)
+        ) if features else (np.zeros(0),) * 5
+        capacity = np.maximum(max_students - current_students, 0.0)
+        self.eligible = (available > 0) & (capacity > 0)
+        self.static_score = (
+            SCORE_WEIGHTS['experience'] * np.minimum(experience, EXPERIENCE_CAP) / EXPERIENCE_CAP
+            + SCORE_WEIGHTS['rating'] * np.clip(rating, 0.0, MAX_RATING) / MAX_RATING
+            + SCORE_WEIGHTS['capacity'] * np.divide(capacity, max_students, out=np.zeros_like(capacity),
+                                                    where=max_students > 0)
+        )
+        self.vocabulary_size = vocabulary_size
+
+    def score(self, query):
+        """Final scores and relevance of every mentor for a ``{column: weight}`` query"""
+        vector = np.zeros(self.vocabulary_size)
+        for column, weight in query.items():
+            vector[column] = weight * self.idf[column]
+        query_norm = np.linalg.norm(vector)
+
+        if query_norm and len(self.weighted):
+            dot = _segment_sum(self.weighted * vector[self.indices], self.indptr)
+            relevance = np.divide(dot, self.norms * query_norm, out=np.zeros_like(dot), where=self.norms > 0)
+        else:
+            relevance = np.zeros(len(self.ids))
+
+        scores = SCORE_WEIGHTS['relevance'] * relevance + self.static_score
+        scores[~self.eligible] = -np.inf
+        return scores, relevance
+
+
+class MentorIndex:
+    """Per-process mentor term matrix for matching students to mentors.
+
+    Loaded from MongoDB on first use; afterwards mentors changed in any
+    process are picked up by one ``updated_at`` query every
+    ``sync_interval`` seconds, and ``refresh()`` applies a change made in
+    this process at once. Only changed rows are re-parsed; the matrix is
+    re-assembled from the cached rows on the next match.
+    """
+
+    def __init__(self, app=None):
+        self.sync_interval = 60
+        self.sync_overlap = timedelta(seconds=60)
+        self._rows = {}  # mentor id -> (term columns, term weights, features)
+        self._vocabulary = {}  # term -> column
+        self._terms = []  # column -> term
+        self._document_frequency = []  # column -> number of mentors using the term
+        self._matrix = None
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._watermark = None
+        self._next_sync = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.sync_interval = app.config.get('MENTOR_INDEX_SYNC_INTERVAL', 60)
+
+    def _column(self, term):
+        column = self._vocabulary.get(term)
+        if column is None:
+            column = len(self._terms)
+            self._vocabulary[term] = column
+            self._terms.append(term)
+            self._document_frequency.append(0)
+        return column
+
+    def _discard(self, mentor_id):
+        row = self._rows.pop(mentor_id, None)
+        if row is not None:
+            for column in row[0]:
+                self._document_frequency[column] -= 1
+            self._matrix = None
+
+    def put(self, mentor):
+        """Add or replace one mentor from its raw document"""
+        terms = mentor_terms(mentor)
+        with self._lock:
+            self._discard(str(mentor['_id']))
+            columns = np.array([self._column(term) for term in terms], dtype=np.int64)
+            for column in columns:
+                self._document_frequency[column] += 1
+            features = (
+                bool(mentor.get('is_available', True)),
+                mentor.get('experience_years') or 0,
+                mentor.get('rating') or 0.0,
+                mentor.get('max_students') or 0,
+                mentor.get('current_students') or 0
+            )
+            self._rows[str(mentor['_id'])] = (columns, np.array(list(terms.values())), features)
+            self._matrix = None
+
+    def remove(self, mentor_id):
+        with self._lock:
+            self._discard(str(mentor_id))
+
+    def refresh(self, mentor_id):
+        """Reload one mentor after it changed in this process"""
+        from app.models import Mentor
+
+        mentor = Mentor.objects(id=mentor_id).only(*MENTOR_FIELDS).as_pymongo().first()
+        if mentor is None:
+            self.remove(mentor_id)
+        else:
+            self.put(mentor)
+
+    def _sync(self):
+        from app.models import Mentor
+
+        started = datetime.utcnow()
+        query = Mentor.objects.only(*MENTOR_FIELDS)
+        if self._watermark is not None:
+            query = query(updated_at__gte=self._watermark - self.sync_overlap)
+        for mentor in query.as_pymongo():
+            self.put(mentor)
+        self._watermark = started
+
+    def _maybe_sync(self):
+        if self.sync_interval is None:
+            return
+        now = time.monotonic()
+        if now < self._next_sync:
+            return
+        # The first load blocks every caller; later syncs are skipped by
+        # threads that find another one already running
+        first_load = self._watermark is None
+        if not self._sync_lock.acquire(blocking=first_load):
+            return
+        try:
+            if time.monotonic() >= self._next_sync:
+                self._sync()
+                self._next_sync = time.monotonic() + self.sync_interval
+        finally:
+            self._sync_lock.release()
+
+    def _snapshot(self):
+        with self._lock:
+            if self._matrix is None:
+                ids = list(self._rows)
+                rows = [(columns, weights) for columns, weights, _ in self._rows.values()]
+                features = [features for _, _, features in self._rows.values()]
+                self._matrix = MentorMatrix(ids, rows, features, list(self._document_frequency), len(self._terms))
+            return self._matrix, dict(self._vocabulary)
+
+    def match(self, terms, limit=10):
+        """Top mentors for ``{term: weight}``: ``[(mentor id, score, relevance, matched terms)]``"""
+        self._maybe_sync()
+        matrix, vocabulary = self._snapshot()
+        query = {vocabulary[term]: weight for term, weight in terms.items() if term in vocabulary}
+        scores, relevance = matrix.score(query)
+
+        limit = min(limit, int(matrix.eligible.sum()))
+        if limit <= 0:
+            return []
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top], kind='stable')]
+
+        matches = []
+        for position in top:
+            columns = matrix.indices[matrix.indptr[position]:matrix.indptr[position + 1]]
+            matched = [self._terms[column] for column in columns if column in query]
+            matches.append((matrix.ids[position], float(scores[position]), float(relevance[position]), matched))
+        return matches
+
+    def stats(self):
+        with self._lock:
+            return {
+                'mentors': len(self._rows),
+                'terms': len(self._terms)
+            }
@@ -0,0 +1,151 @@
+from datetime import datetime
+from bson import DBRef
+from app.models import Mentor, Mentorship, Student, User
+
+MENTORSHIP_STATUSES = ('pending', 'active', 'completed', 'cancelled', 'rejected')
+# Statuses a mentorship may be closed with, and which of them hold a seat
+CLOSED_STATUSES = ('completed', 'cancelled')
+SEAT_HOLDING_STATUSES = ('active',)
+
+
+class MentorshipConflict(Exception):
+    """The mentorship is no longer in a state that allows the change"""
+
+
+class MentorAtCapacity(Exception):
+    pass
+
+
+def _mentor_id(mentorship):
+    value = mentorship._data.get('mentor')
+    return value.id if isinstance(value, DBRef) else value.pk
+
+
+def reserve_seat(mentor_id):
+    """Take one of a mentor's seats if one is free.
+
+    The capacity check and the ``$inc`` are one conditional update, so
+    concurrent accepts can never push ``current_students`` past
+    ``max_students``. Returns True if a seat was taken.
+    """
+    result = Mentor._get_collection().update_one(
+        {
+            '_id': mentor_id,
+            'is_available': True,
+            '$expr': {'$lt': [{'$ifNull': ['$current_students', 0]}, {'$ifNull': ['$max_students', 0]}]}
+        },
+        {'$inc': {'current_students': 1}, '$set': {'updated_at': datetime.utcnow()}}
+    )
+    return result.modified_count == 1
+
+
+def release_seat(mentor_id):
+    """Give back one seat, never going below zero"""
+    Mentor._get_collection().update_one(
+        {'_id': mentor_id, 'current_students': {'$gt': 0}},
+        {'$inc': {'current_students': -1}, '$set': {'updated_at': datetime.utcnow()}}
+    )
+
+
+def _transition(mentorship, from_statuses, to_status, **fields):
+    """Move a mentorship to ``to_status`` only if it is still in one of ``from_statuses``.
+
+    Returns the status it was moved from, or None if another request got
+    there first.
+    """
+    now = datetime.utcnow()
+    for from_status in from_statuses:
+        result = Mentorship._get_collection().update_one(
+            {'_id': mentorship.pk, 'status': from_status},
+            {'$set': {'status': to_status, 'updated_at': now, **fields}}
+        )
+        if result.modified_count == 1:
+            mentorship.status = to_status
+            mentorship.updated_at = now
+            for name, value in fields.items():
+                setattr(mentorship, name, value)
+            return from_status
+    return None
+
+
+def accept_mentorship(mentorship):
+    """Reserve a seat with the mentor and activate a pending mentorship.
+
+    The seat is taken first; if the mentorship turns out to have been
+    answered concurrently the seat is given back.
+    """
+    mentor_id = _mentor_id(mentorship)
+    if mentorship.status != 'pending':
+        raise MentorshipConflict('Mentorship request has already been answered')
+    if not reserve_seat(mentor_id):
+        raise MentorAtCapacity('Cannot accept more students')
+    if _transition(mentorship, ['pending'], 'active', start_date=datetime.utcnow()) is None:
+        release_seat(mentor_id)
+        raise MentorshipConflict('Mentorship request has already been answered')
+
+
+def reject_mentorship(mentorship):
+    if _transition(mentorship, ['pending'], 'rejected') is None:
+        raise MentorshipConflict('Mentorship request has already been answered')
+
+
+def close_mentorship(mentorship, status):
+    """Complete or cancel a mentorship, releasing its seat if it held one.
+
+    Pending requests can only be cancelled; they never held a seat.
+    """
+    from_statuses = ['active', 'pending'] if status == 'cancelled' else ['active']
+    previous = _transition(mentorship, from_statuses, status, end_date=datetime.utcnow())
+    if previous is None:
+        raise MentorshipConflict(f'Mentorship cannot be {status}')
+    if previous in SEAT_HOLDING_STATUSES:
+        release_seat(_mentor_id(mentorship))
+    return previous
+
+
+def status_counts(mentor_id):
+    """Number of a mentor's mentorships in each status, from one aggregation on the inbox index"""
+    counts = {status: 0 for status in MENTORSHIP_STATUSES}
+    for row in Mentorship._get_collection().aggregate([
+        {'$match': {'mentor': mentor_id}},
+        {'$group': {'_id': '$status', 'count': {'$sum': 1}}}
+    ]):
+        counts[row['_id']] = row['count']
+    return counts
+
+
+def student_cards(student_ids):
+    """``{student id: display data}`` with each student's name, in one ``$lookup`` aggregation"""
+    if not student_ids:
+        return {}
+    cards = {}
+    for student in Student._get_collection().aggregate([
+        {'$match': {'_id': {'$in': list(student_ids)}}},
+        {'$lookup': {'from': User._get_collection_name(), 'localField': 'user',
+                     'foreignField': '_id', 'as': 'user'}},
+        {'$unwind': {'path': '$user', 'preserveNullAndEmptyArrays': True}},
+        {'$project': {'school': 1, 'grade': 1, 'location': 1, 'interests': 1,
+                      'user._id': 1, 'user.first_name': 1, 'user.last_name': 1}}
+    ]):
+        user = student.get('user') or {}
+        cards[str(student['_id'])] = {
+            'id': str(student['_id']),
+            'user_id': str(user['_id']) if user else None,
+            'name': ' '.join(filter(None, [user.get('first_name'), user.get('last_name')])) or None,
+            'school': student.get('school'),
+            'grade': student.get('grade'),
+            'location': student.get('location'),
+            'interests': student.get('interests')
+        }
+    return cards
+
+
+def serialize_inbox(mentorships):
+    """Mentorships with the display data of their students attached"""
+    cards = student_cards({mentorship._data['student'].id for mentorship in mentorships})
+    results = []
+    for mentorship in mentorships:
+        data = mentorship.to_dict()
+        data['student'] = cards.get(data['student_id'])
+        results.append(data)
+    return results
@@ -0,0 +1,75 @@
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from flask import request
+from mongoengine.queryset.visitor import Q
+
+MAX_PER_PAGE = 100
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(document):
+    """Build an opaque cursor from a document's (created_at, _id) position"""
+    position = [document.created_at.isoformat(), str(document.id)]
+    return base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, document_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return datetime.fromisoformat(created_at), ObjectId(document_id)
+    except (ValueError, TypeError, InvalidId):
+        raise InvalidCursor('Invalid cursor')
+
+
+def paginate(query, default_per_page=10, ranked=False):
+    """Page a queryset newest first.
+
+    Requests carrying a ``cursor`` argument (an empty value starts from the
+    top) are served by keyset pagination on ``(created_at, _id)``, which stays
+    on the compound indexes and does not shift when new rows arrive. Other
+    requests keep the ``page``/``per_page`` contract. Both return a
+    ``next_cursor`` so clients can switch over at any point.
+
+    ``ranked`` querysets keep their own ordering (e.g. text score) and are
+    always paged by offset, without a cursor.
+
+    Returns the documents of the page and the pagination fields of the
+    response.
+    """
+    per_page = request.args.get('per_page', default_per_page, type=int)
+    per_page = max(1, min(per_page, MAX_PER_PAGE))
+    cursor = None if ranked else request.args.get('cursor')
+    if not ranked:
+        query = query.order_by('-created_at', '-id')
+
+    if cursor is not None:
+        if cursor:
+            created_at, document_id = decode_cursor(cursor)
+            query = query.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=document_id)
+            )
+        documents = list(query.limit(per_page + 1))
+        has_more = len(documents) > per_page
+        documents = documents[:per_page]
+        return documents, {
+            'per_page': per_page,
+            'next_cursor': encode_cursor(documents[-1]) if has_more else None
+        }
+
+    page = max(1, request.args.get('page', 1, type=int))
+    total = query.count()
+    documents = list(query.skip((page - 1) * per_page).limit(per_page))
+    has_more = page * per_page < total and not ranked
+    return documents, {
+        'total': total,
+        'pages': (total + per_page - 1) // per_page,
+        'current_page': page,
+        'per_page': per_page,
+        'next_cursor': encode_cursor(documents[-1]) if has_more and documents else None
+    }
@@ -0,0 +1,149 @@
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt as _bcrypt
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full; callers answer 503"""
+
+    def __init__(self, retry_after):
+        super().__init__('Too many password operations in progress, try again shortly')
+        self.retry_after = retry_after
+
+
+def _hash(password, rounds):
+    return _bcrypt.hashpw(password.encode('utf-8'), _bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _verify(password_hash, password):
+    try:
+        return _bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+    except ValueError:
+        # Not a bcrypt hash
+        return False
+
+
+def hash_rounds(password_hash):
+    """Cost factor of a bcrypt hash, e.g. 12 for ``$2b$12$...``"""
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """Runs bcrypt in a bounded pool of worker processes.
+
+    Hashing is CPU bound for tens of milliseconds per call; in a process pool
+    it no longer holds request threads' GIL. At most ``max_queue`` operations
+    may be queued or running; beyond that calls fail fast with
+    PasswordHasherBusy instead of piling up behind a login burst. With zero
+    workers hashing runs inline, for scripts and development.
+
+    Spawned workers re-import the ``__main__`` script, so entry points must
+    only build the app in the parent process (see run.py).
+    """
+
+    def __init__(self, app=None):
+        self.rounds = 12
+        self.workers = 0
+        self.max_queue = 0
+        self.timeout = None
+        self.retry_after = 1
+        self._executor = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.rounds = app.config.get('BCRYPT_LOG_ROUNDS', 12)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', 2)
+        self.max_queue = app.config.get('PASSWORD_HASH_MAX_QUEUE', 32)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 10)
+        self.retry_after = app.config.get('PASSWORD_HASH_RETRY_AFTER', 1)
+
+    def _pool(self):
+        # Created on first use so forking servers start it in each worker;
+        # spawned children never inherit the parent's sockets or locks
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                atexit.register(self.shutdown)
+            return self._executor
+
+    def _run(self, func, *args):
+        if not self.workers:
+            result = func(*args)
+            self._count('completed')
+            return result
+
+        with self._lock:
+            if self._in_flight >= self.max_queue:
+                self.rejected += 1
+                raise PasswordHasherBusy(self.retry_after)
+            self._in_flight += 1
+        try:
+            future = self._pool().submit(func, *args)
+        except BaseException:
+            self._release()
+            raise
+        # The slot is held until the work finishes, even if the caller times out
+        future.add_done_callback(lambda _: self._release())
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # The pool is saturated or a worker is stuck; shed the request
+            self._count('rejected')
+            raise PasswordHasherBusy(self.retry_after)
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool on the next call
+            self.shutdown()
+            raise
+        self._count('completed')
+        return result
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def hash(self, password):
+        return self._run(_hash, password, self.rounds)
+
+    def verify(self, password_hash, password):
+        if not password_hash:
+            return False
+        return self._run(_verify, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True when a hash was made with a different cost factor than configured"""
+        return hash_rounds(password_hash) != self.rounds
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'rounds': self.rounds,
+                'queue_limit': self.max_queue,
+                'in_flight': self._in_flight,
+                'completed': self.completed,
+                'rejected': self.rejected
+            }
@@ -0,0 +1,109 @@
+from datetime import datetime
+from app.models import PlatformStats, Campaign, Donation
+from app.utils.aggregation import group_totals, count_if
+
+GLOBAL_KEY = 'global'
+FIELDS = ['total_campaigns', 'active_campaigns', 'total_goal', 'total_raised',
+          'donation_count', 'donation_amount']
+
+
+def _increment(**deltas):
+    """Apply deltas to the totals document in one atomic $inc.
+
+    No upsert: while the document does not exist the next read rebuilds it
+    from the source collections, which already include this change.
+    """
+    updates = {f'inc__{field}': value for field, value in deltas.items() if value}
+    if updates:
+        PlatformStats.objects(key=GLOBAL_KEY).update_one(set__updated_at=datetime.utcnow(), **updates)
+
+
+def campaign_snapshot(campaign):
+    """The campaign fields that feed the platform totals"""
+    return {
+        'active': campaign.status == 'active',
+        'goal_amount': campaign.goal_amount or 0.0,
+        'raised_amount': campaign.raised_amount or 0.0
+    }
+
+
+def record_campaign_created(campaign):
+    snapshot = campaign_snapshot(campaign)
+    _increment(
+        total_campaigns=1,
+        active_campaigns=int(snapshot['active']),
+        total_goal=snapshot['goal_amount'],
+        total_raised=snapshot['raised_amount']
+    )
+
+
+def record_campaign_updated(before, campaign):
+    """Apply the difference between a snapshot taken before an update and now"""
+    after = campaign_snapshot(campaign)
+    _increment(
+        active_campaigns=int(after['active']) - int(before['active']),
+        total_goal=after['goal_amount'] - before['goal_amount'],
+        total_raised=after['raised_amount'] - before['raised_amount']
+    )
+
+
+def record_campaign_deleted(campaign):
+    snapshot = campaign_snapshot(campaign)
+    _increment(
+        total_campaigns=-1,
+        active_campaigns=-int(snapshot['active']),
+        total_goal=-snapshot['goal_amount'],
+        total_raised=-snapshot['raised_amount']
+    )
+
+
+def record_donations(count, amount):
+    """Account for completed donations, which also raise campaign totals"""
+    _increment(donation_count=count, donation_amount=amount, total_raised=amount)
+
+
+def compute_platform_stats():
+    """Recompute the totals from the source collections"""
+    campaigns = group_totals(Campaign, {
+        'total_campaigns': {'$sum': 1},
+        'active_campaigns': count_if({'$eq': ['$status', 'active']}),
+        'total_goal': {'$sum': '$goal_amount'},
+        'total_raised': {'$sum': '$raised_amount'}
+    })
+    donations = group_totals(Donation, {
+        'donation_count': {'$sum': 1},
+        'donation_amount': {'$sum': '$amount'}
+    }, match={'status': 'completed'})
+    return {**campaigns, **donations}
+
+
+def rebuild_platform_stats():
+    """Overwrite the totals document with freshly computed values.
+
+    Returns the drift found, as ``{field: {'stored': ..., 'actual': ...}}``
+    for every field whose stored value was off.
+    """
+    actual = compute_platform_stats()
+    stored = PlatformStats.objects(key=GLOBAL_KEY).first()
+
+    drift = {}
+    for field in FIELDS:
+        stored_value = getattr(stored, field) if stored else None
+        if stored_value is None or abs(stored_value - actual[field]) > 1e-6:
+            drift[field] = {'stored': stored_value, 'actual': actual[field]}
+
+    PlatformStats.objects(key=GLOBAL_KEY).update_one(
+        upsert=True,
+        set__updated_at=datetime.utcnow(),
+        **{f'set__{field}': value for field, value in actual.items()}
+    )
+    return drift
+
+
+def get_platform_stats():
+    """Read the totals document, building it on first use"""
+    stats = PlatformStats.objects(key=GLOBAL_KEY).first()
+    if not stats:
+        rebuild_platform_stats()
+        stats = PlatformStats.objects(key=GLOBAL_KEY).first()
+    return stats
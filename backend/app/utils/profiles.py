@@ -0,0 +1,33 @@
+from flask import jsonify
+from app.utils.http_cache import compute_etag, document_version, not_modified, with_etag
+from app.utils.identity import current_identity
+
+
+def build_profile(user, role_profile):
+    """User fields plus the role profile under ``<role>_profile``.
+
+    The profile's ``user`` reference already points at ``user`` (see
+    IdentityCache.load), so serializing it does not fetch the user again.
+    """
+    profile_data = user.to_dict()
+    if role_profile:
+        profile_data[f'{user.role}_profile'] = role_profile.to_dict()
+    return profile_data
+
+
+def profile_response():
+    """Profile of the authenticated user with an ETag, or 304 if the client has it.
+
+    The user and role profile come from the identity already resolved for
+    this request, and the serialized profile is cached with them, so a
+    warm request makes no database round trip.
+    """
+    from app import identity_cache
+
+    user, role_profile = current_identity()
+    etag = compute_etag(document_version(user), document_version(role_profile))
+    unchanged = not_modified(etag)
+    if unchanged is not None:
+        return unchanged
+
+    return with_etag((jsonify(identity_cache.view(user, role_profile, build_profile)), 200), etag)
@@ -0,0 +1,153 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from flask import g, jsonify, request
+from flask_jwt_extended import decode_token
+
+# Endpoints never limited: liveness checks must keep answering under load
+EXEMPT_ENDPOINTS = {'health_check', 'static'}
+
+
+class TokenBuckets:
+    """One token bucket per key, refilled continuously.
+
+    Holds at most ``max_keys`` buckets; the least recently used are dropped,
+    which only ever forgives a client, never punishes one.
+    """
+
+    def __init__(self, capacity, period, max_keys=100000):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def take(self, key):
+        """Spend a token; returns 0 if allowed, else seconds until one is available"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated_at) * self.rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                wait = 0
+            else:
+                self._buckets[key] = (tokens, now)
+                wait = (1 - tokens) / self.rate
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+
+class RateLimiter:
+    """Admission control run before every request.
+
+    In order: a global cap on concurrent requests (503 when full), then a
+    token bucket per authenticated user, or per client IP for anonymous
+    requests, and one per expensive route (429 when empty). Signed-in users
+    behind one NAT or proxy therefore do not share a budget. Every rejection
+    carries Retry-After and happens before the view runs, so shed requests
+    never reach MongoDB. Budgets are per process.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.ip_buckets = None
+        self.user_buckets = None
+        self.route_buckets = {}
+        self._slots = None
+        self.max_concurrent = 0
+        self.counters = {'allowed': 0, 'shed': 0, 'ip': 0, 'user': 0, 'route': 0}
+        self._counter_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RATE_LIMIT_ENABLED', True)
+        limits = app.config.get('RATE_LIMITS', {})
+        self.ip_buckets = TokenBuckets(*limits['ip']) if limits.get('ip') else None
+        self.user_buckets = TokenBuckets(*limits['user']) if limits.get('user') else None
+        self.route_buckets = {
+            route: TokenBuckets(*limit)
+            for route, limit in app.config.get('ROUTE_RATE_LIMITS', {}).items()
+        }
+        self.max_concurrent = app.config.get('MAX_CONCURRENT_REQUESTS', 0)
+        self._slots = threading.BoundedSemaphore(self.max_concurrent) if self.max_concurrent else None
+        self.shed_retry_after = app.config.get('SHED_RETRY_AFTER', 1)
+
+        if self.enabled:
+            app.before_request(self._admit)
+            app.teardown_request(self._release)
+
+    def _count(self, name):
+        with self._counter_lock:
+            self.counters[name] += 1
+
+    def _reject(self, status, reason, retry_after):
+        self._count(reason)
+        response = jsonify({'error': 'Too many requests' if status == 429 else 'Server busy, try again shortly'})
+        response.status_code = status
+        response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+        return response
+
+    def _admit(self):
+        if request.method == 'OPTIONS' or request.endpoint in EXEMPT_ENDPOINTS:
+            return None
+
+        if self._slots is not None:
+            if not self._slots.acquire(blocking=False):
+                return self._reject(503, 'shed', self.shed_retry_after)
+            g.rate_limit_slot = True
+
+        client = request.remote_addr or 'unknown'
+        user_id = _token_subject()
+        if user_id:
+            if self.user_buckets:
+                wait = self.user_buckets.take(user_id)
+                if wait:
+                    return self._reject(429, 'user', wait)
+        elif self.ip_buckets:
+            wait = self.ip_buckets.take(client)
+            if wait:
+                return self._reject(429, 'ip', wait)
+
+        route = _route_key()
+        buckets = self.route_buckets.get(route)
+        if buckets:
+            wait = buckets.take(user_id or client)
+            if wait:
+                return self._reject(429, 'route', wait)
+
+        self._count('allowed')
+        return None
+
+    def _release(self, error=None):
+        if g.pop('rate_limit_slot', False):
+            self._slots.release()
+
+    def stats(self):
+        with self._counter_lock:
+            stats = dict(self.counters)
+        if self._slots is not None:
+            stats['in_flight'] = self.max_concurrent - self._slots._value
+            stats['max_concurrent'] = self.max_concurrent
+        return stats
+
+
+def _token_subject():
+    """User id from a bearer token, checking only its signature (no database)"""
+    header = request.headers.get('Authorization', '')
+    if not header.startswith('Bearer '):
+        return None
+    try:
+        return str(decode_token(header[7:], allow_expired=True)['sub'])
+    except Exception:
+        return None
+
+
+def _route_key():
+    """Budget a request is charged to: its endpoint, or 'search' for text searches"""
+    if request.endpoint == 'campaigns.get_campaigns' and request.args.get('search'):
+        return 'search'
+    return request.endpoint
@@ -0,0 +1,121 @@
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+class TokenBlocklist:
+    """In-memory set of revoked JWT ids in front of the revoked_tokens collection.
+
+    Checks are a set lookup. Revocations made by other processes are pulled
+    in by a single query every ``sync_interval`` seconds, so they take effect
+    everywhere within that interval. Entries leave the set when the token
+    would have expired, in expiry order, so it only holds live tokens.
+    """
+
+    def __init__(self, app=None):
+        self.sync_interval = 5
+        self.sync_overlap = timedelta(seconds=60)
+        self._revoked = {}  # jti -> expiry timestamp
+        self._expiry = []  # heap of (expiry timestamp, jti)
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._watermark = None
+        self._next_sync = 0
+        self.checks = 0
+        self.syncs = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.sync_interval = app.config.get('TOKEN_REVOCATION_SYNC_INTERVAL', 5)
+        # Revocations are read back from a little before the last sync to
+        # cover clock skew between processes and inserts still in flight
+        self.sync_overlap = timedelta(seconds=app.config.get('TOKEN_REVOCATION_SYNC_OVERLAP', 60))
+
+    def _add(self, jti, expires):
+        if jti not in self._revoked:
+            self._revoked[jti] = expires
+            heapq.heappush(self._expiry, (expires, jti))
+
+    def _evict(self, now):
+        while self._expiry and self._expiry[0][0] <= now:
+            _, jti = heapq.heappop(self._expiry)
+            self._revoked.pop(jti, None)
+
+    def _sync(self):
+        from app.models import RevokedToken
+
+        started = datetime.utcnow()
+        if self._watermark is None:
+            # First load: every token that has not expired yet
+            query = RevokedToken.objects(expires_at__gt=started)
+        else:
+            query = RevokedToken.objects(revoked_at__gte=self._watermark - self.sync_overlap)
+        rows = list(query.only('jti', 'expires_at').as_pymongo())
+        with self._lock:
+            for row in rows:
+                self._add(row['_id'], _timestamp(row['expires_at']))
+        self._watermark = started
+        self.syncs += 1
+
+    def _maybe_sync(self, now):
+        if now < self._next_sync or not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            if now >= self._next_sync:
+                self._sync()
+                self._next_sync = now + self.sync_interval
+        finally:
+            self._sync_lock.release()
+
+    def is_revoked(self, jti):
+        now = time.time()
+        self._maybe_sync(now)
+        with self._lock:
+            self.checks += 1
+            self._evict(now)
+            return jti in self._revoked
+
+    def revoke(self, jwt_data):
+        """Revoke one decoded token until its expiry"""
+        from app.models import RevokedToken
+
+        # Upsert, so revoking the same token twice is harmless
+        RevokedToken.objects(jti=jwt_data['jti']).update_one(
+            upsert=True,
+            set_on_insert__user_id=str(jwt_data['sub']),
+            set_on_insert__token_type=jwt_data.get('type'),
+            set_on_insert__expires_at=datetime.utcfromtimestamp(jwt_data['exp']),
+            set_on_insert__revoked_at=datetime.utcnow()
+        )
+        with self._lock:
+            self._add(jwt_data['jti'], jwt_data['exp'])
+
+    def stats(self):
+        with self._lock:
+            return {
+                'revoked': len(self._revoked),
+                'checks': self.checks,
+                'syncs': self.syncs
+            }
+
+
+def _timestamp(moment):
+    return (moment - datetime(1970, 1, 1)).total_seconds()
+
+
+def revoked_by_user(user, jwt_data):
+    """True when the token was issued before the user revoked all their sessions.
+
+    Tokens carry the user's ``token_version`` as ``ver``, which logout-all
+    increments, so a login in the same second as the logout stays valid.
+    Only older versions are revoked; a newer one means ``user`` is stale.
+    Older tokens without the claim fall back to ``iat``, which only has whole
+    seconds: one issued in the second of the logout counts as revoked.
+    """
+    if not user:
+        return False
+    if 'ver' in jwt_data:
+        return jwt_data['ver'] < (user.token_version or 0)
+    return bool(user.tokens_revoked_at and jwt_data['iat'] <= int(_timestamp(user.tokens_revoked_at)))
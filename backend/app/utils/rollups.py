@@ -0,0 +1,241 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app.models import DonationRollup, Campaign, Donation
+
+GRANULARITIES = ('hour', 'day')
+SCOPES = ('global', 'campaign', 'category', 'ngo')
+STEPS = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1)
+}
+# Hour buckets are dropped by a TTL index after this; windows reaching
+# further back are answered at day resolution
+HOUR_RETENTION = timedelta(days=90)
+MAX_TREND_BUCKETS = 1000
+INSERT_BATCH_SIZE = 1000
+DUPLICATE_KEY = 11000
+
+
+class InvalidWindow(ValueError):
+    pass
+
+
+def floor_bucket(moment, granularity):
+    if granularity == 'hour':
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def ceil_bucket(moment, granularity):
+    floored = floor_bucket(moment, granularity)
+    return floored if floored == moment else floored + STEPS[granularity]
+
+
+def _campaign_scopes(campaign_ids):
+    """Category and NGO id of each campaign, in one query"""
+    cursor = Campaign._get_collection().find({'_id': {'$in': list(campaign_ids)}}, {'category': 1, 'ngo': 1})
+    return {campaign['_id']: (campaign.get('category'), campaign.get('ngo')) for campaign in cursor}
+
+
+def _scope_keys(campaign_id, campaign_scopes):
+    category, ngo_id = campaign_scopes.get(campaign_id, (None, None))
+    keys = [('global', ''), ('campaign', str(campaign_id))]
+    if category:
+        keys.append(('category', category))
+    if ngo_id:
+        keys.append(('ngo', str(ngo_id)))
+    return keys
+
+
+def accumulate(entries):
+    """Sum donations into ``{(scope, scope_id, granularity, bucket): [count, amount]}``.
+
+    ``entries`` are raw documents with campaign, created_at and amount, and
+    optionally a count when they are already grouped.
+    """
+    entries = list(entries)
+    campaign_scopes = _campaign_scopes({entry['campaign'] for entry in entries})
+    oldest_hour = datetime.utcnow() - HOUR_RETENTION
+    totals = defaultdict(lambda: [0, 0.0])
+    for entry in entries:
+        for scope, scope_id in _scope_keys(entry['campaign'], campaign_scopes):
+            for granularity in GRANULARITIES:
+                bucket = floor_bucket(entry['created_at'], granularity)
+                if granularity == 'hour' and bucket < oldest_hour:
+                    continue
+                total = totals[(scope, scope_id, granularity, bucket)]
+                total[0] += entry.get('count', 1)
+                total[1] += entry['amount']
+    return totals
+
+
+def _expires_at(granularity, bucket):
+    return bucket + HOUR_RETENTION if granularity == 'hour' else None
+
+
+def _upsert(key, count, amount):
+    scope, scope_id, granularity, bucket = key
+    update = {'$inc': {'count': count, 'amount': amount}}
+    expires_at = _expires_at(granularity, bucket)
+    if expires_at:
+        update['$setOnInsert'] = {'expires_at': expires_at}
+    return UpdateOne(
+        {'scope': scope, 'scope_id': scope_id, 'granularity': granularity, 'bucket': bucket},
+        update,
+        upsert=True
+    )
+
+
+def record_rollups(donations):
+    """Add completed donations to their hour and day buckets in one bulk write.
+
+    A donation touches eight buckets: hour and day, for the platform, its
+    campaign, the campaign's category and its NGO.
+    """
+    totals = accumulate(donations)
+    if not totals:
+        return
+    operations = [_upsert(key, count, amount) for key, (count, amount) in totals.items()]
+    collection = DonationRollup._get_collection()
+    try:
+        collection.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        # Two writers upserting a new bucket at once: the loser hits the
+        # unique index and its retry finds the bucket to increment
+        errors = e.details['writeErrors']
+        if any(error['code'] != DUPLICATE_KEY for error in errors):
+            raise
+        collection.bulk_write([operations[error['index']] for error in errors], ordered=False)
+
+
+def _check_scope(scope, scope_id):
+    if scope not in SCOPES:
+        raise InvalidWindow(f'Unknown scope: {scope}')
+    if (scope == 'global') != (not scope_id):
+        raise InvalidWindow('An id is required for every scope except global')
+
+
+def _sum_buckets(ranges, scope, scope_id):
+    clauses = [
+        {'granularity': granularity, 'bucket': {'$gte': start, '$lt': end}}
+        for granularity, start, end in ranges
+        if start < end
+    ]
+    count, amount = 0, 0.0
+    if clauses:
+        cursor = DonationRollup._get_collection().find(
+            {'scope': scope, 'scope_id': scope_id, '$or': clauses},
+            {'count': 1, 'amount': 1}
+        )
+        for bucket in cursor:
+            count += bucket['count']
+            amount += bucket['amount']
+    return {'count': count, 'amount': amount}
+
+
+def window_totals(start, end, scope='global', scope_id=''):
+    """Completed donation count and amount between two moments.
+
+    Whole days inside the window come from day buckets and the partial days
+    at either edge from hour buckets, so a 30-day window reads about 80
+    small documents. Resolution is one hour, one day beyond HOUR_RETENTION.
+    """
+    _check_scope(scope, scope_id)
+    if start < datetime.utcnow() - HOUR_RETENTION:
+        start = floor_bucket(start, 'day')
+    start = floor_bucket(start, 'hour')
+    end = ceil_bucket(end, 'hour')
+    days_start = ceil_bucket(start, 'day')
+    days_end = floor_bucket(end, 'day')
+
+    if days_start < days_end:
+        ranges = [('day', days_start, days_end), ('hour', start, days_start), ('hour', days_end, end)]
+    else:
+        ranges = [('hour', start, end)]
+    return _sum_buckets(ranges, scope, scope_id)
+
+
+def trend(start, end, granularity='day', scope='global', scope_id=''):
+    """One point per hour or day of the window, zero-filled"""
+    if granularity not in GRANULARITIES:
+        raise InvalidWindow(f'Unknown granularity: {granularity}')
+    _check_scope(scope, scope_id)
+    step = STEPS[granularity]
+    start = floor_bucket(start, granularity)
+    end = ceil_bucket(end, granularity)
+    if start >= end:
+        raise InvalidWindow('from must be before to')
+    if (end - start) / step > MAX_TREND_BUCKETS:
+        raise InvalidWindow(f'At most {MAX_TREND_BUCKETS} buckets per request')
+
+    cursor = DonationRollup._get_collection().find(
+        {'scope': scope, 'scope_id': scope_id, 'granularity': granularity,
+         'bucket': {'$gte': start, '$lt': end}},
+        {'bucket': 1, 'count': 1, 'amount': 1}
+    )
+    found = {bucket['bucket']: bucket for bucket in cursor}
+
+    points = []
+    bucket = start
+    while bucket < end:
+        stored = found.get(bucket, {})
+        points.append({
+            'bucket': bucket.isoformat(),
+            'count': stored.get('count', 0),
+            'amount': stored.get('amount', 0.0)
+        })
+        bucket += step
+    return points
+
+
+def rebuild_rollups():
+    """Recompute every bucket from completed donations.
+
+    Donations are grouped per campaign and hour in the database, then
+    fanned out to all scopes. Run while donation traffic is paused:
+    donations settled during the rebuild may be counted twice or missed.
+    Returns the number of buckets written.
+    """
+    grouped = Donation._get_collection().aggregate([
+        {'$match': {'status': 'completed'}},
+        {'$group': {
+            '_id': {
+                'campaign': '$campaign',
+                'year': {'$year': '$created_at'},
+                'month': {'$month': '$created_at'},
+                'day': {'$dayOfMonth': '$created_at'},
+                'hour': {'$hour': '$created_at'}
+            },
+            'count': {'$sum': 1},
+            'amount': {'$sum': '$amount'}
+        }}
+    ], allowDiskUse=True)
+    totals = accumulate(
+        {
+            'campaign': entry['_id']['campaign'],
+            'created_at': datetime(entry['_id']['year'], entry['_id']['month'],
+                                   entry['_id']['day'], entry['_id']['hour']),
+            'count': entry['count'],
+            'amount': entry['amount']
+        }
+        for entry in grouped
+    )
+
+    collection = DonationRollup._get_collection()
+    collection.delete_many({})
+    documents = []
+    for (scope, scope_id, granularity, bucket), (count, amount) in totals.items():
+        document = {'scope': scope, 'scope_id': scope_id, 'granularity': granularity,
+                    'bucket': bucket, 'count': count, 'amount': amount}
+        expires_at = _expires_at(granularity, bucket)
+        if expires_at:
+            document['expires_at'] = expires_at
+        documents.append(document)
+        if len(documents) >= INSERT_BATCH_SIZE:
+            collection.insert_many(documents)
+            documents = []
+    if documents:
+        collection.insert_many(documents)
+    return len(totals)
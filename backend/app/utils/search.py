@@ -0,0 +1,28 @@
+from datetime import datetime
+from app.models import Campaign, NGO
+
+# Language of the campaign text index; drives stemming and stop words
+SEARCH_LANGUAGE = 'english'
+
+
+def search_campaigns(query, text):
+    """Restrict a campaign queryset to a full-text match, best matches first.
+
+    Served by the weighted ``campaign_text_search`` index over title,
+    descriptions, location and NGO name, so it composes with the regular
+    category/status filters without scanning the collection.
+    """
+    return query.search_text(text, language=SEARCH_LANGUAGE).order_by('$text_score')
+
+
+def sync_ngo_name(ngo):
+    """Propagate an NGO's name to the search field of its campaigns"""
+    return Campaign.objects(ngo=ngo).update(set__ngo_name=ngo.name, set__updated_at=datetime.utcnow())
+
+
+def backfill_ngo_names():
+    """Fill ngo_name on every campaign from its NGO, one update per NGO"""
+    updated = 0
+    for ngo in NGO.objects.only('name'):
+        updated += sync_ngo_name(ngo)
+    return updated
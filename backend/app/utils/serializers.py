@@ -0,0 +1,45 @@
+from bson import DBRef
+
+
+def prefetch_related(documents, *fields):
+    """Resolve ReferenceFields for a page of documents.
+
+    Each referenced collection is loaded with a single ``$in`` query and the
+    results are attached to the documents, so ``to_dict()`` can follow the
+    references without going back to MongoDB once per row.
+    """
+    documents = list(documents)
+    if not documents:
+        return documents
+
+    document_class = type(documents[0])
+    for field_name in fields:
+        field = document_class._fields[field_name]
+        ids = set()
+        for document in documents:
+            value = document._data.get(field_name)
+            if isinstance(value, DBRef):
+                ids.add(value.id)
+
+        if not ids:
+            continue
+
+        related = {obj.pk: obj for obj in field.document_type.objects(pk__in=list(ids))}
+        for document in documents:
+            value = document._data.get(field_name)
+            if isinstance(value, DBRef) and value.id in related:
+                document._data[field_name] = related[value.id]
+
+    return documents
+
+
+def serialize_page(documents, *fields, only=None):
+    """Serialize a page of documents after resolving their references in bulk.
+
+    ``only`` limits the output to a set of serialized field names, for
+    documents whose ``to_dict()`` supports it.
+    """
+    documents = prefetch_related(documents, *fields)
+    if only is None:
+        return [document.to_dict() for document in documents]
+    return [document.to_dict(fields=only) for document in documents]
@@ -0,0 +1,48 @@
+import json
+import re
+
+# Separators between tags in a free-form expertise or interests string
+TAG_SEPARATORS = re.compile(r'[,;|\n]+')
+# Words in free text (bios, goals); keeps c++, c#, node.js
+WORD = re.compile(r'[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]')
+STOP_WORDS = {
+    'a', 'about', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'have', 'i', 'in',
+    'into', 'is', 'it', 'like', 'me', 'my', 'of', 'on', 'or', 'our', 'that', 'the', 'their',
+    'this', 'to', 'want', 'we', 'with', 'would', 'you', 'your', 'years', 'year', 'help',
+    'experience', 'work', 'working', 'learn', 'learning', 'become', 'get', 'also', 'am'
+}
+
+
+def normalize_tag(tag):
+    """Lowercase, single-spaced form of a tag, or '' if nothing is left"""
+    tag = ' '.join(str(tag).lower().split())
+    return tag.strip(' .-_\'"()[]{}')
+
+
+def parse_tags(value):
+    """Normalized, de-duplicated tags from a list, a JSON list or a comma-separated string"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        text = value.strip()
+        if text.startswith('['):
+            try:
+                value = json.loads(text)
+            except ValueError:
+                value = TAG_SEPARATORS.split(text.strip('[]'))
+        else:
+            value = TAG_SEPARATORS.split(text)
+
+    tags = []
+    for tag in value:
+        tag = normalize_tag(tag)
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def text_terms(text):
+    """Content words of free text, for matching beyond explicit tags"""
+    if not text:
+        return []
+    return [word for word in WORD.findall(str(text).lower()) if word not in STOP_WORDS and len(word) > 1]
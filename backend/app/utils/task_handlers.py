@@ -0,0 +1,149 @@
+from datetime import timedelta
+from flask import current_app
+from flask_mail import Message
+from app.models import Donation, Mentorship, NGO, User
+from app.utils.serializers import prefetch_related
+from app.utils.tasks import task, enqueue
+
+# Notifications wait this long so a burst for one recipient goes out as one email
+COALESCE_DELAY = timedelta(seconds=60)
+
+MENTORSHIP_EVENTS = {
+    'requested': 'New mentorship request from {student}',
+    'accepted': '{mentor} accepted your mentorship request',
+    'rejected': '{mentor} declined your mentorship request',
+    'completed': 'Your mentorship with {other} is complete',
+    'cancelled': 'Your mentorship with {other} was cancelled'
+}
+
+
+def send_email(user, subject, body):
+    from app import mail
+
+    if not user or not user.email:
+        return
+    mail.send(Message(subject=subject, recipients=[user.email], body=body,
+                      sender=current_app.config.get('MAIL_DEFAULT_SENDER')))
+
+
+def _full_name(user):
+    return f'{user.first_name} {user.last_name}' if user else 'Unknown'
+
+
+def queue_donation_receipt(donation, donor_id):
+    enqueue('donation_receipt', {'donation_id': str(donation.id)}, dedup_key=f'receipt:{donation.id}',
+            batch_key=f'receipt:{donor_id}', delay=COALESCE_DELAY)
+
+
+@task('donation_receipt', batched=True)
+def send_donation_receipts(payloads):
+    """One receipt per donor covering every donation queued for them since the last one"""
+    donations = list(Donation.objects(id__in=[payload['donation_id'] for payload in payloads], status='completed'))
+    prefetch_related(donations, 'donor', 'campaign')
+
+    by_donor = {}
+    for donation in donations:
+        if donation.donor:
+            by_donor.setdefault(donation.donor.pk, (donation.donor, []))[1].append(donation)
+
+    for donor, donor_donations in by_donor.values():
+        lines = [
+            f'- {donation.amount:.2f} to {donation.campaign.title if donation.campaign else "a campaign"}'
+            f' (transaction {donation.transaction_id})'
+            for donation in donor_donations
+        ]
+        total = sum(donation.amount for donation in donor_donations)
+        subject = 'Thank you for your donation' if len(donor_donations) == 1 else \
+            f'Thank you for your {len(donor_donations)} donations'
+        send_email(donor, subject, '\n'.join([
+            f'Dear {donor.first_name},',
+            '',
+            'We received:',
+            *lines,
+            '',
+            f'Total: {total:.2f}',
+            '',
+            'EduBridge'
+        ]))
+
+
+def queue_ngo_approval(ngo_id):
+    enqueue('ngo_approved', {'ngo_id': str(ngo_id)}, dedup_key=f'ngo-approved:{ngo_id}')
+
+
+@task('ngo_approved')
+def send_ngo_approval(payload):
+    ngo = NGO.objects(id=payload['ngo_id']).first()
+    if not ngo:
+        return
+    send_email(ngo.user, f'{ngo.name} is verified on EduBridge', '\n'.join([
+        f'Dear {ngo.user.first_name},',
+        '',
+        f'{ngo.name} has been verified. Its campaigns now show as coming from a verified NGO.',
+        '',
+        'EduBridge'
+    ]))
+
+
+def queue_mentorship_notification(mentorship, event, recipient_id):
+    """Tell one side of a mentorship about an event; ``event`` is a key of MENTORSHIP_EVENTS"""
+    if recipient_id is None:
+        return
+    enqueue('mentorship_notification',
+            {'mentorship_id': str(mentorship.id), 'event': event, 'recipient_id': str(recipient_id)},
+            dedup_key=f'mentorship:{mentorship.id}:{event}', batch_key=f'mentorship:{recipient_id}',
+            delay=COALESCE_DELAY)
+
+
+@task('mentorship_notification', batched=True)
+def send_mentorship_notifications(payloads):
+    """Mentorship events, coalesced into one email per recipient"""
+    mentorships = {
+        str(mentorship.id): mentorship
+        for mentorship in prefetch_related(
+            Mentorship.objects(id__in=[payload['mentorship_id'] for payload in payloads]), 'mentor', 'student'
+        )
+    }
+    profiles = [
+        profile for mentorship in mentorships.values()
+        for profile in (mentorship.mentor, mentorship.student) if profile is not None
+    ]
+    prefetch_related(profiles, 'user')
+    recipients = {
+        str(user.id): user for user in User.objects(id__in=list({payload['recipient_id'] for payload in payloads}))
+    }
+
+    messages = {}
+    for payload in payloads:
+        mentorship = mentorships.get(payload['mentorship_id'])
+        recipient = recipients.get(payload['recipient_id'])
+        if payload['event'] not in MENTORSHIP_EVENTS or not recipient:
+            continue
+        if not mentorship or not mentorship.mentor or not mentorship.student:
+            continue
+        mentor = _full_name(mentorship.mentor.user)
+        student = _full_name(mentorship.student.user)
+        other = student if recipient.role == 'mentor' else mentor
+        messages.setdefault(recipient.pk, (recipient, []))[1].append(
+            MENTORSHIP_EVENTS[payload['event']].format(mentor=mentor, student=student, other=other)
+        )
+
+    for recipient, lines in messages.values():
+        subject = lines[0] if len(lines) == 1 else f'{len(lines)} mentorship updates'
+        send_email(recipient, subject, '\n'.join([
+            f'Dear {recipient.first_name},',
+            '',
+            *[f'- {line}' for line in lines],
+            '',
+            'EduBridge'
+        ]))
+
+
+def queue_analytics_refresh():
+    enqueue('refresh_analytics', dedup_key='refresh-analytics', max_attempts=1)
+
+
+@task('refresh_analytics')
+def refresh_analytics(payload):
+    from app import analytics
+    analytics.refresh()
@@ -0,0 +1,178 @@
+import random
+from datetime import datetime, timedelta
+from flask import current_app
+from mongoengine import NotUniqueError
+from pymongo import ReturnDocument
+from app.models import Task
+
+# Handlers by task name: (function, batched)
+HANDLERS = {}
+
+LEASE = timedelta(minutes=5)  # a claimed task whose worker vanished is retried after this
+MAX_BATCH = 50
+RETRY_BASE_DELAY = 30  # seconds; doubles with every failed attempt
+RETRY_MAX_DELAY = 3600
+FINISHED_RETENTION = timedelta(days=7)  # done and failed tasks are then dropped by a TTL index
+STATUSES = ('queued', 'running', 'done', 'failed')
+
+
+class UnknownTask(Exception):
+    pass
+
+
+def task(name, batched=False):
+    """Register a handler for a task name.
+
+    Plain handlers receive one payload. ``batched`` handlers receive the
+    payloads of every task claimed together under one ``batch_key``.
+    """
+    def register(func):
+        HANDLERS[name] = (func, batched)
+        return func
+    return register
+
+
+def enqueue(name, payload=None, dedup_key=None, batch_key=None, delay=None, max_attempts=5):
+    """Queue a task and return it; None if a task with ``dedup_key`` is already waiting or running"""
+    now = datetime.utcnow()
+    document = Task(
+        name=name,
+        payload=payload or {},
+        dedup_key=dedup_key,
+        batch_key=batch_key,
+        max_attempts=max_attempts,
+        run_at=now + delay if delay else now,
+        created_at=now,
+        updated_at=now
+    )
+    try:
+        document.save(force_insert=True)
+    except NotUniqueError:
+        return None
+    return document
+
+
+def _claim_update(worker_id, now):
+    return {
+        '$set': {'status': 'running', 'locked_by': worker_id, 'locked_until': now + LEASE, 'updated_at': now},
+        '$inc': {'attempts': 1}
+    }
+
+
+def claim(worker_id):
+    """Lock the next due task, plus the other due tasks of its batch for batched handlers.
+
+    Each task is taken with its own ``find_one_and_update``, so two workers
+    never run the same task. Tasks whose lease ran out are taken again.
+    Returns the claimed raw documents, or an empty list.
+    """
+    collection = Task._get_collection()
+    now = datetime.utcnow()
+    due = {'$or': [
+        {'status': 'queued', 'run_at': {'$lte': now}},
+        {'status': 'running', 'locked_until': {'$lt': now}}
+    ]}
+    first = collection.find_one_and_update(
+        due, _claim_update(worker_id, now), sort=[('run_at', 1)], return_document=ReturnDocument.AFTER
+    )
+    if first is None:
+        return []
+
+    claimed = [first]
+    if first.get('batch_key') and HANDLERS.get(first['name'], (None, False))[1]:
+        while len(claimed) < MAX_BATCH:
+            more = collection.find_one_and_update(
+                {'$and': [due, {'name': first['name'], 'batch_key': first['batch_key']}]},
+                _claim_update(worker_id, now),
+                sort=[('run_at', 1)],
+                return_document=ReturnDocument.AFTER
+            )
+            if more is None:
+                break
+            claimed.append(more)
+    return claimed
+
+
+def complete(tasks):
+    """Mark claimed tasks done, as long as this worker still holds them.
+
+    A handler that outlives ``LEASE`` may have lost its tasks to another
+    worker; those are left alone and reported. Returns how many were marked.
+    """
+    now = datetime.utcnow()
+    result = Task._get_collection().update_many(
+        {'_id': {'$in': [document['_id'] for document in tasks]}, 'locked_by': tasks[0]['locked_by']},
+        {
+            '$set': {'status': 'done', 'finished_at': now, 'expires_at': now + FINISHED_RETENTION,
+                     'updated_at': now},
+            '$unset': {'dedup_key': '', 'locked_by': '', 'locked_until': ''}
+        }
+    )
+    if result.matched_count < len(tasks):
+        current_app.logger.warning(
+            '%s: %d of %d %s tasks were reclaimed before they finished; the handler ran longer than the %s lease',
+            tasks[0]['locked_by'], len(tasks) - result.matched_count, len(tasks), tasks[0]['name'], LEASE
+        )
+    return result.matched_count
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter, so failing tasks do not retry in lockstep"""
+    delay = min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def fail(tasks, error):
+    """Reschedule failed tasks with backoff, or give up on those out of attempts"""
+    collection = Task._get_collection()
+    now = datetime.utcnow()
+    for document in tasks:
+        if document['attempts'] >= document.get('max_attempts', 5):
+            update = {
+                '$set': {'status': 'failed', 'last_error': error, 'finished_at': now,
+                         'expires_at': now + FINISHED_RETENTION, 'updated_at': now},
+                '$unset': {'dedup_key': '', 'locked_by': '', 'locked_until': ''}
+            }
+        else:
+            update = {
+                '$set': {'status': 'queued', 'last_error': error,
+                         'run_at': now + retry_delay(document['attempts']), 'updated_at': now},
+                '$unset': {'locked_by': '', 'locked_until': ''}
+            }
+        collection.update_one({'_id': document['_id'], 'locked_by': document['locked_by']}, update)
+
+
+def run(tasks):
+    """Run one claimed batch through its handler and record the outcome"""
+    name = tasks[0]['name']
+    try:
+        if name not in HANDLERS:
+            raise UnknownTask(f'No handler for task {name}')
+        handler, batched = HANDLERS[name]
+        if batched:
+            handler([document.get('payload', {}) for document in tasks])
+        else:
+            handler(tasks[0].get('payload', {}))
+    except Exception as e:
+        fail(tasks, f'{type(e).__name__}: {e}')
+        return False
+    complete(tasks)
+    return True
+
+
+def queue_stats():
+    """Task counts per name and status, and the age of the oldest due task"""
+    counts = {}
+    for row in Task._get_collection().aggregate([
+        {'$group': {'_id': {'name': '$name', 'status': '$status'}, 'count': {'$sum': 1}}}
+    ]):
+        counts.setdefault(row['_id']['name'], dict.fromkeys(STATUSES, 0))[row['_id']['status']] = row['count']
+
+    now = datetime.utcnow()
+    oldest = Task._get_collection().find_one(
+        {'status': 'queued', 'run_at': {'$lte': now}}, {'run_at': 1}, sort=[('run_at', 1)]
+    )
+    return {
+        'by_name': counts,
+        'oldest_due_seconds': round((now - oldest['run_at']).total_seconds(), 1) if oldest else 0
+    }
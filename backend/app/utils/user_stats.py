@@ -0,0 +1,129 @@
+from datetime import datetime
+from bson import ObjectId
+from pymongo import ReplaceOne, UpdateOne
+from app.models import UserStats, Campaign, Donation, Mentor, Mentorship, NGO
+from app.utils.aggregation import group_totals
+
+FIELDS = ['donation_count', 'donation_amount', 'campaigns_created', 'students_mentored']
+
+
+def _increment_update(user_id, deltas):
+    """Filter and $inc of one user's counters.
+
+    No upsert: while a user has no document the next read computes it from
+    the source collections, which already include this change.
+    """
+    return (
+        {'_id': ObjectId(str(user_id))},
+        {'$inc': deltas, '$set': {'updated_at': datetime.utcnow()}}
+    )
+
+
+def _increment(user_id, **deltas):
+    deltas = {field: value for field, value in deltas.items() if value}
+    if deltas:
+        UserStats._get_collection().update_one(*_increment_update(user_id, deltas))
+
+
+def record_user_donations(donations):
+    """Count completed donations towards their donors, from raw ``{donor, amount}`` documents"""
+    totals = {}
+    for donation in donations:
+        if donation.get('donor'):
+            count, amount = totals.get(donation['donor'], (0, 0.0))
+            totals[donation['donor']] = (count + 1, amount + donation['amount'])
+    if totals:
+        UserStats._get_collection().bulk_write([
+            UpdateOne(*_increment_update(donor_id, {'donation_count': count, 'donation_amount': amount}))
+            for donor_id, (count, amount) in totals.items()
+        ], ordered=False)
+
+
+def record_user_campaigns(user_id, delta):
+    """An NGO user created (1) or deleted (-1) a campaign"""
+    _increment(user_id, campaigns_created=delta)
+
+
+def record_user_mentored(user_id):
+    """A mentor accepted a student; completing or cancelling later does not undo it"""
+    _increment(user_id, students_mentored=1)
+
+
+def compute_user_stats(user_id):
+    """Recompute one user's counters with indexed aggregations on the source collections"""
+    user_id = ObjectId(str(user_id))
+    donations = group_totals(Donation, {
+        'donation_count': {'$sum': 1},
+        'donation_amount': {'$sum': '$amount'}
+    }, match={'donor': user_id, 'status': 'completed'})
+
+    ngo_ids = list(NGO.objects(user=user_id).scalar('id'))
+    mentor_ids = list(Mentor.objects(user=user_id).scalar('id'))
+    return {
+        **donations,
+        'campaigns_created': Campaign.objects(ngo__in=ngo_ids).count() if ngo_ids else 0,
+        'students_mentored': Mentorship.objects(
+            mentor__in=mentor_ids, start_date__ne=None
+        ).count() if mentor_ids else 0
+    }
+
+
+def get_user_stats(user_id):
+    """Read a user's counters, computing and storing them on first use"""
+    stats = UserStats.objects(user_id=user_id).first()
+    if not stats:
+        UserStats.objects(user_id=user_id).update_one(
+            upsert=True,
+            set__updated_at=datetime.utcnow(),
+            **{f'set__{field}': value for field, value in compute_user_stats(user_id).items()}
+        )
+        stats = UserStats.objects(user_id=user_id).first()
+    return stats
+
+
+def _by_owner(document_class, totals):
+    """Re-key ``{profile id: count}`` by the profiles' user ids"""
+    owners = document_class._get_collection().find({'_id': {'$in': list(totals)}}, {'user': 1})
+    return {owner['user']: totals[owner['_id']] for owner in owners}
+
+
+def rebuild_user_stats():
+    """Recompute every user's counters from the source collections.
+
+    One aggregation per counter over the whole collection; users with no
+    activity left lose their document and get it back, computed, on their
+    next read. Returns the number of users with stats.
+    """
+    stats = {}
+
+    def add(user_id, **values):
+        stats.setdefault(user_id, dict.fromkeys(FIELDS, 0)).update(values)
+
+    for row in Donation.objects.aggregate([
+        {'$match': {'status': 'completed', 'donor': {'$ne': None}}},
+        {'$group': {'_id': '$donor', 'count': {'$sum': 1}, 'amount': {'$sum': '$amount'}}}
+    ]):
+        add(row['_id'], donation_count=row['count'], donation_amount=row['amount'])
+
+    campaigns = {row['_id']: row['count'] for row in Campaign.objects.aggregate([
+        {'$group': {'_id': '$ngo', 'count': {'$sum': 1}}}
+    ])}
+    for user_id, count in _by_owner(NGO, campaigns).items():
+        add(user_id, campaigns_created=count)
+
+    mentored = {row['_id']: row['count'] for row in Mentorship.objects.aggregate([
+        {'$match': {'start_date': {'$ne': None}}},
+        {'$group': {'_id': '$mentor', 'count': {'$sum': 1}}}
+    ])}
+    for user_id, count in _by_owner(Mentor, mentored).items():
+        add(user_id, students_mentored=count)
+
+    collection = UserStats._get_collection()
+    now = datetime.utcnow()
+    if stats:
+        collection.bulk_write([
+            ReplaceOne({'_id': user_id}, {'_id': user_id, **values, 'updated_at': now}, upsert=True)
+            for user_id, values in stats.items()
+        ], ordered=False)
+    collection.delete_many({'_id': {'$nin': list(stats)}})
+    return len(stats)
@@ -0,0 +1,20 @@
+"""
+Shared environment for the benchmark and stress scripts.
+
+The scripts drop and reseed collections, so they always run against a
+scratch database on localhost (BENCHMARK_DATABASE, default
+edubridge_benchmark), whatever MONGODB_URI says. Call configure() before
+importing ``app``; the config is read at import time.
+"""
+
+import os
+
+
+def configure(response_cache=True):
+    os.environ['MONGODB_DATABASE'] = os.environ.get('BENCHMARK_DATABASE', 'edubridge_benchmark')
+    os.environ['MONGODB_URI'] = f"mongodb://localhost:27017/{os.environ['MONGODB_DATABASE']}"
+    # All requests come from one client; measure the endpoint, not the rate limiter
+    os.environ['RATE_LIMIT_ENABLED'] = 'false'
+    if not response_cache:
+        # Measure the database path, not the response cache
+        os.environ['RESPONSE_CACHE_BACKEND'] = 'null'
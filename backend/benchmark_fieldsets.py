@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Sparse Fieldset Benchmark for EduBridge
+Compares response size and latency of the card view against the full view
+
+Run against a database with campaigns and mentors, e.g. after
+benchmark_search.py has seeded the scratch database.
+
+Usage: python benchmark_fieldsets.py [--requests 200] [--per-page 50]
+"""
+
+import argparse
+import statistics
+import time
+
+import benchmark_env
+benchmark_env.configure(response_cache=False)
+
+from app import create_app
+
+
+def measure(client, url, count):
+    timings = []
+    size = 0
+    for _ in range(count):
+        started = time.perf_counter()
+        response = client.get(url)
+        timings.append((time.perf_counter() - started) * 1000)
+        size = len(response.get_data())
+    timings.sort()
+    return size, statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--per-page', type=int, default=50)
+    args = parser.parse_args()
+
+    app = create_app()
+    client = app.test_client()
+
+    for resource in ('campaigns', 'mentors'):
+        print(f"📊 /api/{resource}/ ({args.per_page} per page, {args.requests} requests)")
+        for label, view in (('full', ''), ('card', '&view=card')):
+            url = f'/api/{resource}/?per_page={args.per_page}{view}'
+            size, p50, p95 = measure(client, url, args.requests)
+            print(f"   {label:<5} {size:>9} bytes   p50 {p50:7.2f} ms   p95 {p95:7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
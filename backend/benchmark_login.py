@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Login Throughput Benchmark for EduBridge
+Fires concurrent logins and reports throughput, tail latency, rejected
+requests and the latency of an unrelated endpoint during the burst
+
+Usage: python benchmark_login.py [--users 50] [--logins 1000] [--threads 64]
+                                 [--workers 2] [--queue 32] [--rounds 12]
+"""
+
+import argparse
+import os
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import benchmark_env
+benchmark_env.configure(response_cache=False)
+
+PASSWORD = 'benchmark-password'
+
+
+def percentile(timings, fraction):
+    return timings[max(int(len(timings) * fraction) - 1, 0)]
+
+
+def setup(count):
+    from app.models import User
+    User.objects(email__endswith='@login.bench').delete()
+    users = []
+    for index in range(count):
+        user = User(email=f'user{index}@login.bench', password=PASSWORD, first_name='Login',
+                    last_name=f'Bench {index}', role='donor')
+        user.save()
+        users.append(user.email)
+    return users
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--logins', type=int, default=1000)
+    parser.add_argument('--threads', type=int, default=64)
+    parser.add_argument('--workers', type=int, default=2, help='hashing processes, 0 hashes inline')
+    parser.add_argument('--queue', type=int, default=32, help='hashing queue limit')
+    parser.add_argument('--rounds', type=int, default=12, help='bcrypt cost factor')
+    args = parser.parse_args()
+
+    os.environ['PASSWORD_HASH_WORKERS'] = str(args.workers)
+    os.environ['PASSWORD_HASH_MAX_QUEUE'] = str(args.queue)
+    os.environ['BCRYPT_LOG_ROUNDS'] = str(args.rounds)
+
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        print(f"🌱 Creating {args.users} users...")
+        emails = setup(args.users)
+
+    def login(index):
+        with app.test_client() as client:
+            started = time.perf_counter()
+            response = client.post('/api/auth/login',
+                                   json={'email': emails[index % len(emails)], 'password': PASSWORD})
+            return response.status_code, (time.perf_counter() - started) * 1000
+
+    # Probe an unrelated endpoint throughout the burst
+    probe_timings = []
+    done = threading.Event()
+
+    def probe():
+        with app.test_client() as client:
+            while not done.is_set():
+                started = time.perf_counter()
+                client.get('/api/health')
+                probe_timings.append((time.perf_counter() - started) * 1000)
+                time.sleep(0.02)
+
+    prober = threading.Thread(target=probe)
+    prober.start()
+
+    print(f"🚀 {args.logins} logins on {args.threads} threads "
+          f"({args.workers} hashing workers, queue {args.queue}, cost {args.rounds})...")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        results = list(executor.map(login, range(args.logins)))
+    elapsed = time.perf_counter() - started
+
+    done.set()
+    prober.join()
+
+    statuses = Counter(status for status, _ in results)
+    accepted = sorted(timing for status, timing in results if status == 200)
+    probe_timings.sort()
+
+    print(f"   elapsed:      {elapsed:.2f} s")
+    print(f"   throughput:   {statuses[200] / elapsed:.1f} logins/s")
+    print(f"   statuses:     {dict(statuses)}")
+    if accepted:
+        print(f"   login p50:    {statistics.median(accepted):8.1f} ms")
+        print(f"   login p95:    {percentile(accepted, 0.95):8.1f} ms")
+        print(f"   login p99:    {percentile(accepted, 0.99):8.1f} ms")
+    if probe_timings:
+        print(f"   health p50:   {statistics.median(probe_timings):8.1f} ms")
+        print(f"   health p99:   {percentile(probe_timings, 0.99):8.1f} ms")
+
+    with app.app_context():
+        from app import password_hasher
+        password_hasher.shutdown()
+
+
+if __name__ == '__main__':
+    main()
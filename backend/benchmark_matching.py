@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Mentor Matching Benchmark for EduBridge
+Scores synthetic students against a synthetic mentor index, no database needed
+
+Usage: python benchmark_matching.py [--mentors 10000] [--queries 500]
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from bson import ObjectId
+from app.utils.matching import MentorIndex, weighted_terms, GOALS_WEIGHT
+
+SKILLS = [
+    'python', 'java', 'javascript', 'react', 'node.js', 'machine learning', 'data science',
+    'web development', 'android', 'ios', 'ui/ux design', 'product management', 'sql', 'cloud',
+    'devops', 'c++', 'robotics', 'mathematics', 'physics', 'chemistry', 'biology', 'english',
+    'public speaking', 'entrepreneurship', 'finance', 'marketing', 'career guidance',
+    'competitive programming', 'cybersecurity', 'game development', 'statistics', 'writing'
+]
+WORDS = ['startup', 'engineer', 'research', 'teaching', 'university', 'analytics', 'design',
+         'software', 'mentoring', 'exams', 'college', 'projects', 'leadership', 'interviews']
+
+
+def mentor(rng):
+    return {
+        '_id': ObjectId(),
+        'expertise': ', '.join(rng.sample(SKILLS, rng.randint(2, 6))),
+        'bio': ' '.join(rng.choices(WORDS, k=12)),
+        'experience_years': rng.randint(0, 30),
+        'rating': round(rng.uniform(0, 5), 1),
+        'is_available': rng.random() > 0.1,
+        'max_students': 5,
+        'current_students': rng.randint(0, 5)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mentors', type=int, default=10000)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    index = MentorIndex()
+    index.sync_interval = None  # synthetic data only
+
+    started = time.perf_counter()
+    for _ in range(args.mentors):
+        index.put(mentor(rng))
+    print(f"🌱 Indexed {args.mentors} mentors in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    started = time.perf_counter()
+    index.match({'python': 1.0}, limit=args.limit)
+    print(f"   matrix build: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    timings = []
+    for _ in range(args.queries):
+        terms = weighted_terms(rng.sample(SKILLS, 3), [(' '.join(rng.choices(WORDS, k=8)), GOALS_WEIGHT)])
+        started = time.perf_counter()
+        index.match(terms, limit=args.limit)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+
+    print(f"📊 {args.queries} matches, top {args.limit}")
+    print(f"   p50 {statistics.median(timings):6.2f} ms   p95 {timings[int(len(timings) * 0.95) - 1]:6.2f} ms")
+
+    # Incremental update: one mentor changes, the next match re-assembles the matrix
+    changed = mentor(rng)
+    index.put(changed)
+    started = time.perf_counter()
+    index.match({'python': 1.0}, limit=args.limit)
+    print(f"   first match after an update: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
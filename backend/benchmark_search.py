@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Campaign Search Benchmark for EduBridge
+Seeds a scratch database with campaigns and measures search latency
+
+Usage: python benchmark_search.py [--campaigns 100000] [--queries 200]
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+import benchmark_env
+benchmark_env.configure()
+
+from app import create_app
+from app.models import Campaign, NGO, User
+
+WORDS = [
+    'school', 'library', 'laptops', 'girls', 'scholarship', 'rural', 'science',
+    'teachers', 'books', 'mathematics', 'coding', 'classroom', 'village',
+    'engineering', 'uniforms', 'meals', 'internet', 'tuition', 'hostel', 'sports'
+]
+CITIES = ['Mumbai', 'Delhi', 'Pune', 'Chennai', 'Kolkata', 'Jaipur', 'Bhopal']
+CATEGORIES = ['scholarship', 'infrastructure', 'mentorship', 'education']
+QUERIES = ['laptops for rural schools', 'girls scholarship', 'science library',
+           'coding classroom', 'teachers', 'village internet', 'Pune']
+
+
+def sentence(length):
+    return ' '.join(random.choice(WORDS) for _ in range(length))
+
+
+def seed(count):
+    Campaign.drop_collection()
+    NGO.drop_collection()
+    User.drop_collection()
+    Campaign.ensure_indexes()
+
+    user = User(email='bench@example.com', password='benchmark', first_name='Bench',
+                last_name='Mark', role='ngo')
+    user.save()
+    ngos = []
+    for index in range(50):
+        ngo = NGO(name=f'{random.choice(WORDS).title()} Trust {index}', user=user,
+                  registration_number=f'BENCH{index:04d}')
+        ngo.save()
+        ngos.append(ngo)
+
+    collection = Campaign._get_collection()
+    batch = []
+    for _ in range(count):
+        ngo = random.choice(ngos)
+        batch.append({
+            'title': sentence(4),
+            'description': sentence(20),
+            'long_description': sentence(120),
+            'category': random.choice(CATEGORIES),
+            'goal_amount': float(random.randint(10000, 500000)),
+            'raised_amount': 0.0,
+            'location': random.choice(CITIES),
+            'ngo': ngo.pk,
+            'ngo_name': ngo.name,
+            'status': 'active',
+        })
+        if len(batch) == 5000:
+            collection.insert_many(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch)
+
+
+def benchmark(query_count):
+    from app.utils.search import search_campaigns
+
+    timings = []
+    for _ in range(query_count):
+        text = random.choice(QUERIES)
+        category = random.choice(CATEGORIES)
+        started = time.perf_counter()
+        query = search_campaigns(Campaign.objects(category=category, status='active'), text)
+        list(query.limit(10))
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    print(f"📊 {query_count} searches over {Campaign.objects.count()} campaigns")
+    print(f"   p50: {statistics.median(timings):.2f} ms")
+    print(f"   p95: {timings[int(len(timings) * 0.95) - 1]:.2f} ms")
+    print(f"   max: {timings[-1]:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--campaigns', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--skip-seed', action='store_true')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if not args.skip_seed:
+            print(f"🌱 Seeding {args.campaigns} campaigns...")
+            seed(args.campaigns)
+        benchmark(args.queries)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Maintenance Commands for EduBridge
+Usage: python manage.py <command> [options]
+"""
+
+import argparse
+from app import create_app
+
+COMMANDS = {}
+
+
+def command(name, *arguments):
+    """Register a maintenance command; arguments are (flags, options) pairs"""
+    def decorator(func):
+        COMMANDS[name] = (func, arguments)
+        return func
+    return decorator
+
+
+@command('backfill-ngo-names')
+def backfill_ngo_names(args):
+    """Copy NGO names onto their campaigns for full-text search"""
+    from app.utils.search import backfill_ngo_names as backfill
+    updated = backfill()
+    print(f"✅ Updated NGO name on {updated} campaigns")
+
+
+@command('rebuild-stats')
+def rebuild_stats(args):
+    """Recompute the platform totals document and report any drift"""
+    from app.utils.platform_stats import rebuild_platform_stats
+    drift = rebuild_platform_stats()
+    if not drift:
+        print("✅ Platform stats were accurate")
+        return
+    print("⚠️  Platform stats had drifted:")
+    for field, values in drift.items():
+        print(f"   {field}: stored={values['stored']} actual={values['actual']}")
+    print("✅ Platform stats rebuilt")
+
+
+@command('backfill-rollups')
+def backfill_rollups(args):
+    """Rebuild the hourly and daily donation rollups from the donations collection"""
+    from app.utils.rollups import rebuild_rollups
+    written = rebuild_rollups()
+    print(f"✅ Wrote {written} donation rollup buckets")
+
+
+@command('rebuild-recent-donations')
+def rebuild_recent_donations(args):
+    """Reload each campaign's recent donations list from the donations collection"""
+    from app.utils.donation_ledger import rebuild_recent_donations as rebuild
+    updated = rebuild()
+    print(f"✅ Rebuilt recent donations on {updated} campaigns")
+
+
+@command('rebuild-user-stats')
+def rebuild_user_stats(args):
+    """Recompute every user's donation, campaign and mentoring counters"""
+    from app.utils.user_stats import rebuild_user_stats as rebuild
+    users = rebuild()
+    print(f"✅ Rebuilt stats for {users} users")
+
+
+@command('refresh-analytics')
+def refresh_analytics(args):
+    """Recompute the admin analytics snapshot now (e.g. from cron)"""
+    from app import analytics
+    snapshot = analytics.refresh()
+    print(f"✅ Analytics refreshed at {snapshot.refreshed_at.isoformat()}")
+
+
+@command('recover-donations',
+         (['--grace-minutes'], {'type': int, 'default': 5,
+                                'help': 'only touch donations pending for longer than this'}))
+def recover_donations(args):
+    """Finish donations left pending by failed requests"""
+    from datetime import timedelta
+    from app.utils.donation_ledger import recover_pending_donations
+    recovered = recover_pending_donations(grace=timedelta(minutes=args.grace_minutes))
+    print(f"✅ Completed {recovered} pending donations")
+
+
+@command('migrate-donation-ledger')
+def migrate_donation_ledger(args):
+    """Drop the capped applied_ledger arrays from campaigns, keeping keys still in flight"""
+    from app.utils.donation_ledger import migrate_applied_ledger
+    migrated = migrate_applied_ledger()
+    print(f"✅ Removed applied_ledger from {migrated} campaigns")
+
+
+@command('import-donations',
+         (['path'], {'help': 'CSV or NDJSON file of donations'}),
+         (['--format'], {'choices': ['csv', 'ndjson'], 'help': 'defaults to the file extension'}))
+def import_donations(args):
+    """Stream a CSV or NDJSON file of offline donations into the database"""
+    from app.utils.donation_import import import_donations as run_import, guess_format
+
+    def on_reject(row_number, reason):
+        print(f"   ❌ row {row_number}: {reason}")
+
+    fmt = args.format or guess_format(args.path, None)
+    with open(args.path, 'rb') as stream:
+        summary = run_import(stream, fmt, on_reject=on_reject)
+    print(f"✅ Imported {summary['imported']} donations totalling {summary['amount']}")
+    if summary['rejected']:
+        print(f"⚠️  Rejected {summary['rejected']} rows")
+
+
+@command('migrate-expertise-tags',
+         (['--batch-size'], {'type': int, 'default': 500, 'help': 'mentors updated per bulk write'}))
+def migrate_expertise_tags(args):
+    """Store normalized expertise tags on existing mentors and rebuild the expertise facet"""
+    from app.utils.expertise import migrate_expertise_tags as migrate
+    migrated = migrate(batch_size=args.batch_size)
+    print(f"✅ Migrated expertise tags on {migrated} mentors")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EduBridge maintenance commands')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for name, (func, arguments) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=func.__doc__)
+        for flags, options in arguments:
+            subparser.add_argument(*flags, **options)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        COMMANDS[args.command][0](args)
+
+
+if __name__ == '__main__':
+    main()
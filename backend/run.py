@@ -1,6 +1,10 @@
+import multiprocessing
 from app import create_app
 
-app = create_app()
+# Password hashing workers are spawned processes that re-import this module;
+# only the server process builds the app and connects to MongoDB
+if multiprocessing.parent_process() is None:
+    app = create_app()
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5001)
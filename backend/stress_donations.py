@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Donation Concurrency Stress Test for EduBridge
+Fires parallel donations at one campaign and checks that no increment is lost
+
+Usage: python stress_donations.py [--donations 2000] [--threads 32]
+"""
+
+import argparse
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import benchmark_env
+benchmark_env.configure()
+
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.models import Campaign, Donation, NGO, User
+
+
+def setup():
+    for document in (Campaign, Donation, NGO, User):
+        document.drop_collection()
+
+    ngo_user = User(email='ngo@stress.test', password='stress', first_name='Stress',
+                    last_name='NGO', role='ngo')
+    ngo_user.save()
+    ngo = NGO(name='Stress NGO', user=ngo_user, registration_number='STRESS01')
+    ngo.save()
+    campaign = Campaign(title='Stress campaign', description='Concurrent donations',
+                        category='education', goal_amount=1000000, ngo=ngo, ngo_name=ngo.name)
+    campaign.save()
+
+    donor = User(email='donor@stress.test', password='stress', first_name='Stress',
+                 last_name='Donor', role='donor')
+    donor.save()
+    return campaign, create_access_token(identity=donor)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--donations', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=32)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        campaign, token = setup()
+
+    amounts = [random.randint(1, 500) for _ in range(args.donations)]
+    headers = {'Authorization': f'Bearer {token}'}
+
+    def donate(amount):
+        with app.test_client() as client:
+            response = client.post('/api/donations/', headers=headers,
+                                   json={'amount': amount, 'campaignId': str(campaign.id)})
+            return response.status_code
+
+    print(f"🚀 Sending {args.donations} donations on {args.threads} threads...")
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        statuses = list(executor.map(donate, amounts))
+
+    with app.app_context():
+        campaign.reload()
+        failed = len([status for status in statuses if status != 201])
+        recorded = Donation.objects(campaign=campaign, status='completed').sum('amount')
+        expected = float(sum(amounts))
+
+        print(f"   failed requests: {failed}")
+        print(f"   expected raised: {expected}")
+        print(f"   campaign raised: {campaign.raised_amount}")
+        print(f"   donations total: {recorded}")
+
+        if failed == 0 and campaign.raised_amount == expected == recorded:
+            print("✅ No lost updates")
+        else:
+            print("❌ Totals do not match")
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
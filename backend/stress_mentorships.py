@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Mentor Capacity Stress Test for EduBridge
+Accepts many pending requests for one mentor in parallel and checks that the
+mentor never takes more students than max_students
+
+Usage: python stress_mentorships.py [--requests 200] [--seats 5] [--threads 32]
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import benchmark_env
+benchmark_env.configure()
+
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.models import Mentor, Mentorship, Student, User
+
+
+def setup(request_count, seats):
+    for document in (Mentor, Mentorship, Student, User):
+        document.drop_collection()
+
+    mentor_user = User(email='mentor@stress.test', password='stress', first_name='Stress',
+                       last_name='Mentor', role='mentor')
+    mentor_user.save()
+    mentor = Mentor(user=mentor_user, expertise='python', max_students=seats)
+    mentor.save()
+
+    mentorships = []
+    for number in range(request_count):
+        student_user = User(email=f'student{number}@stress.test', password='stress', first_name='Stress',
+                            last_name=f'Student {number}', role='student')
+        student_user.save()
+        student = Student(user=student_user)
+        student.save()
+        mentorship = Mentorship(mentor=mentor, student=student, status='pending')
+        mentorship.save()
+        mentorships.append(str(mentorship.id))
+
+    return mentor, mentorships, create_access_token(identity=mentor_user)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--seats', type=int, default=5)
+    parser.add_argument('--threads', type=int, default=32)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        mentor, mentorships, token = setup(args.requests, args.seats)
+
+    headers = {'Authorization': f'Bearer {token}'}
+
+    def post(path, body):
+        with app.test_client() as client:
+            return client.post(path, headers=headers, json=body).status_code
+
+    def accept(mentorship_id):
+        return post(f'/api/mentors/requests/{mentorship_id}/respond', {'response': 'accept'})
+
+    def complete(mentorship_id):
+        return post(f'/api/mentors/requests/{mentorship_id}/close', {'status': 'completed'})
+
+    print(f"🚀 Accepting {args.requests} requests for {args.seats} seats on {args.threads} threads...")
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        statuses = list(executor.map(accept, mentorships))
+
+    with app.app_context():
+        mentor.reload()
+        accepted = statuses.count(200)
+        active = Mentorship.objects(mentor=mentor, status='active').count()
+        errors = len([status for status in statuses if status not in (200, 400)])
+
+        print(f"   accepted requests: {accepted}")
+        print(f"   active mentorships: {active}")
+        print(f"   current students: {mentor.current_students} / {mentor.max_students}")
+        print(f"   unexpected responses: {errors}")
+
+        expected = min(args.seats, args.requests)
+        if not (errors == 0 and accepted == active == mentor.current_students == expected):
+            print("❌ Mentor capacity is inconsistent")
+            raise SystemExit(1)
+        active_ids = [str(mentorship_id) for mentorship_id in
+                      Mentorship.objects(mentor=mentor, status='active').scalar('id')]
+
+    print(f"🚀 Completing {len(active_ids)} mentorships twice each...")
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        statuses = list(executor.map(complete, active_ids * 2))
+
+    with app.app_context():
+        mentor.reload()
+        print(f"   completed requests: {statuses.count(200)}")
+        print(f"   current students: {mentor.current_students}")
+
+        if statuses.count(200) == len(active_ids) and mentor.current_students == 0:
+            print("✅ No oversubscription and every seat released once")
+        else:
+            print("❌ Seats were not released exactly once")
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
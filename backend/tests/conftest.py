@@ -0,0 +1,33 @@
+import mongomock
+import pytest
+from mongoengine import disconnect
+from mongoengine.connection import get_db
+from app import create_app, identity_cache
+from app.config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    MONGODB_DATABASE = 'edubridge_test'
+    MONGODB_URI = 'mongodb://localhost:27017/edubridge_test'
+    MONGODB_CLIENT_CLASS = mongomock.MongoClient
+    BCRYPT_LOG_ROUNDS = 4
+    PASSWORD_HASH_WORKERS = 0
+    RESPONSE_CACHE_BACKEND = 'null'
+    RATE_LIMIT_ENABLED = False
+
+
+@pytest.fixture
+def app():
+    disconnect()
+    app = create_app(TestConfig)
+    # mongomock clients share their data per host; start every test empty
+    get_db().client.drop_database(TestConfig.MONGODB_DATABASE)
+    yield app
+    identity_cache.clear()
+    disconnect()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
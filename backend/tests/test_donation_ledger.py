@@ -0,0 +1,57 @@
+"""A donation is added to its campaign's total once, however its writers interleave."""
+from datetime import datetime, timedelta
+import pytest
+from app.models import User, NGO, Campaign, Donation
+from app.utils.donation_ledger import claim, apply_claim, commit_donation, recover_pending_donations
+
+
+@pytest.fixture
+def donation(app):
+    donor = User(email='donor@example.com', password='password123', first_name='Dana', last_name='Donor',
+                 role='donor').save()
+    owner = User(email='ngo@example.com', password='password123', first_name='Nia', last_name='Owner',
+                 role='ngo').save()
+    ngo = NGO(name='Learning Trust', user=owner).save()
+    campaign = Campaign(title='Books', description='Books and fees', category='scholarship', goal_amount=1000,
+                        ngo=ngo).save()
+    long_ago = datetime.utcnow() - timedelta(hours=1)
+    return Donation(amount=10.0, donor=donor, campaign=campaign, transaction_id='TXN-1', ledger_key='TXN-1',
+                    status='pending', created_at=long_ago, updated_at=long_ago).save()
+
+
+def _campaign(donation):
+    return Campaign._get_collection().find_one({'_id': donation.campaign.id})
+
+
+def test_replay_read_before_recovery_does_not_apply_again(donation):
+    replay = Donation.objects.get(id=donation.id)
+    assert replay.status == 'pending'
+
+    assert recover_pending_donations() == 1
+    commit_donation(replay)
+
+    campaign = _campaign(donation)
+    assert campaign['raised_amount'] == 10.0
+    assert campaign['pending_ledger'] == []
+    assert replay.status == 'completed'
+    assert [entry['donation_id'] for entry in campaign['recent_donations']] == [str(donation.id)]
+
+
+def test_overlapping_recoveries_apply_once(donation):
+    assert recover_pending_donations() + recover_pending_donations() == 1
+    assert _campaign(donation)['raised_amount'] == 10.0
+
+
+@pytest.mark.parametrize('applied', [False, True], ids=['crashed-before-inc', 'crashed-after-inc'])
+def test_recovery_finishes_a_stale_claim(donation, applied):
+    token, claimed = claim({'_id': donation.id, 'status': 'pending'})
+    if applied:
+        apply_claim(token, claimed)
+    Donation._get_collection().update_one({'_id': donation.id},
+                                          {'$set': {'updated_at': datetime.utcnow() - timedelta(hours=1)}})
+
+    assert recover_pending_donations() == 1
+    campaign = _campaign(donation)
+    assert campaign['raised_amount'] == 10.0
+    assert campaign['pending_ledger'] == []
+    assert Donation.objects.get(id=donation.id).status == 'completed'
@@ -0,0 +1,44 @@
+"""HTTP caching: campaign ETags follow the UTC date, per-user responses stay private."""
+from datetime import datetime, timedelta
+import pytest
+from flask_jwt_extended import create_access_token
+from app.models import User, NGO, Campaign
+import app.models.campaign as campaign_model
+import app.routes.campaigns as campaign_routes
+
+
+class Tomorrow(datetime):
+    @classmethod
+    def utcnow(cls):
+        return datetime.utcnow() + timedelta(days=1)
+
+
+@pytest.fixture
+def campaign(app):
+    owner = User(email='ngo@example.com', password='password123', first_name='Nia', last_name='Owner',
+                 role='ngo').save()
+    ngo = NGO(name='Learning Trust', user=owner).save()
+    return Campaign(title='Books', description='Books and fees', category='scholarship', goal_amount=1000,
+                    ngo=ngo, end_date=datetime.utcnow() + timedelta(days=10)).save()
+
+
+@pytest.mark.parametrize('path', ['/api/campaigns/', '/api/campaigns/{id}'])
+def test_etag_changes_with_the_date(client, campaign, monkeypatch, path):
+    url = path.format(id=campaign.id)
+    today = client.get(url)
+    assert client.get(url, headers={'If-None-Match': today.headers['ETag']}).status_code == 304
+
+    monkeypatch.setattr(campaign_model, 'datetime', Tomorrow)
+    monkeypatch.setattr(campaign_routes, 'datetime', Tomorrow)
+    tomorrow = client.get(url, headers={'If-None-Match': today.headers['ETag']})
+    assert tomorrow.status_code == 200
+    assert tomorrow.headers['ETag'] != today.headers['ETag']
+
+
+def test_authenticated_requests_are_not_cached_publicly(app, client, campaign):
+    with app.app_context():
+        token = create_access_token(identity=User.objects.get(email='ngo@example.com'))
+    assert client.get('/api/mentors/').headers['Cache-Control'] == 'public, max-age=60'
+    for url in ('/api/mentors/requests', '/api/mentors/matches', '/api/mentors/'):
+        response = client.get(url, headers={'Authorization': f'Bearer {token}'})
+        assert response.headers['Cache-Control'] == 'private, no-cache', url
@@ -0,0 +1,18 @@
+"""Internal counters at /api/metrics are for admins only."""
+from flask_jwt_extended import create_access_token
+from app.models import User
+
+
+def _auth(app, role):
+    user = User(email=f'{role}@example.com', password='password123', first_name='Sam', last_name='Lee',
+                role=role).save()
+    with app.app_context():
+        return {'Authorization': f'Bearer {create_access_token(identity=user)}'}
+
+
+def test_metrics_require_an_admin(app, client):
+    assert client.get('/api/metrics').status_code == 401
+    assert client.get('/api/metrics', headers=_auth(app, 'donor')).status_code == 403
+    response = client.get('/api/metrics', headers=_auth(app, 'admin'))
+    assert response.status_code == 200
+    assert 'rate_limiter' in response.get_json()
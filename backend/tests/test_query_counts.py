@@ -0,0 +1,120 @@
+"""List endpoints must issue the same number of queries whatever the page size.
+
+Rows reference users, campaigns and NGOs; serializing them one by one would
+add a query per row (N+1). Each endpoint is requested at two page sizes and
+the queries reaching the database are counted.
+"""
+import threading
+from datetime import datetime, timedelta
+import mongomock
+import pytest
+from flask_jwt_extended import create_access_token
+from app.models import User, NGO, Campaign, Donation, Mentor
+
+ROWS = 8
+QUERY_METHODS = ('find', 'find_one', 'aggregate', 'count_documents', 'estimated_document_count', 'distinct')
+
+
+class QueryCounter:
+    """Counts reads issued to mongomock collections, not their internal calls"""
+
+    def __init__(self):
+        self.count = 0
+        self._local = threading.local()
+
+    def wrap(self, method):
+        counter = self
+
+        def wrapper(collection, *args, **kwargs):
+            depth = getattr(counter._local, 'depth', 0)
+            if depth == 0:
+                counter.count += 1
+            counter._local.depth = depth + 1
+            try:
+                return method(collection, *args, **kwargs)
+            finally:
+                counter._local.depth = depth
+
+        return wrapper
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    counter = QueryCounter()
+    for name in QUERY_METHODS:
+        monkeypatch.setattr(mongomock.collection.Collection, name,
+                            counter.wrap(getattr(mongomock.collection.Collection, name)))
+    return counter
+
+
+def _user(index, role):
+    return User(
+        email=f'{role}{index}@example.com',
+        password='password123',
+        first_name=f'First{index}',
+        last_name=f'Last{index}',
+        role=role
+    ).save()
+
+
+@pytest.fixture
+def seeded(app):
+    start = datetime.utcnow() - timedelta(days=1)
+    ngo_user = _user(0, 'ngo')
+    ngo = NGO(name='Learning Trust', user=ngo_user).save()
+    campaigns = [
+        Campaign(
+            title=f'Campaign {i}',
+            description='Books and fees',
+            category='scholarship',
+            goal_amount=1000,
+            ngo=ngo,
+            ngo_name=ngo.name,
+            created_at=start + timedelta(minutes=i)
+        ).save()
+        for i in range(ROWS)
+    ]
+    donor = _user(0, 'donor')
+    donors = [_user(i + 1, 'donor') for i in range(ROWS)]
+    for i, campaign in enumerate(campaigns):
+        Donation(amount=10, donor=donor, campaign=campaign, status='completed',
+                 transaction_id=f'TXN-A{i}', created_at=start + timedelta(minutes=i)).save()
+    for i, other in enumerate(donors):
+        Donation(amount=20, donor=other, campaign=campaigns[0], status='completed',
+                 transaction_id=f'TXN-B{i}', created_at=start + timedelta(minutes=ROWS + i)).save()
+    for i in range(ROWS):
+        Mentor(user=_user(i, 'mentor'), expertise='python, math', is_available=True,
+               created_at=start + timedelta(minutes=i)).save()
+    with app.app_context():
+        token = create_access_token(identity=donor)
+    return {'campaign': campaigns[0], 'token': token}
+
+
+def _endpoints(seeded):
+    auth = {'Authorization': f"Bearer {seeded['token']}"}
+    return [
+        ('/api/campaigns/', 'campaigns', {}),
+        ('/api/donations/', 'donations', {}),
+        (f"/api/donations/campaign/{seeded['campaign'].id}", 'donations', {}),
+        ('/api/donations/user', 'donations', auth),
+        ('/api/mentors/', 'mentors', {}),
+        ('/api/users/', 'users', {})
+    ]
+
+
+@pytest.mark.parametrize('index', range(6), ids=[
+    'get_campaigns', 'get_all_donations', 'get_campaign_donations',
+    'get_user_donations', 'get_mentors', 'get_all_users'
+])
+def test_queries_do_not_grow_with_page_size(client, seeded, queries, index):
+    url, key, headers = _endpoints(seeded)[index]
+    # Warm the per-process caches (identity, mentor index) first
+    client.get(url, headers=headers)
+    counts = []
+    for per_page in (2, 6):
+        queries.count = 0
+        response = client.get(url, query_string={'per_page': per_page}, headers=headers)
+        assert response.status_code == 200, response.get_json()
+        assert len(response.get_json()[key]) == per_page
+        counts.append(queries.count)
+    assert counts[0] == counts[1], f'{url}: {counts[0]} queries for 2 rows, {counts[1]} for 6'
@@ -0,0 +1,34 @@
+"""Signed-in users are charged to their own budget; proxies pass the client IP on."""
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.models import User
+from tests.conftest import TestConfig
+
+
+class LimitedConfig(TestConfig):
+    RATE_LIMIT_ENABLED = True
+    RATE_LIMITS = {'ip': (2, 60), 'user': (5, 60)}
+    ROUTE_RATE_LIMITS = {}
+    PROXY_FIX_HOPS = 1
+
+
+@pytest.fixture
+def limited(app):
+    return create_app(LimitedConfig).test_client()
+
+
+def test_users_behind_one_address_do_not_share_the_ip_budget(app, limited):
+    user = User(email='donor@example.com', password='password123', first_name='Dana', last_name='Donor',
+                role='donor').save()
+    with app.app_context():
+        auth = {'Authorization': f'Bearer {create_access_token(identity=user)}'}
+    statuses = [limited.get('/api/campaigns/', headers=auth).status_code for _ in range(6)]
+    assert statuses == [200] * 5 + [429]
+
+
+def test_forwarded_client_ips_get_their_own_budget(limited):
+    for client_ip in ('203.0.113.1', '203.0.113.2'):
+        headers = {'X-Forwarded-For': client_ip}
+        statuses = [limited.get('/api/campaigns/', headers=headers).status_code for _ in range(3)]
+        assert statuses == [200, 200, 429]
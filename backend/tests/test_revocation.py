@@ -0,0 +1,32 @@
+"""Log out everywhere revokes older tokens but not a login made right after it."""
+from app.models import User
+
+
+def _login(client):
+    response = client.post('/api/auth/login', json={'email': 'donor@example.com', 'password': 'password123'})
+    assert response.status_code == 200, response.get_json()
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+
+def test_login_in_the_second_of_logout_all_stays_valid(app, client):
+    User(email='donor@example.com', password='password123', first_name='Dana', last_name='Donor',
+         role='donor').save()
+    old = _login(client)
+    assert client.post('/api/auth/logout-all', headers=old).status_code == 200
+
+    new = _login(client)
+    assert client.get('/api/auth/profile', headers=new).status_code == 200
+    assert client.get('/api/auth/profile', headers=old).status_code == 401
+
+
+def test_logout_all_served_by_another_process(app, client):
+    User(email='donor@example.com', password='password123', first_name='Dana', last_name='Donor',
+         role='donor').save()
+    old = _login(client)
+    assert client.get('/api/auth/profile', headers=old).status_code == 200
+
+    # Another worker handled logout-all; this process still caches the old version
+    User.objects(email='donor@example.com').update_one(inc__token_version=1)
+    new = _login(client)
+    assert client.get('/api/auth/profile', headers=new).status_code == 200
+    assert client.get('/api/auth/profile', headers=old).status_code == 401
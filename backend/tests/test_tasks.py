@@ -0,0 +1,18 @@
+"""A worker whose lease ran out must not mark another worker's task done."""
+from datetime import datetime, timedelta
+from app.models import Task
+from app.utils.tasks import enqueue, claim, complete
+
+
+def test_complete_skips_tasks_reclaimed_after_the_lease(app):
+    enqueue('send_email', {'to': 'donor@example.com'})
+    with app.app_context():
+        first = claim('worker-a')
+        Task._get_collection().update_many({}, {'$set': {'locked_until': datetime.utcnow() - timedelta(seconds=1)}})
+        second = claim('worker-b')
+        assert [document['_id'] for document in second] == [document['_id'] for document in first]
+
+        assert complete(first) == 0
+        assert Task.objects.get().status == 'running'
+        assert complete(second) == 1
+        assert Task.objects.get().status == 'done'
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Background Task Worker for EduBridge
+Runs queued tasks (emails, analytics refreshes) outside the web processes.
+Start as many as needed; workers coordinate through the tasks collection.
+
+Usage: python worker.py [--threads 4] [--poll-interval 1.0] [--once]
+"""
+
+import argparse
+import os
+import socket
+import threading
+import time
+from app import create_app
+# Importing the handlers module registers every task handler
+from app.utils.task_handlers import queue_analytics_refresh
+from app.utils.tasks import claim, run
+
+
+def work(app, worker_id, poll_interval, once, stop):
+    """Claim and run batches until stopped; with ``once``, until the queue is drained"""
+    with app.app_context():
+        while not stop.is_set():
+            try:
+                tasks = claim(worker_id)
+            except Exception as e:
+                print(f"⚠️  {worker_id}: could not claim tasks: {e}")
+                tasks = []
+            if not tasks:
+                if once:
+                    return
+                stop.wait(poll_interval)
+                continue
+            ok = run(tasks)
+            print(f"{'✅' if ok else '❌'} {worker_id}: {tasks[0]['name']} x{len(tasks)}")
+
+
+def schedule(app, interval, stop):
+    """Queue the periodic analytics refresh; its dedup key keeps it from piling up"""
+    with app.app_context():
+        while not stop.is_set():
+            try:
+                queue_analytics_refresh()
+            except Exception as e:
+                print(f"⚠️  could not schedule analytics refresh: {e}")
+            stop.wait(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EduBridge background task worker')
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--poll-interval', type=float, default=1.0, help='seconds to wait when the queue is empty')
+    parser.add_argument('--once', action='store_true', help='exit once no task is due')
+    args = parser.parse_args()
+
+    app = create_app()
+    stop = threading.Event()
+    prefix = f'{socket.gethostname()}:{os.getpid()}'
+
+    threads = [
+        threading.Thread(target=work, args=(app, f'{prefix}:{index}', args.poll_interval, args.once, stop))
+        for index in range(args.threads)
+    ]
+    if not args.once:
+        threads.append(threading.Thread(
+            target=schedule, args=(app, app.config['ANALYTICS_REFRESH_INTERVAL'], stop), daemon=True
+        ))
+
+    print(f"🚀 Worker {prefix} running {args.threads} threads")
+    for thread in threads:
+        thread.start()
+    try:
+        while any(thread.is_alive() for thread in threads if not thread.daemon):
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        print("⏹  Stopping after the current tasks...")
+        stop.set()
+        for thread in threads:
+            if not thread.daemon:
+                thread.join()
+
+
+if __name__ == '__main__':
+    main()